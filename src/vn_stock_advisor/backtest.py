@@ -0,0 +1,276 @@
+"""
+Vectorized backtest of the TechDataTool signal rules.
+
+Signals are computed for every symbol and session at once (bars x symbols
+panels); the trading simulation then walks the sessions once, handling all
+symbols of a session with array operations. Vietnamese market rules are
+applied: T+2.5 settlement, daily price bands, board lots and trading fees.
+"""
+
+import argparse
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from vn_stock_advisor.data.calendar import DateLike
+from vn_stock_advisor.data.price_store import PRICE_COLUMNS, PriceStore
+from vn_stock_advisor.indicators.registry import registry
+from vn_stock_advisor.indicators.signals import SIGNAL_INDICATORS, classify_signals, signal_score
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+@dataclass
+class MarketRules:
+    """Trading constraints of the Vietnamese stock market (HOSE defaults).
+
+    Attributes:
+        settlement_days: Bought shares can be sold from the afternoon of
+            T+2, so with orders filled at the open the first sale happens
+            on the third session after the purchase.
+        price_band: Daily limit around the previous close (HOSE 7%,
+            HNX 10%, UPCoM 15%).
+        band_tolerance: Relative distance to the limit price treated as
+            "at the limit", to absorb tick-size rounding.
+        lot_size: Board lot.
+        fee_rate: Brokerage fee on both sides.
+        sell_tax: Personal income tax on the sale value.
+    """
+    settlement_days: float = 2.5
+    price_band: float = 0.07
+    band_tolerance: float = 0.003
+    lot_size: int = 100
+    fee_rate: float = 0.0015
+    sell_tax: float = 0.001
+
+    @property
+    def min_holding_sessions(self) -> int:
+        return math.ceil(self.settlement_days)
+
+
+def load_panel(store: PriceStore, symbols: Sequence[str], start: Optional[DateLike] = None,
+               end: Optional[DateLike] = None, interval: str = "1D") -> Dict[str, pd.DataFrame]:
+    """Load stored bars into date-aligned bars x symbols DataFrames.
+
+    Sessions where a listed symbol has no bar (trading halts) carry the
+    previous close with zero volume, so they can't be traded. Sessions before
+    the first stored bar stay NaN. The boolean 'has_bar' frame marks the
+    stored bars, which are the only ones signals are computed from.
+    """
+    records = {symbol: store.read_records(symbol, start=start, end=end, interval=interval) for symbol in symbols}
+    times = [r['time'] for r in records.values() if len(r)]
+    index = pd.DatetimeIndex(np.unique(np.concatenate(times)) if times else [], name='time')
+    arrays = {column: np.full((len(index), len(symbols)), np.nan) for column in PRICE_COLUMNS}
+
+    for j, symbol in enumerate(symbols):
+        rows = records[symbol]
+        if not len(rows):
+            continue
+        positions = np.searchsorted(index.values, rows['time'])
+        for column in PRICE_COLUMNS:
+            arrays[column][positions, j] = rows[column]
+
+    close = pd.DataFrame(arrays['close'], index=index, columns=list(symbols)).ffill()
+    halted = np.isnan(arrays['volume']) & close.notna().to_numpy()
+    for column in ('open', 'high', 'low'):
+        arrays[column][halted] = close.to_numpy()[halted]
+    arrays['volume'][halted] = 0.0
+    panel = {column: pd.DataFrame(values, index=index, columns=list(symbols)) for column, values in arrays.items()}
+    panel['close'] = close
+    panel['has_bar'] = pd.DataFrame(~np.isnan(arrays['close']), index=index, columns=list(symbols))
+    return panel
+
+
+def signal_scores(panel: Dict[str, pd.DataFrame]) -> np.ndarray:
+    """Return the TechDataTool signal score for every session and symbol.
+
+    The score of a session only uses bars up to that session's close. It is
+    NaN until SMA_200 is defined, so no trade is taken on a partial rule set.
+
+    Indicators are computed over each symbol's stored bars only, as the
+    screener and TechDataTool do: the bars filled in for halted sessions
+    would shift the moving-average windows and dilute volume averages.
+    Halted sessions keep the score of the symbol's last bar.
+    """
+    closes = panel['close'].to_numpy()
+    has_bar = panel['has_bar'].to_numpy() if 'has_bar' in panel else ~np.isnan(closes)
+    # Pack each symbol's bars to the top of the panel, so every column is its own bar series
+    rows = (np.cumsum(has_bar, axis=0) - 1)[has_bar]
+    cols = np.broadcast_to(np.arange(closes.shape[1]), closes.shape)[has_bar]
+    packed = {}
+    for column in PRICE_COLUMNS:
+        values = np.full(closes.shape, np.nan)
+        values[rows, cols] = panel[column].to_numpy()[has_bar]
+        packed[column] = pd.DataFrame(values, columns=panel['close'].columns)
+
+    computed = registry.compute_panel(packed, SIGNAL_INDICATORS)
+    values = {name: frame.to_numpy()[rows, cols] for name, frame in computed.items()}
+    values['volume'] = packed['volume'].to_numpy()[rows, cols]
+    bar_scores = signal_score(classify_signals(values, packed['close'].to_numpy()[rows, cols])).astype(float)
+    bar_scores[np.isnan(values['SMA_200'])] = np.nan
+
+    scores = np.full(closes.shape, np.nan)
+    scores[has_bar] = bar_scores
+    listed = pd.DataFrame(has_bar).cummax().to_numpy()
+    return np.where(listed & ~has_bar, pd.DataFrame(scores).ffill().to_numpy(), scores)
+
+
+@dataclass
+class BacktestResult:
+    """Closed trades, the equity curve and the final open positions of a backtest."""
+    trades: pd.DataFrame
+    equity: pd.Series
+    initial_capital: float
+    open_positions: int
+
+    def summary(self) -> Dict[str, float]:
+        """Return headline statistics: returns, hit rate and drawdown."""
+        equity = self.equity
+        final = equity.iloc[-1] if len(equity) else self.initial_capital
+        total_return = final / self.initial_capital - 1
+        years = len(equity) / TRADING_DAYS_PER_YEAR
+        returns = self.trades['return'] if len(self.trades) else pd.Series(dtype=float)
+        drawdown = (equity / equity.cummax() - 1).min() if len(equity) else 0.0
+        return {
+            'total_return': float(total_return),
+            'annual_return': float((1 + total_return) ** (1 / years) - 1) if years > 0 and final > 0 else float('nan'),
+            'max_drawdown': float(drawdown),
+            'trades': int(len(returns)),
+            'hit_rate': float((returns > 0).mean()) if len(returns) else float('nan'),
+            'avg_trade_return': float(returns.mean()) if len(returns) else float('nan'),
+            'avg_holding_sessions': float(self.trades['sessions'].mean()) if len(returns) else float('nan'),
+            'open_positions': self.open_positions,
+        }
+
+    def by_symbol(self) -> pd.DataFrame:
+        """Return trade count, hit rate and P&L per symbol."""
+        if self.trades.empty:
+            return pd.DataFrame(columns=['trades', 'hit_rate', 'avg_return', 'pnl'])
+        grouped = self.trades.groupby('symbol')
+        return pd.DataFrame({
+            'trades': grouped.size(),
+            'hit_rate': grouped['return'].apply(lambda r: (r > 0).mean()),
+            'avg_return': grouped['return'].mean(),
+            'pnl': grouped['pnl'].sum(),
+        }).sort_values('pnl', ascending=False)
+
+
+def run_backtest(
+    panel: Dict[str, pd.DataFrame],
+    entry_score: float = 3,
+    exit_score: float = -1,
+    position_size: float = 100_000,
+    rules: Optional[MarketRules] = None,
+    scores: Optional[np.ndarray] = None,
+) -> BacktestResult:
+    """Trade every symbol of `panel` on its signal score.
+
+    A position is opened when the score at a session's close reaches
+    `entry_score` and closed when it falls to `exit_score`; orders fill at
+    the next session's open. A buy is skipped when the open is locked at the
+    ceiling price, a sale waits while the open is at the floor price, and
+    sales wait for settlement.
+
+    Args:
+        panel: Output of `load_panel`.
+        position_size: Capital allocated to each symbol, in the price unit
+            of the panel (vnstock reports prices in thousand VND, so the
+            default is 100 million VND).
+        scores: Precomputed bars x symbols scores (default: `signal_scores`).
+    """
+    rules = rules or MarketRules()
+    scores = signal_scores(panel) if scores is None else scores
+    opens, closes, volumes = (panel[c].to_numpy() for c in ('open', 'close', 'volume'))
+    index, symbols = panel['close'].index, np.asarray(panel['close'].columns)
+    n_sessions, n_symbols = closes.shape
+
+    cash = np.full(n_symbols, float(position_size))
+    shares = np.zeros(n_symbols)
+    entry_session = np.full(n_symbols, -1)
+    entry_cost = np.zeros(n_symbols)
+    entry_price = np.zeros(n_symbols)
+    equity = np.empty(n_sessions)
+    trades: List[tuple] = []
+
+    with np.errstate(invalid='ignore'):
+        for t in range(n_sessions):
+            if t > 0:
+                reference = closes[t - 1]
+                ceiling = reference * (1 + rules.price_band)
+                floor = reference * (1 - rules.price_band)
+                price = np.clip(opens[t], floor, ceiling)
+                tradable = (volumes[t] > 0) & ~np.isnan(price)
+                signal = scores[t - 1]
+
+                # Sell before buying so a symbol can't be re-entered on its exit session
+                sell = (tradable & (shares > 0) & (signal <= exit_score)
+                        & (t - entry_session >= rules.min_holding_sessions)
+                        & (price > floor * (1 + rules.band_tolerance)))
+                if sell.any():
+                    proceeds = shares[sell] * price[sell] * (1 - rules.fee_rate - rules.sell_tax)
+                    cash[sell] += proceeds
+                    trades.append((np.flatnonzero(sell), entry_session[sell], np.full(sell.sum(), t),
+                                   entry_price[sell], price[sell], shares[sell], proceeds - entry_cost[sell],
+                                   proceeds / entry_cost[sell] - 1))
+                    shares[sell] = 0
+
+                buy = (tradable & (shares == 0) & (signal >= entry_score)
+                       & (price < ceiling * (1 - rules.band_tolerance)))
+                if buy.any():
+                    lots = np.floor(cash[buy] / (price[buy] * (1 + rules.fee_rate) * rules.lot_size))
+                    bought = buy.copy()
+                    bought[buy] = lots > 0
+                    quantity = lots[lots > 0] * rules.lot_size
+                    cost = quantity * price[bought] * (1 + rules.fee_rate)
+                    shares[bought] = quantity
+                    cash[bought] -= cost
+                    entry_cost[bought] = cost
+                    entry_price[bought] = price[bought]
+                    entry_session[bought] = t
+
+            # Mark open positions to the close; halted or unlisted symbols keep their last value
+            equity[t] = cash.sum() + np.nansum(shares * closes[t])
+
+    # Build the trade table once from the per-session batches
+    columns = ['symbol', 'entry_session', 'exit_session', 'entry_price', 'exit_price', 'shares', 'pnl', 'return']
+    data = dict(zip(columns, (np.concatenate(parts) for parts in zip(*trades)))) if trades else {c: np.array([]) for c in columns}
+    symbol_positions, entries, exits = (data.pop(c).astype(int) for c in ('symbol', 'entry_session', 'exit_session'))
+    trade_table = pd.DataFrame({
+        'symbol': symbols[symbol_positions],
+        'entry_time': index[entries],
+        'exit_time': index[exits],
+        **data,
+        'sessions': exits - entries,
+    }).sort_values(['exit_time', 'symbol'], ignore_index=True)
+
+    return BacktestResult(
+        trades=trade_table,
+        equity=pd.Series(equity, index=index, name='equity'),
+        initial_capital=float(position_size) * n_symbols,
+        open_positions=int((shares > 0).sum()),
+    )
+
+
+def main():
+    """Backtest the signal rules on the local price store from the command line."""
+    parser = argparse.ArgumentParser(description="Kiểm định lịch sử tín hiệu kỹ thuật trên dữ liệu giá đã lưu.")
+    parser.add_argument("--symbols", help="Danh sách mã, phân tách bằng dấu phẩy (mặc định: toàn bộ dữ liệu đã lưu)")
+    parser.add_argument("--start", help="Ngày bắt đầu (YYYY-MM-DD)")
+    parser.add_argument("--end", help="Ngày kết thúc (YYYY-MM-DD)")
+    parser.add_argument("--entry", type=float, default=3, help="Điểm tín hiệu tối thiểu để mua")
+    parser.add_argument("--exit", type=float, default=-1, help="Điểm tín hiệu để bán")
+    args = parser.parse_args()
+
+    store = PriceStore()
+    symbols = [s.strip().upper() for s in args.symbols.split(",")] if args.symbols else store.symbols()
+    result = run_backtest(load_panel(store, symbols, args.start, args.end), entry_score=args.entry, exit_score=args.exit)
+    for name, value in result.summary().items():
+        print(f"{name}: {value:.4f}" if isinstance(value, float) else f"{name}: {value}")
+    print(result.by_symbol().head(20).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""
+Benchmark suite for the tools and the indicator math.
+
+Cases run on the synthetic data of a made-up symbol, DEMO
+(benchmarks/fixtures), scaled across data sizes: from 200 bars to 10 years
+of sessions and from 1 to 1,600 symbols. `bench record --symbol HPG`
+records a real symbol's data from vnstock next to it, to run on with
+`--symbol HPG`. Each run is compared with the baseline stored for this
+machine in benchmarks/baselines/ to flag regressions; `--save` stores a
+new baseline and appends the run to benchmarks/history.jsonl, which
+`bench trend` turns into a table of timings per commit. Baselines and
+history are per machine and stay out of git.
+"""
+
+import argparse
+import fnmatch
+import functools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from vn_stock_advisor.data.fundamentals import FundamentalData, income_panel
+from vn_stock_advisor.indicators.technical import calculate_indicators
+from vn_stock_advisor.tools.brave_search_tool import BraveSearchTool
+from vn_stock_advisor.tools.custom_tool import FileReadTool, FundDataTool, TechDataTool
+
+BENCH_DIR = Path(__file__).resolve().parents[2] / "benchmarks"
+# From the shortest window the tools ask for to about 10 years of sessions
+BARS = (200, 1000, 2500)
+# From one ticker to the whole HOSE/HNX/UPCoM universe
+SYMBOLS = (1, 100, 1600)
+# Relative slowdown of a case's best time that counts as a regression
+DEFAULT_TOLERANCE = 0.25
+# Made-up symbol of the synthetic fixtures shipped with the repo
+DEMO_SYMBOL = "DEMO"
+
+
+class Fixtures:
+    """Price, financial and search data of one symbol, and larger data sets derived from them.
+
+    The default DEMO data is synthetic, shaped like vnstock and Brave
+    responses; other symbols' files come from `record`.
+    """
+
+    def __init__(self, root: Optional[Path] = None, symbol: str = DEMO_SYMBOL):
+        self.root = Path(root) if root else BENCH_DIR / "fixtures"
+        self.symbol = symbol
+
+    @functools.cached_property
+    def history(self) -> pd.DataFrame:
+        df = pd.read_csv(self.root / f"{self.symbol}_history.csv.gz", parse_dates=['time'])
+        return df.set_index('time', drop=False)
+
+    def bars(self, n: int) -> pd.DataFrame:
+        return self.history.tail(n).copy()
+
+    def universe(self, symbols: int, bars: int = 200) -> Dict[str, pd.DataFrame]:
+        """`symbols` distinct price series of `bars` bars: shifted windows of the history, rescaled."""
+        history = self.history
+        span = len(history) - bars
+        universe = {}
+        for i in range(symbols):
+            start = (i * 37) % span if span > 0 else 0
+            df = history.iloc[start:start + bars].copy()
+            prices = ['open', 'high', 'low', 'close']
+            df[prices] = df[prices] * (0.5 + (i % 97) / 48)
+            universe[f"S{i:04d}"] = df
+        return universe
+
+    @functools.cached_property
+    def fundamentals(self) -> FundamentalData:
+        company = json.loads((self.root / f"{self.symbol}_company.json").read_text(encoding="utf-8"))
+        return FundamentalData(
+            symbol=self.symbol,
+            full_name=company['company_name'],
+            industry=company['industry'],
+            ratios=pd.read_csv(self.root / f"{self.symbol}_ratios.csv"),
+            income=income_panel(pd.read_csv(self.root / f"{self.symbol}_income.csv")),
+        )
+
+    @functools.cached_property
+    def brave(self) -> Dict[str, Any]:
+        return json.loads((self.root / "brave_search.json").read_text(encoding="utf-8"))
+
+
+@dataclass
+class Case:
+    name: str
+    # Build the inputs for one parameter, return the callable to time
+    setup: Callable[[Fixtures, Any], Callable[[], Any]]
+    params: Sequence[Any]
+
+    def ids(self) -> List[str]:
+        return [f"{self.name}[{p}]" for p in self.params]
+
+
+CASES: Dict[str, Case] = {}
+
+
+def case(name: str, params: Sequence[Any]):
+    """Register a benchmark: `setup(fixtures, param)` returns the function to time."""
+    def register(setup):
+        CASES[name] = Case(name, setup, tuple(params))
+        return setup
+    return register
+
+
+@case("indicators", BARS)
+def _indicators(fx: Fixtures, bars: int):
+    tool, df = TechDataTool(), fx.bars(bars)
+    return lambda: tool._calculate_indicators(df)
+
+
+@case("indicators_universe", SYMBOLS)
+def _indicators_universe(fx: Fixtures, symbols: int):
+    frames = list(fx.universe(symbols).values())
+    return lambda: [calculate_indicators(df) for df in frames]
+
+
+@case("support_resistance", BARS)
+def _support_resistance(fx: Fixtures, bars: int):
+    tool, df = TechDataTool(), fx.bars(bars)
+    return lambda: tool._find_support_resistance(df)
+
+
+@case("fund_render", SYMBOLS)
+def _fund_render(fx: Fixtures, symbols: int):
+    tool = FundDataTool()
+    reports = [FundamentalData(**{**fx.fundamentals.__dict__, 'symbol': f"S{i:04d}"}) for i in range(symbols)]
+    return lambda: [tool.render(data) for data in reports]
+
+
+def _universe_file(fx: Fixtures, symbols: int) -> str:
+    # One CSV of `symbols` x 200 bars, rebuilt only when the fixture changes (the line index caches it by path)
+    version = int((fx.root / f"{fx.symbol}_history.csv.gz").stat().st_mtime)
+    path = Path(tempfile.gettempdir()) / f"vn_stock_bench_{fx.symbol}_{symbols}_{version}.csv"
+    if not path.exists():
+        frames = [df.assign(symbol=s) for s, df in fx.universe(symbols).items()]
+        pd.concat(frames).to_csv(path, index=False, columns=['symbol', 'time', 'open', 'high', 'low', 'close', 'volume'])
+    return str(path)
+
+
+@case("file_read_range", SYMBOLS)
+def _file_read_range(fx: Fixtures, symbols: int):
+    tool, path = FileReadTool(), _universe_file(fx, symbols)
+    middle = symbols * 100
+    return lambda: tool._run(file_path=path, start_line=middle, line_count=100)
+
+
+@case("file_read_query", SYMBOLS)
+def _file_read_query(fx: Fixtures, symbols: int):
+    tool, path = FileReadTool(), _universe_file(fx, symbols)
+    last = f"S{symbols - 1:04d}"
+    return lambda: tool._run(file_path=path, query=last, max_matches=20, max_bytes=4000)
+
+
+@case("brave_format", (5, 10, 20))
+def _brave_format(fx: Fixtures, count: int):
+    tool, data = BraveSearchTool(api_key="bench"), fx.brave
+    return lambda: tool._format_results(data, count)
+
+
+def measure(fn: Callable[[], Any], repeat: int = 5, min_time: float = 0.2) -> Dict[str, float]:
+    """Time `fn` timeit-style: calls per round chosen to last `min_time`, best and median of `repeat` rounds (ms per call)."""
+    timer = timeit.Timer(fn)
+    elapsed = timer.timeit(1)
+    number = max(1, int(min_time / elapsed)) if elapsed > 0 else 1000
+    rounds = [t / number * 1000 for t in timer.repeat(repeat=repeat, number=number)]
+    return {'min_ms': min(rounds), 'median_ms': statistics.median(rounds), 'number': number, 'rounds': repeat}
+
+
+def _matches(case_id: str, name: str, patterns: Sequence[str]) -> bool:
+    # Case ids contain brackets, which glob reads as character sets: also accept exact ids
+    return any(p in (case_id, name) or fnmatch.fnmatch(case_id, p) or fnmatch.fnmatch(name, p) for p in patterns)
+
+
+def select(patterns: Optional[Sequence[str]] = None, quick: bool = False) -> List[tuple]:
+    """Return (id, case, param) for the cases matching any glob pattern; `quick` keeps the smallest size."""
+    selected = []
+    for c in CASES.values():
+        for case_id, param in list(zip(c.ids(), c.params))[:1 if quick else None]:
+            if not patterns or _matches(case_id, c.name, patterns):
+                selected.append((case_id, c, param))
+    return selected
+
+
+def run(patterns: Optional[Sequence[str]] = None, fixtures: Optional[Fixtures] = None, quick: bool = False,
+        repeat: int = 5, min_time: float = 0.2, progress: bool = False) -> Dict[str, Dict[str, float]]:
+    """Run the selected cases; return {case id: timings}."""
+    fixtures = fixtures or Fixtures()
+    results = {}
+    for case_id, c, param in select(patterns, quick):
+        results[case_id] = measure(c.setup(fixtures, param), repeat=repeat, min_time=min_time)
+        if progress:
+            print(f"  {case_id}: {results[case_id]['min_ms']:,.3f} ms", file=sys.stderr)
+    return results
+
+
+def machine_id() -> str:
+    """Baselines are only comparable on the same kind of machine and interpreter."""
+    return f"{platform.system()}-{platform.machine()}-{os.cpu_count()}cpu-py{sys.version_info[0]}.{sys.version_info[1]}"
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR.parent,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def baseline_path(root: Optional[Path] = None) -> Path:
+    return (Path(root) if root else BENCH_DIR) / "baselines" / f"{machine_id()}.json"
+
+
+def load_baseline(root: Optional[Path] = None) -> Dict[str, Dict[str, float]]:
+    path = baseline_path(root)
+    return json.loads(path.read_text(encoding="utf-8"))['results'] if path.exists() else {}
+
+
+def save(results: Dict[str, Dict[str, float]], root: Optional[Path] = None) -> Path:
+    """Merge `results` into this machine's baseline and append them to the history."""
+    root = Path(root) if root else BENCH_DIR
+    record = {'commit': git_commit(), 'date': datetime.now().isoformat(timespec='seconds'), 'machine': machine_id()}
+    path = baseline_path(root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    baseline = {**load_baseline(root), **results}
+    path.write_text(json.dumps({**record, 'results': baseline}, indent=1, sort_keys=True), encoding="utf-8")
+    with open(root / "history.jsonl", "a", encoding="utf-8") as f:
+        f.write(json.dumps({**record, 'results': {k: round(v['min_ms'], 4) for k, v in results.items()}}) + "\n")
+    return path
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            tolerance: float = DEFAULT_TOLERANCE) -> pd.DataFrame:
+    """Best time per case against the baseline, with status "regression" past `tolerance`."""
+    rows = []
+    for case_id, timing in results.items():
+        base = baseline.get(case_id, {}).get('min_ms')
+        ratio = timing['min_ms'] / base if base else float('nan')
+        status = ("new" if base is None else "regression" if ratio > 1 + tolerance
+                  else "faster" if ratio < 1 - tolerance else "ok")
+        rows.append({'case': case_id, 'baseline_ms': base, 'min_ms': timing['min_ms'],
+                     'median_ms': timing['median_ms'], 'ratio': ratio, 'status': status})
+    return pd.DataFrame(rows).set_index('case') if rows else pd.DataFrame()
+
+
+def trend(patterns: Optional[Sequence[str]] = None, root: Optional[Path] = None) -> pd.DataFrame:
+    """Best time of each case (columns) per saved run (rows: date and commit), for this machine."""
+    path = (Path(root) if root else BENCH_DIR) / "history.jsonl"
+    if not path.exists():
+        return pd.DataFrame()
+    runs = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+    runs = [r for r in runs if r.get('machine') == machine_id()]
+    table = pd.DataFrame([r['results'] for r in runs],
+                         index=pd.MultiIndex.from_tuples([(r['date'], r['commit']) for r in runs], names=['date', 'commit']))
+    if patterns and not table.empty:
+        table = table[[c for c in table.columns if _matches(c, c, patterns)]]
+    return table
+
+
+def record(symbol: str, root: Optional[Path] = None, years: int = 10) -> List[Path]:
+    """Record `symbol`'s fixtures from vnstock (and the Brave API when BRAVE_API_KEY is set)."""
+    from vnstock import Vnstock
+
+    from vn_stock_advisor.data.financials import load_company_info
+
+    root = Path(root) if root else BENCH_DIR / "fixtures"
+    root.mkdir(parents=True, exist_ok=True)
+    stock = Vnstock().stock(symbol=symbol, source="TCBS")
+    end = datetime.now()
+    history = stock.quote.history(start=(end - timedelta(days=365 * years)).strftime("%Y-%m-%d"),
+                                  end=end.strftime("%Y-%m-%d"), interval="1D")
+    written = [root / f"{symbol}_history.csv.gz", root / f"{symbol}_ratios.csv", root / f"{symbol}_income.csv",
+               root / f"{symbol}_company.json"]
+    history.to_csv(written[0], index=False)
+    stock.finance.ratio(period="quarter").to_csv(written[1], index=False)
+    stock.finance.income_statement(period="quarter").to_csv(written[2], index=False)
+    full_name, industry = load_company_info(symbol)
+    written[3].write_text(json.dumps({'symbol': symbol, 'company_name': full_name, 'industry': industry},
+                                     ensure_ascii=False, indent=1), encoding="utf-8")
+
+    api_key = os.getenv("BRAVE_API_KEY")
+    if api_key:
+        import requests
+
+        response = requests.get("https://api.search.brave.com/res/v1/web/search",
+                                headers={"Accept": "application/json", "X-Subscription-Token": api_key},
+                                params={"q": f"{symbol} tin tức cổ phiếu", "count": 20}, timeout=30)
+        response.raise_for_status()
+        written.append(root / "brave_search.json")
+        written[-1].write_text(json.dumps(response.json(), ensure_ascii=False, indent=1), encoding="utf-8")
+    return written
+
+
+def main():
+    """Run the benchmarks against the stored baseline, record fixtures or show trends."""
+    parser = argparse.ArgumentParser(description="Đo hiệu năng các công cụ và phép tính chỉ báo trên dữ liệu mẫu.")
+    parser.add_argument("command", nargs="?", default="run", choices=["run", "record", "trend"],
+                        help="run: đo và so với mốc; record: ghi lại dữ liệu mẫu từ vnstock; trend: xu hướng qua các lần lưu")
+    parser.add_argument("-k", dest="patterns", action="append", help="Chỉ chạy các bài khớp mẫu, ví dụ 'indicators*'")
+    parser.add_argument("--quick", action="store_true", help="Chỉ đo kích thước dữ liệu nhỏ nhất của mỗi bài")
+    parser.add_argument("--repeat", type=int, default=5, help="Số vòng đo mỗi bài")
+    parser.add_argument("--save", action="store_true", help="Lưu kết quả làm mốc mới và ghi vào lịch sử")
+    parser.add_argument("--check", action="store_true", help="Thoát với mã lỗi 1 nếu có bài chậm hơn mốc")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Mức chậm hơn mốc cho phép (0.25 = 25%%)")
+    parser.add_argument("--symbol", help=f"Mã cổ phiếu của dữ liệu mẫu (mặc định {DEMO_SYMBOL}, dữ liệu tổng hợp)")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        if not args.symbol or args.symbol.upper() == DEMO_SYMBOL:
+            parser.error("record cần mã cổ phiếu thật, ví dụ --symbol HPG")
+        for path in record(args.symbol):
+            print(f"Đã ghi {path}")
+        return
+    if args.command == "trend":
+        table = trend(args.patterns)
+        print(table.to_string(float_format=lambda v: f"{v:,.3f}") if not table.empty
+              else "Chưa có lần đo nào được lưu trên máy này.")
+        return
+
+    started = time.perf_counter()
+    results = run(args.patterns, Fixtures(symbol=args.symbol or DEMO_SYMBOL), quick=args.quick, repeat=args.repeat, progress=True)
+    report = compare(results, load_baseline(), args.tolerance)
+    print(f"KẾT QUẢ ĐO HIỆU NĂNG ({machine_id()}, commit {git_commit()}, {time.perf_counter() - started:,.0f} s):")
+    print(report.to_string(float_format=lambda v: f"{v:,.3f}"))
+    if args.save:
+        print(f"Đã lưu mốc: {save(results)}")
+    regressions = report.index[report['status'] == "regression"].tolist()
+    if regressions:
+        print(f"Chậm hơn mốc quá {args.tolerance:.0%}: {', '.join(regressions)}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,25 @@
 from crewai import Agent, Crew, Process, Task, LLM
-from crewai.project import CrewBase, agent, crew, task
+from crewai.project import CrewBase, agent, crew, task, before_kickoff, after_kickoff
 from crewai.agents.agent_builder.base_agent import BaseAgent
-from crewai.knowledge.source.json_knowledge_source import JSONKnowledgeSource
-from crewai_tools import ScrapeWebsiteTool, WebsiteSearchTool, FirecrawlScrapeWebsiteTool
+from crewai.hooks import register_after_tool_call_hook, register_before_llm_call_hook
+from crewai_tools import FirecrawlScrapeWebsiteTool
 from vn_stock_advisor.tools.brave_search_tool import BraveSearchTool
 from vn_stock_advisor.tools.custom_tool import FundDataTool, TechDataTool, FileReadTool
+from vn_stock_advisor.tools.scrape_tool import BatchScrapeTool, CachedScrapeTool
+from vn_stock_advisor.tools.news_search_tool import NewsSearchTool
+from vn_stock_advisor.tools.knowledge_tool import KnowledgeSearchTool
+from vn_stock_advisor.data.news_corpus import NewsCorpus
+from vn_stock_advisor.data.scrape_cache import ScrapeCache
+from vn_stock_advisor.data.cassette import replaying
+from vn_stock_advisor.data.decision_ledger import DecisionLedger
+from vn_stock_advisor.utils.reducer import ArticleReducer
+from vn_stock_advisor.utils.crew_tracing import install_crew_tracing
+from vn_stock_advisor.utils.tracing import start_run
+from vn_stock_advisor.utils.token_budget import TokenBudget
 from pydantic import BaseModel, Field
 from typing import List, Literal
 from dotenv import load_dotenv
-import os, json
+import os, json, hashlib, contextvars
 import warnings
 warnings.filterwarnings("ignore") # Suppress unimportant warnings
 
@@ -39,36 +50,49 @@ openai_reasoning_llm = LLM(
     max_tokens=8192
 )
 
-# Initialize the tools
+# Initialize the tools shared by every crew; tools holding a run's date or stats are built per crew
 file_read_tool = FileReadTool(file_path="knowledge/PE_PB_industry_average.json")
-fund_tool=FundDataTool()
-tech_tool=TechDataTool(result_as_answer=True)
-scrape_tool = FirecrawlScrapeWebsiteTool(
+news_corpus = NewsCorpus()
+scrape_cache = ScrapeCache()
+# Replaying a cassette (VN_STOCK_CASSETTE_MODE=replay) needs no Firecrawl key
+firecrawl_tool = FirecrawlScrapeWebsiteTool(
+    api_key=FIRECRAWL_API_KEY or ("replay" if replaying() else None),
     onlyMainContent=True
 )
 search_tool = BraveSearchTool()
-web_search_tool = WebsiteSearchTool(
-    config=dict(
-        llm={
-            "provider": "openai",
-            "config": {
-                "model": OPENAI_MODEL,
-                "api_key": OPENAI_API_KEY
-            }
-        },
-        embedder={
-            "provider": "openai",
-            "config": {
-                "model": "text-embedding-3-small"
-            }
-        }
-    )
-)
+# Industry P/E, P/B averages, looked up through a persistent vector index (embedded once, not every run)
+knowledge_tool = KnowledgeSearchTool(paths=["knowledge/PE_PB_industry_average.json"])
 
-# Create a JSON knowledge source
-json_source = JSONKnowledgeSource(
-    file_paths=["PE_PB_industry_average.json"]
-)
+# Token budget of the crew run in progress: set in before_kickoff, inherited by the run's threads
+_run_budget: contextvars.ContextVar = contextvars.ContextVar("run_budget", default=None)
+
+def fit_tool_output(context):
+    """Trim long tool outputs to their budget before the agent reads them."""
+    budget = _run_budget.get()
+    if budget is None:
+        return context.tool_result
+    return budget.fit_tool_output(context.tool_result, context.agent, context.tool_name)
+
+def fit_prompt(context):
+    """Measure each prompt and compress task context and old observations to the agent's budget."""
+    budget = _run_budget.get()
+    if budget is not None:
+        budget.fit_messages(context.messages, context.agent)
+
+_budget_hooks_installed = False
+
+def install_budget_hooks():
+    """Register the token budget hooks once per process.
+
+    CrewAI hooks are global: registered per crew instance, they would pile up
+    with every crew built (one per symbol in batch runs) and trim and count
+    each call once per crew ever created.
+    """
+    global _budget_hooks_installed
+    if not _budget_hooks_installed:
+        register_after_tool_call_hook(fit_tool_output)
+        register_before_llm_call_hook(fit_prompt)
+        _budget_hooks_installed = True
 
 # Create Pydantic Models for Structured Output
 class InvestmentDecision(BaseModel):
@@ -81,6 +105,14 @@ class InvestmentDecision(BaseModel):
     fund_reasoning: str = Field(..., description="Giải thích quyết định từ góc độ phân tích cơ bản")
     tech_reasoning: str = Field(..., description="Giải thích quyết định từ góc độ phân tích kỹ thuật")
 
+def config_fingerprint() -> str:
+    """Short hash of the agent and task configuration, to compare decisions across prompt changes."""
+    digest = hashlib.sha1()
+    for name in ("agents.yaml", "tasks.yaml"):
+        with open(os.path.join(os.path.dirname(__file__), "config", name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
 @CrewBase
 class VnStockAdvisor():
     """VnStockAdvisor crew"""
@@ -89,11 +121,27 @@ class VnStockAdvisor():
     agents: List[BaseAgent] # ← auto-filled with all the @agent-decorated outputs
     tasks: List[Task]       # ← auto-filled with all the @task-decorated outputs
 
+    def __init__(self):
+        # Per crew, so crews running at the same time don't share an as-of date, stats or budgets
+        self.fund_tool = FundDataTool()
+        self.tech_tool = TechDataTool(result_as_answer=True)
+        self.news_search_tool = NewsSearchTool(corpus=news_corpus)
+        self.article_reducer = ArticleReducer()
+        self.scrape_tool = CachedScrapeTool(scraper=firecrawl_tool, cache=scrape_cache,
+                                            reducer=self.article_reducer, corpus=news_corpus)
+        self.batch_scrape_tool = BatchScrapeTool(scraper=self.scrape_tool)
+        # Prompt, tool output and task context budgets (VN_STOCK_*_BUDGET overrides them)
+        self.token_budget = TokenBudget.from_env()
+        # Its articles are already reduced: trimming the batch again would cut whole articles
+        self.token_budget.set_tool_budget(
+            self.batch_scrape_tool.name,
+            max(self.token_budget.tool_output, self.batch_scrape_tool.output_budget()))
+
     @agent
     def stock_news_researcher(self) -> Agent:
         return Agent(
             config=self.agents_config['stock_news_researcher'],
-            tools=[search_tool, scrape_tool],
+            tools=[self.news_search_tool, search_tool, self.batch_scrape_tool, self.scrape_tool],
             llm=openai_llm,
             verbose=True
         )
@@ -104,16 +152,8 @@ class VnStockAdvisor():
             config=self.agents_config["fundamental_analyst"],
             verbose=True,
             llm=openai_llm,
-            tools=[fund_tool, file_read_tool],
-            knowledge_sources=[json_source],
-            max_rpm=10,
-            embedder={
-                "provider": "openai",
-                "config": {
-                    "model": "text-embedding-3-small",
-                    "api_key": OPENAI_API_KEY,
-                }
-            }
+            tools=[self.fund_tool, file_read_tool, knowledge_tool],
+            max_rpm=10
         )
 
     @agent
@@ -122,18 +162,21 @@ class VnStockAdvisor():
             config=self.agents_config["technical_analyst"],
             verbose=True,
             llm=openai_llm,
-            tools=[tech_tool],
+            tools=[self.tech_tool],
             max_rpm=10
         )
     
     @agent
     def investment_strategist(self) -> Agent:
-        return Agent(
+        strategist = Agent(
             config=self.agents_config["investment_strategist"],
             verbose=True,
             llm=openai_reasoning_llm,
             max_rpm=10
         )
+        # Reads the three reports at once
+        self.token_budget.set_agent_budget(strategist, int(self.token_budget.prompt * 1.5))
+        return strategist
 
     @task
     def news_collecting(self) -> Task:
@@ -168,6 +211,40 @@ class VnStockAdvisor():
             output_file="final_decision.json"
         )
 
+    @before_kickoff
+    def remember_inputs(self, inputs):
+        self._inputs = inputs
+        # Analyze past dates without lookahead: tools only read data available on current_date
+        self.fund_tool.as_of_date = self.tech_tool.as_of_date = self.news_search_tool.as_of_date = inputs.get("current_date")
+        self.article_reducer.reset()
+        self.token_budget.reset()
+        _run_budget.set(self.token_budget)
+        install_budget_hooks()
+        # One trace per run; agent and LLM spans come from CrewAI's event bus
+        install_crew_tracing()
+        start_run()
+        return inputs
+
+    @after_kickoff
+    def record_decision(self, output):
+        """Append the final decision to the decision ledger for walk-forward evaluation."""
+        try:
+            decision = dict(output.json_dict or {})
+            if decision:
+                # The run's ISO date, not the LLM's today_date text, says which session the decision is for
+                DecisionLedger().append(
+                    [decision],
+                    config=config_fingerprint(),
+                    model=",".join(sorted({agent.llm.model for agent in self.agents})),
+                    date=self._inputs.get("current_date"),
+                )
+        except Exception as e:
+            print(f"Không thể lưu khuyến nghị vào sổ ghi: {e}")
+        if self.article_reducer.stats.articles:
+            print(self.article_reducer.stats.summary())
+        print(self.token_budget.summary_table())
+        return output
+
     @crew
     def crew(self) -> Crew:
         """Creates the VnStockAdvisor crew"""
@@ -0,0 +1,108 @@
+from datetime import date, datetime
+from typing import Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+DateLike = Union[str, date, datetime, pd.Timestamp, np.datetime64]
+
+# Weekday market closures announced by HOSE (Tết, Hùng Kings, Reunification Day,
+# Labour Day, National Day and their compensatory days off). Add a year here
+# once its schedule is published.
+HOSE_HOLIDAYS = {
+    2020: ["2020-01-01", "2020-01-23", "2020-01-24", "2020-01-27", "2020-01-28", "2020-01-29",
+           "2020-04-02", "2020-04-30", "2020-05-01", "2020-09-02"],
+    2021: ["2021-01-01", "2021-02-10", "2021-02-11", "2021-02-12", "2021-02-15", "2021-02-16",
+           "2021-04-21", "2021-04-30", "2021-05-03", "2021-09-02", "2021-09-03"],
+    2022: ["2022-01-03", "2022-01-31", "2022-02-01", "2022-02-02", "2022-02-03", "2022-02-04",
+           "2022-04-11", "2022-05-02", "2022-05-03", "2022-09-01", "2022-09-02"],
+    2023: ["2023-01-02", "2023-01-20", "2023-01-23", "2023-01-24", "2023-01-25", "2023-01-26",
+           "2023-05-01", "2023-05-02", "2023-05-03", "2023-09-01", "2023-09-04"],
+    2024: ["2024-01-01", "2024-02-08", "2024-02-09", "2024-02-12", "2024-02-13", "2024-02-14",
+           "2024-04-18", "2024-04-29", "2024-04-30", "2024-05-01", "2024-09-02", "2024-09-03"],
+    2025: ["2025-01-01", "2025-01-27", "2025-01-28", "2025-01-29", "2025-01-30", "2025-01-31",
+           "2025-04-07", "2025-04-30", "2025-05-01", "2025-05-02", "2025-09-01", "2025-09-02"],
+    2026: ["2026-01-01", "2026-02-16", "2026-02-17", "2026-02-18", "2026-02-19", "2026-02-20",
+           "2026-04-27", "2026-04-30", "2026-05-01", "2026-09-01", "2026-09-02"],
+}
+
+# Solar-calendar holidays, used for years without an announced schedule
+FIXED_HOLIDAYS = [(1, 1), (4, 30), (5, 1), (9, 2)]
+
+
+def _to_date(value: DateLike) -> np.datetime64:
+    return np.datetime64(pd.Timestamp(value).date(), "D")
+
+
+def default_holidays(first_year: int = 2000, last_year: Optional[int] = None) -> List[str]:
+    """Return HOSE closures for a range of years, falling back to the fixed-date holidays."""
+    last_year = last_year or date.today().year + 1
+    holidays = []
+    for year in range(first_year, last_year + 1):
+        if year in HOSE_HOLIDAYS:
+            holidays.extend(HOSE_HOLIDAYS[year])
+        else:
+            holidays.extend(f"{year}-{month:02d}-{day:02d}" for month, day in FIXED_HOLIDAYS)
+    return holidays
+
+
+class TradingCalendar:
+    """HOSE trading sessions: Monday to Friday, excluding market holidays.
+
+    Backed by numpy's business-day calendar, so counting or offsetting
+    sessions over many years is a single vectorized call.
+
+    Example:
+        >>> calendar = TradingCalendar()
+        >>> calendar.sessions_back("2025-02-03", 200)  # date of the 200th session ending on 2025-02-03
+    """
+
+    def __init__(self, holidays: Optional[Iterable[DateLike]] = None):
+        holidays = default_holidays() if holidays is None else holidays
+        self._busdaycal = np.busdaycalendar(
+            weekmask="1111100",
+            holidays=sorted({_to_date(d) for d in holidays}),
+        )
+
+    def is_trading_day(self, day: DateLike) -> bool:
+        return bool(np.is_busday(_to_date(day), busdaycal=self._busdaycal))
+
+    def previous_trading_day(self, day: DateLike, inclusive: bool = True) -> date:
+        """Return the last session on or before `day` (strictly before when not `inclusive`)."""
+        day = _to_date(day)
+        if not inclusive:
+            day = day - np.timedelta64(1, "D")
+        return np.busday_offset(day, 0, roll="backward", busdaycal=self._busdaycal).astype(date)
+
+    def next_trading_day(self, day: DateLike, inclusive: bool = True) -> date:
+        """Return the first session on or after `day` (strictly after when not `inclusive`)."""
+        day = _to_date(day)
+        if not inclusive:
+            day = day + np.timedelta64(1, "D")
+        return np.busday_offset(day, 0, roll="forward", busdaycal=self._busdaycal).astype(date)
+
+    def sessions_back(self, end: DateLike, count: int) -> date:
+        """Return the first date of the `count` sessions that end on (or before) `end`."""
+        last = np.busday_offset(_to_date(end), 0, roll="backward", busdaycal=self._busdaycal)
+        return np.busday_offset(last, -(count - 1), busdaycal=self._busdaycal).astype(date)
+
+    def sessions_between(self, start: DateLike, end: DateLike) -> int:
+        """Count sessions from `start` to `end`, both inclusive."""
+        end = _to_date(end) + np.timedelta64(1, "D")
+        return int(np.busday_count(_to_date(start), end, busdaycal=self._busdaycal))
+
+    def trading_days(self, start: DateLike, end: DateLike) -> pd.DatetimeIndex:
+        """Return every session from `start` to `end`, both inclusive."""
+        days = np.arange(_to_date(start), _to_date(end) + np.timedelta64(1, "D"), dtype="datetime64[D]")
+        return pd.DatetimeIndex(days[np.is_busday(days, busdaycal=self._busdaycal)])
+
+
+_default_calendar = None
+
+
+def get_calendar() -> TradingCalendar:
+    """Return the shared HOSE calendar."""
+    global _default_calendar
+    if _default_calendar is None:
+        _default_calendar = TradingCalendar()
+    return _default_calendar
@@ -0,0 +1,202 @@
+"""
+Record/replay of the external services: vnstock, Brave Search and Firecrawl.
+
+With VN_STOCK_CASSETTE pointing to a file, calls to these services go
+through a cassette: a single SQLite file of zlib-compressed pickles, one
+per distinct request. VN_STOCK_CASSETTE_MODE selects what happens:
+
+- "auto" (default): replay what is recorded, record the rest
+- "replay": never touch the network; an unrecorded call raises CassetteMiss
+- "record": always call the service and overwrite the recording
+
+Replayed runs are deterministic, need no Brave or Firecrawl key and run
+at full speed, so crews, benchmarks and the Streamlit UI can be exercised
+(or load-tested) offline without spending API quotas. API keys and other
+request headers are never recorded.
+"""
+
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, List, Optional
+
+import pandas as pd
+import requests
+
+from vn_stock_advisor.utils.tracing import count
+
+MODES = ("auto", "replay", "record")
+_MISSING = object()
+
+
+class CassetteMiss(LookupError):
+    """A call made in replay mode that the cassette has no recording for."""
+
+
+def _key_text(key: Any) -> str:
+    return json.dumps(key, sort_keys=True, ensure_ascii=False, default=str)
+
+
+class Cassette:
+    """Recorded responses of external calls, keyed by service and request.
+
+    Example:
+        >>> cassette = Cassette("runs/hpg.cassette", mode="auto")
+        >>> cassette.call("vnstock", ["HPG", "ratio", {"period": "quarter"}], fetch_ratios)
+    """
+
+    def __init__(self, path: str, mode: str = "auto"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode {mode!r}, expected one of {MODES}")
+        self.path = Path(path)
+        self.mode = mode
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("""CREATE TABLE IF NOT EXISTS interactions (
+                service TEXT NOT NULL, key TEXT NOT NULL, grp TEXT, recorded_at REAL NOT NULL,
+                payload BLOB NOT NULL, PRIMARY KEY (service, key))""")
+            self._db.execute("CREATE INDEX IF NOT EXISTS interactions_grp ON interactions (service, grp, recorded_at)")
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def _load(self, row) -> Any:
+        return pickle.loads(zlib.decompress(row[0])) if row else _MISSING
+
+    def get(self, service: str, key: Any) -> Any:
+        with self._lock:
+            row = self._db.execute("SELECT payload FROM interactions WHERE service = ? AND key = ?",
+                                   (service, _key_text(key))).fetchone()
+        return self._load(row)
+
+    def group(self, service: str, group: Any) -> List[Any]:
+        """Every recording of the same kind of request (e.g. the same bars over other date ranges), oldest first."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT payload FROM interactions WHERE service = ? AND grp = ? ORDER BY recorded_at",
+                (service, _key_text(group))).fetchall()
+        return [self._load(row) for row in rows]
+
+    def put(self, service: str, key: Any, value: Any, group: Any = None):
+        payload = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 6)
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO interactions VALUES (?, ?, ?, ?, ?)",
+                             (service, _key_text(key), _key_text(group) if group is not None else None,
+                              time.time(), payload))
+
+    def call(self, service: str, key: Any, fetch: Callable[[], Any], group: Any = None,
+             adapt: Optional[Callable[[List[Any]], Any]] = None,
+             keep: Optional[Callable[[Any], bool]] = None) -> Any:
+        """Return the recorded response to `key`, or `fetch()` it and record it.
+
+        In replay mode a call with no exact recording is answered from the
+        recordings in the same `group`: `adapt` builds the response from all
+        of them (oldest first), e.g. merging the bars of several date ranges;
+        without it the latest one is used. `keep` decides which live
+        responses are worth recording (not errors or rate limits).
+        """
+        if self.mode != "record":
+            value = self.get(service, key)
+            if value is _MISSING and self.replaying and group is not None:
+                recordings = self.group(service, group)
+                if recordings:
+                    value = adapt(recordings) if adapt is not None else recordings[-1]
+            if value is not _MISSING:
+                count("cassette_hits")
+                return value
+            if self.replaying:
+                raise CassetteMiss(f"{service} {_key_text(key)} chưa được ghi trong {self.path}")
+        value = fetch()
+        if keep is None or keep(value):
+            self.put(service, key, value, group)
+        return value
+
+    def entries(self) -> pd.DataFrame:
+        """One row per recording: service, key, time recorded and compressed size."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT service, key, recorded_at, length(payload) FROM interactions ORDER BY service, key").fetchall()
+        frame = pd.DataFrame(rows, columns=['service', 'key', 'recorded_at', 'bytes'])
+        frame['recorded_at'] = pd.to_datetime(frame['recorded_at'], unit='s')
+        return frame
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM interactions").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_cassettes = {}
+_active: Optional[Cassette] = None
+_registry_lock = threading.Lock()
+
+
+def get_cassette() -> Optional[Cassette]:
+    """Return the active cassette: the one set by use_cassette, else VN_STOCK_CASSETTE's, else None."""
+    if _active is not None:
+        return _active
+    path = os.getenv("VN_STOCK_CASSETTE")
+    if not path:
+        return None
+    mode = (os.getenv("VN_STOCK_CASSETTE_MODE") or "auto").lower()
+    with _registry_lock:
+        if (path, mode) not in _cassettes:
+            _cassettes[(path, mode)] = Cassette(path, mode)
+        return _cassettes[(path, mode)]
+
+
+@contextmanager
+def use_cassette(path: str, mode: str = "auto") -> Iterator[Cassette]:
+    """Route the calls made inside the block through the cassette at `path`."""
+    global _active
+    cassette, previous = Cassette(path, mode), _active
+    _active = cassette
+    try:
+        yield cassette
+    finally:
+        _active = previous
+        cassette.close()
+
+
+def replaying() -> bool:
+    cassette = get_cassette()
+    return cassette is not None and cassette.replaying
+
+
+def recorded(service: str, key: Any, fetch: Callable[[], Any], **kwargs) -> Any:
+    """`fetch()`, through the active cassette if there is one (see Cassette.call)."""
+    cassette = get_cassette()
+    return fetch() if cassette is None else cassette.call(service, key, fetch, **kwargs)
+
+
+def http_get(service: str, url: str, params: Optional[dict] = None, headers: Optional[dict] = None,
+             **kwargs) -> requests.Response:
+    """`requests.get` through the active cassette.
+
+    Only the URL and parameters identify a request and only the status and
+    body are recorded, so API keys in headers never reach the cassette.
+    Error responses (rate limits, outages) are not recorded.
+    """
+    def fetch():
+        response = requests.get(url, params=params, headers=headers, **kwargs)
+        return {'status': response.status_code, 'content': response.content, 'url': response.url}
+
+    recording = recorded(service, {'url': url, 'params': params}, fetch, keep=lambda r: r['status'] < 400)
+    response = requests.Response()
+    response.status_code = recording['status']
+    response._content = recording['content']
+    response.url = recording['url']
+    response.encoding = "utf-8"
+    return response
@@ -0,0 +1,186 @@
+import os
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from vn_stock_advisor.data.calendar import DateLike
+from vn_stock_advisor.utils.cache import get_cache_dir
+from vn_stock_advisor.utils.text import fold_diacritics
+
+# InvestmentDecision fields kept next to the normalized action
+DECISION_FIELDS = ['full_name', 'industry', 'decision', 'macro_reasoning', 'fund_reasoning', 'tech_reasoning']
+LEDGER_COLUMNS = ['decision_id', 'recorded_at', 'symbol', 'date', 'action', 'config', 'model', 'source'] + DECISION_FIELDS
+
+# A compaction lock older than this was left by a crashed process
+STALE_LOCK_SECONDS = 600
+
+ACTION_KEYWORDS = {
+    'BUY': ('mua', 'buy'),
+    'SELL': ('ban', 'sell'),
+    'HOLD': ('giu', 'hold', 'nam giu', 'theo doi', 'khong mua', 'khong ban', 'chua mua'),
+}
+# Longest phrases first, so "khong mua" wins over "mua"
+_KEYWORDS = sorted(((k, a) for a, ks in ACTION_KEYWORDS.items() for k in ks), key=lambda item: -len(item[0]))
+
+
+def normalize_action(decision: str) -> str:
+    """Map a free-text recommendation ("MUA", "**Bán**", "Giữ"...) to BUY, SELL, HOLD or UNKNOWN."""
+    text = " ".join(re.sub(r"[^\w]+", " ", fold_diacritics(str(decision or ""))).split())
+    # Prefer the phrase the recommendation starts with, then any phrase in it
+    for keyword, action in _KEYWORDS:
+        if text == keyword or text.startswith(keyword + " "):
+            return action
+    for keyword, action in _KEYWORDS:
+        if f" {keyword} " in f" {text} ":
+            return action
+    return 'UNKNOWN'
+
+
+class DecisionLedger:
+    """Append-only, columnar log of investment decisions.
+
+    Every append writes a new immutable segment (one compressed .npz with one
+    array per column), so writers never rewrite history and readers only load
+    segments they haven't seen yet. `compact` merges segments when there are
+    many small ones.
+
+    Example:
+        >>> ledger = DecisionLedger()
+        >>> ledger.append([final_decision], config="a1b2c3", model="gpt-4o-mini")
+        >>> ledger.read(symbols=["HPG"])
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root) if root else get_cache_dir("decisions")
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._segments: Dict[str, pd.DataFrame] = {}
+
+    def append(self, decisions: Iterable[dict], config: str = "", model: str = "", source: str = "crew",
+               date: Optional[DateLike] = None) -> pd.DataFrame:
+        """Record InvestmentDecision dicts and return the appended rows.
+
+        Args:
+            decisions: Dicts with the InvestmentDecision fields (stock_ticker,
+                today_date, decision, ...).
+            config: Identifier of the agent/task configuration that produced them.
+            model: LLM model name(s).
+            source: "crew" or "rules" (pre-filter summary).
+            date: Session the decisions were made for, e.g. the run's ISO
+                current_date. It takes precedence over their today_date, which
+                an LLM may write as "05/10/2026" or "Ngày 05 tháng 10".
+        """
+        rows = []
+        now = np.datetime64(datetime.now(), 'ns')
+        for decision in decisions:
+            day = date if date is not None else decision.get('today_date') or now
+            rows.append({
+                'decision_id': uuid.uuid4().hex,
+                'recorded_at': now,
+                'symbol': str(decision.get('stock_ticker', '')).strip().upper(),
+                'date': np.datetime64(pd.Timestamp(day).normalize(), 'ns'),
+                'action': normalize_action(decision.get('decision')),
+                'config': config,
+                'model': model,
+                'source': source,
+                **{name: str(decision.get(name) or '') for name in DECISION_FIELDS},
+            })
+        frame = pd.DataFrame(rows, columns=LEDGER_COLUMNS)
+        if frame.empty:
+            return frame
+
+        # Segment names sort in append order
+        with self._lock:
+            self._write_segment(f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}", frame)
+        return frame
+
+    def _write_segment(self, name: str, frame: pd.DataFrame):
+        arrays = {
+            column: frame[column].to_numpy(dtype='datetime64[ns]') if column in ('recorded_at', 'date')
+            else frame[column].to_numpy(dtype=str)
+            for column in LEDGER_COLUMNS
+        }
+        tmp_path = self.root / f"{name}.tmp.npz"
+        np.savez_compressed(tmp_path, **arrays)
+        os.replace(tmp_path, self.root / f"{name}.npz")
+
+    def segments(self) -> List[Path]:
+        return sorted(p for p in self.root.glob("*.npz") if not p.stem.endswith(".tmp"))
+
+    def _read_segment(self, path: Path) -> pd.DataFrame:
+        # Segments are immutable and never reuse a name, so the name identifies the contents
+        if path.stem not in self._segments:
+            with np.load(path) as arrays:
+                self._segments[path.stem] = pd.DataFrame({column: arrays[column] for column in LEDGER_COLUMNS})
+        return self._segments[path.stem]
+
+    def read(self, symbols: Optional[Iterable[str]] = None, start: Optional[DateLike] = None,
+             end: Optional[DateLike] = None) -> pd.DataFrame:
+        """Return recorded decisions in append order, optionally filtered by symbol and decision date."""
+        for attempt in range(3):
+            paths = self.segments()
+            live = {p.stem for p in paths}
+            self._segments = {k: v for k, v in self._segments.items() if k in live}
+            try:
+                frames = [self._read_segment(p) for p in paths]
+                break
+            except FileNotFoundError:
+                # Another process compacted the segments while we listed them
+                if attempt == 2:
+                    raise
+        if not frames:
+            return pd.DataFrame(columns=LEDGER_COLUMNS)
+        ledger = pd.concat(frames, ignore_index=True)
+        if symbols is not None:
+            ledger = ledger[ledger['symbol'].isin([s.strip().upper() for s in symbols])]
+        if start is not None:
+            ledger = ledger[ledger['date'] >= pd.Timestamp(start).normalize()]
+        if end is not None:
+            ledger = ledger[ledger['date'] <= pd.Timestamp(end).normalize()]
+        return ledger.reset_index(drop=True)
+
+    def compact(self) -> int:
+        """Merge every segment into one and return the number of segments merged.
+
+        Returns 0 without merging while another process compacts the ledger.
+        """
+        with self._lock:
+            lock_path = self.root / "compact.lock"
+            if not self._acquire(lock_path):
+                return 0
+            try:
+                paths = self.segments()
+                if len(paths) < 2:
+                    return len(paths)
+                ledger = pd.concat([self._read_segment(p) for p in paths], ignore_index=True)
+                # A new name (other readers cache segments by name) with the newest segment's time,
+                # so later appends still sort after it
+                self._write_segment(f"{paths[-1].stem.split('-')[0]}-{uuid.uuid4().hex[:8]}", ledger)
+                for path in paths:
+                    path.unlink()
+                return len(paths)
+            finally:
+                lock_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _acquire(lock_path: Path) -> bool:
+        """Create `lock_path` unless another process holds it (taking over locks left by crashed processes)."""
+        for _ in range(2):
+            try:
+                os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return True
+            except FileExistsError:
+                try:
+                    if time.time() - lock_path.stat().st_mtime < STALE_LOCK_SECONDS:
+                        return False
+                    lock_path.unlink()
+                except FileNotFoundError:
+                    pass
+        return False
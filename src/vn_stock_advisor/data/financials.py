@@ -0,0 +1,143 @@
+import os
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from vn_stock_advisor.data.calendar import DateLike
+from vn_stock_advisor.data.providers import get_provider
+from vn_stock_advisor.utils.cache import get_cache_dir
+from vn_stock_advisor.utils.tracing import count
+
+# Listed companies must publish quarterly statements within 20 days of the
+# quarter end (30 for parent companies, 45 days if reviewed); reports are
+# assumed public only after the longest of these delays to avoid lookahead.
+REPORT_LAG_DAYS = 45
+
+# How long downloaded statements are reused for current analyses
+FINANCIALS_MAX_AGE = timedelta(hours=12)
+COMPANY_MAX_AGE = timedelta(days=7)
+
+
+def report_period_ends(df: pd.DataFrame) -> Optional[pd.Series]:
+    """Return the period end date of every row of a vnstock financial report, or None if unknown.
+
+    Understands TCBS (year/quarter columns), VCI (yearReport/lengthReport)
+    and "2024-Q4" style indexes. Quarter 5 (or 0) denotes a yearly report.
+    """
+    columns = {str(c).lower(): c for c in df.columns}
+    if 'year' in columns and 'quarter' in columns:
+        year, quarter = df[columns['year']], df[columns['quarter']]
+    elif 'yearreport' in columns and 'lengthreport' in columns:
+        year, quarter = df[columns['yearreport']], df[columns['lengthreport']]
+    else:
+        parsed = df.index.astype(str).str.extract(r'(\d{4})\D*[Qq]?(\d)?')
+        if parsed[0].isna().any():
+            return None
+        year, quarter = parsed[0], parsed[1].fillna(4)
+    year = pd.to_numeric(pd.Series(np.asarray(year), index=df.index), errors='coerce')
+    quarter = pd.to_numeric(pd.Series(np.asarray(quarter), index=df.index), errors='coerce')
+    if year.isna().any():
+        return None
+    quarter = quarter.where(quarter.between(1, 4), 4).fillna(4).astype(int)
+    first_day = pd.to_datetime(pd.DataFrame({'year': year.astype(int), 'month': quarter * 3, 'day': 1}))
+    return first_day + pd.offsets.MonthEnd(0)
+
+
+def published_before(df: pd.DataFrame, as_of: Optional[DateLike], lag_days: int = REPORT_LAG_DAYS) -> pd.DataFrame:
+    """Return the rows of a financial report already published on `as_of`, newest first.
+
+    Without `as_of`, `df` is returned unchanged (vnstock lists the newest
+    period first). When the report periods can't be determined no row is
+    known to be published, so none is returned.
+    """
+    if as_of is None or df is None or df.empty:
+        return df
+    ends = report_period_ends(df)
+    if ends is None:
+        return df.iloc[:0]
+    published = (ends + pd.Timedelta(days=lag_days) <= pd.Timestamp(as_of).normalize()).to_numpy()
+    newest_first = np.argsort(-ends.to_numpy()[published].astype('int64'), kind='stable')
+    return df[published].iloc[newest_first]
+
+
+class FinancialDataCache:
+    """Local cache of downloaded vnstock reports, one pickle per (symbol, kind).
+
+    A cached report is served while it is fresh; for an as-of date in the
+    past it is served as long as it was downloaded after every report
+    published before that date could have appeared, so batch re-runs over
+    many historical dates download each report once.
+
+    Example:
+        >>> cache = FinancialDataCache()
+        >>> ratios = cache.get("HPG", "ratio_quarter", lambda: stock.finance.ratio(period="quarter"))
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root) if root else get_cache_dir("financials")
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, symbol: str, kind: str) -> Path:
+        return self.root / f"{symbol.strip().upper()}_{kind}.pkl"
+
+    def get(self, symbol: str, kind: str, fetch: Callable[[], pd.DataFrame],
+            max_age: timedelta = FINANCIALS_MAX_AGE, as_of: Optional[DateLike] = None) -> pd.DataFrame:
+        """Return the cached report or call `fetch` and cache its result."""
+        path = self._path(symbol, kind)
+        if path.exists():
+            fetched_at = pd.Timestamp(path.stat().st_mtime, unit='s')
+            fresh = pd.Timestamp.now() - fetched_at < pd.Timedelta(max_age)
+            covers = as_of is not None and fetched_at >= pd.Timestamp(as_of).normalize() + pd.Timedelta(days=1)
+            if fresh or covers:
+                count("cache_hits")
+                return pd.read_pickle(path)
+
+        data = fetch()
+        if data is not None and not data.empty:
+            with self._lock:
+                tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.{time.time_ns()}.tmp")
+                data.to_pickle(tmp_path)
+                os.replace(tmp_path, path)
+        return data
+
+
+_cache = None
+
+
+def get_financial_cache() -> FinancialDataCache:
+    """Return the process-wide financial report cache."""
+    global _cache
+    if _cache is None:
+        _cache = FinancialDataCache()
+    return _cache
+
+
+def load_company_info(symbol: str, source: Optional[str] = None, cache: Optional[FinancialDataCache] = None):
+    """Return (full_name, industry) for `symbol`, from the local cache where possible.
+
+    `source` pins a vnstock source; by default the provider picks the fastest healthy one.
+    """
+    cache = cache or get_financial_cache()
+    provider, sources = get_provider(), [source] if source else None
+    profile = cache.get(symbol, "profile", lambda: provider.profile(symbol, sources), max_age=COMPANY_MAX_AGE)
+    overview = cache.get(symbol, "overview", lambda: provider.overview(symbol, sources), max_age=COMPANY_MAX_AGE)
+    full_name = profile["company_name"].iloc[0] if "company_name" in profile.columns and not profile.empty else symbol
+    industry = overview["industry"].iloc[0] if "industry" in overview.columns and not overview.empty else "Unknown"
+    return full_name, industry
+
+
+def load_financial_reports(symbol: str, as_of: Optional[DateLike] = None, source: Optional[str] = None,
+                           cache: Optional[FinancialDataCache] = None):
+    """Return quarterly (ratios, income statement) as known on `as_of` (default: today), newest first."""
+    cache = cache or get_financial_cache()
+    provider, sources = get_provider(), [source] if source else None
+    ratios = cache.get(symbol, "ratio_quarter", lambda: provider.ratio(symbol, "quarter", sources), as_of=as_of)
+    income = cache.get(symbol, "income_quarter", lambda: provider.income_statement(symbol, "quarter", sources),
+                       as_of=as_of)
+    return published_before(ratios, as_of), published_before(income, as_of)
@@ -0,0 +1,141 @@
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from vn_stock_advisor.data.calendar import DateLike
+from vn_stock_advisor.data.financials import (
+    FinancialDataCache,
+    load_company_info,
+    load_financial_reports,
+    report_period_ends,
+)
+from vn_stock_advisor.data.schema import SchemaResolver
+
+# Possible column names for each financial ratio, by data source (TCBS, then VCI)
+RATIO_ALIASES = {
+    'price_to_earning': ['price_to_earning', 'pe', 'P/E', 'p_e_ratio'],
+    'price_to_book': ['price_to_book', 'pb', 'P/B', 'p_b_ratio'],
+    'roe': ['roe', 'ROE', 'return_on_equity', 'return_on_equity_percent', 'ROE (%)'],
+    'roa': ['roa', 'ROA', 'return_on_assets', 'return_on_assets_percent', 'ROA (%)'],
+    'earning_per_share': ['earning_per_share', 'eps', 'EPS', 'earnings_per_share', 'EPS (VND)'],
+    'debt_on_equity': ['debt_on_equity', 'de', 'D/E', 'debt_equity_ratio', 'Debt/Equity'],
+    'gross_profit_margin': ['gross_profit_margin', 'gross_margin', 'profit_margin', 'Gross Profit Margin (%)'],
+    'value_before_ebitda': ['value_before_ebitda', 'ev_ebitda', 'ev_ebitda_ratio', 'EV/EBITDA']
+}
+RATIO_SCHEMA = SchemaResolver(RATIO_ALIASES)
+
+# Income statement lines that get growth rates and trailing twelve month sums
+INCOME_FIELDS = ['revenue', 'gross_profit', 'post_tax_profit']
+
+
+def _quarter_numbers(df: pd.DataFrame) -> np.ndarray:
+    """Return a running quarter number per row (year * 4 + quarter), or row positions if unknown."""
+    ends = report_period_ends(df)
+    if ends is None:
+        # vnstock lists the newest period first
+        return np.arange(len(df))[::-1]
+    return (ends.dt.year * 4 + (ends.dt.month - 1) // 3).to_numpy()
+
+
+def _growth(current: np.ndarray, previous: np.ndarray) -> np.ndarray:
+    # Growth from a loss or a zero base is meaningless
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(previous > 0, current / previous - 1, np.nan)
+
+
+def income_panel(income: pd.DataFrame) -> pd.DataFrame:
+    """Add growth, trailing twelve month and margin columns to a quarterly income statement.
+
+    For every field in INCOME_FIELDS present: `{field}_qoq`, `{field}_yoy`
+    (against the previous quarter and the same quarter a year earlier) and
+    `{field}_ttm` (sum of the last four quarters, NaN if one is missing);
+    plus `gross_margin`, `net_margin` and `ttm_net_margin`. Quarters are
+    matched by report period, so a missing quarter yields NaN rather than
+    comparing against the wrong one.
+    """
+    panel = income.copy()
+    fields = [f for f in INCOME_FIELDS if f in panel.columns]
+    if panel.empty or not fields:
+        return panel
+
+    quarters = _quarter_numbers(panel)
+    values = panel[fields].apply(pd.to_numeric, errors='coerce')
+    current = values.to_numpy(dtype=float)
+    by_quarter = pd.DataFrame(current, index=quarters)
+    by_quarter = by_quarter[~by_quarter.index.duplicated()]
+    lagged = lambda k: by_quarter.reindex(quarters - k).to_numpy()
+
+    previous, year_ago = lagged(1), lagged(4)
+    ttm = current + lagged(1) + lagged(2) + lagged(3)
+    for i, field in enumerate(fields):
+        panel[f'{field}_qoq'] = _growth(current[:, i], previous[:, i])
+        panel[f'{field}_yoy'] = _growth(current[:, i], year_ago[:, i])
+        panel[f'{field}_ttm'] = ttm[:, i]
+
+    if 'revenue' in fields:
+        revenue = values['revenue'].where(values['revenue'] != 0)
+        revenue_ttm = panel['revenue_ttm'].where(panel['revenue_ttm'] != 0)
+        if 'gross_profit' in fields:
+            panel['gross_margin'] = values['gross_profit'] / revenue
+        if 'post_tax_profit' in fields:
+            panel['net_margin'] = values['post_tax_profit'] / revenue
+            panel['ttm_net_margin'] = panel['post_tax_profit_ttm'] / revenue_ttm
+    return panel
+
+
+@dataclass
+class FundamentalData:
+    """Financial reports of one company as known on an analysis date.
+
+    `ratios` and `income` keep the whole quarterly history vnstock returned
+    (newest first), so screeners and reports can reuse a single fetch;
+    `income` carries the derived columns of `income_panel`.
+    """
+    symbol: str
+    full_name: str
+    industry: str
+    ratios: pd.DataFrame
+    income: pd.DataFrame
+    as_of: Optional[pd.Timestamp] = None
+
+    @property
+    def latest_ratios(self) -> pd.Series:
+        return self.ratios.iloc[0] if not self.ratios.empty else pd.Series(dtype=float)
+
+    def ratio_panel(self, names: Optional[List[str]] = None) -> pd.DataFrame:
+        """Return ratios under their canonical names over all quarters, newest first."""
+        return RATIO_SCHEMA.select(self.ratios, names)
+
+    def ratio_history(self, name: str) -> pd.Series:
+        """Return one ratio over all quarters, newest first, whichever column name the source uses."""
+        return self.ratio_panel([name])[name]
+
+    def ratio(self, name: str) -> Optional[float]:
+        """Return the latest value of a ratio, or None if unavailable."""
+        values = self.ratio_panel([name]).head(1)[name]
+        return float(values.iloc[0]) if not values.empty and pd.notna(values.iloc[0]) else None
+
+    def latest(self, column: str) -> Optional[float]:
+        """Return the latest quarter's value of an income panel column, or None if unavailable."""
+        if column not in self.income.columns or self.income.empty:
+            return None
+        value = pd.to_numeric(self.income[column].iloc[0], errors='coerce')
+        return float(value) if pd.notna(value) else None
+
+
+def load_fundamentals(symbol: str, as_of: Optional[DateLike] = None, source: Optional[str] = None,
+                      cache: Optional[FinancialDataCache] = None) -> FundamentalData:
+    """Load ratios, income statements and company info of `symbol` as known on `as_of` (default: today)."""
+    symbol = symbol.strip().upper()
+    ratios, income = load_financial_reports(symbol, as_of=as_of, source=source, cache=cache)
+    full_name, industry = load_company_info(symbol, source=source, cache=cache)
+    return FundamentalData(
+        symbol=symbol,
+        full_name=full_name,
+        industry=industry,
+        ratios=ratios,
+        income=income_panel(income),
+        as_of=pd.Timestamp(as_of).normalize() if as_of is not None else None,
+    )
@@ -0,0 +1,136 @@
+import math
+from datetime import date, datetime, timedelta
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from vn_stock_advisor.data.calendar import DateLike, TradingCalendar, get_calendar
+from vn_stock_advisor.data.intraday import BASE_INTERVAL, aggregate_bars, bars_per_session
+from vn_stock_advisor.data.price_store import PriceStore, normalize_bars
+from vn_stock_advisor.data.providers import get_provider
+
+# Extra sessions fetched beyond the requested bars, to absorb stock-specific
+# trading halts and unlisted market closures
+SAFETY_SESSIONS = 5
+# Stored sessions fetched again with every update; when their closes changed,
+# the source adjusted its prices (dividend, split) and the whole stored
+# history is fetched again rather than mixing adjusted and unadjusted bars
+REVISION_CHECK_SESSIONS = 5
+
+
+def fetch_vnstock_history(symbol: str, start: date, end: date, interval: str = "1D",
+                          source: Optional[str] = None) -> pd.DataFrame:
+    """Fetch price bars for `symbol` from vnstock, from `source` or the fastest healthy one."""
+    return get_provider().history(symbol, start, end, interval=interval, sources=[source] if source else None)
+
+
+class HistoryLoader:
+    """Load the last N daily sessions for a symbol, from the local store where possible.
+
+    The start date is derived from the HOSE trading calendar, so asking for
+    200 bars fetches about 200 sessions instead of a fixed number of calendar
+    days, and only the part of that range missing from the local store is
+    downloaded.
+
+    Example:
+        >>> loader = HistoryLoader()
+        >>> price_data = loader.load("HPG", bars=200)
+    """
+
+    def __init__(
+        self,
+        store: Optional[PriceStore] = None,
+        calendar: Optional[TradingCalendar] = None,
+        fetcher: Optional[Callable[..., pd.DataFrame]] = None,
+        source: Optional[str] = None,
+    ):
+        self.store = store or PriceStore()
+        self.calendar = calendar or get_calendar()
+        self.fetcher = fetcher or fetch_vnstock_history
+        self.source = source
+        self._listing_start = {}
+
+    def load(self, symbol: str, bars: int, end: Optional[DateLike] = None, interval: str = "1D") -> pd.DataFrame:
+        """Return up to `bars` sessions ending on `end` (default today), oldest first.
+
+        Args:
+            symbol: Stock symbol.
+            bars: Number of sessions needed, e.g. the longest indicator window.
+            end: Last date of the window.
+            interval: Bar interval. Session arithmetic assumes daily bars.
+        """
+        symbol = symbol.strip().upper()
+        end_day = pd.Timestamp(end or datetime.now()).date()
+        last_session = self.calendar.previous_trading_day(end_day)
+        first_session = self.calendar.sessions_back(last_session, bars + SAFETY_SESSIONS)
+
+        coverage = self.store.coverage(symbol, interval)
+        if coverage is None:
+            self._fetch(symbol, first_session, end_day, interval)
+        else:
+            stored_first, stored_last = coverage[0].date(), coverage[1].date()
+            if stored_last < last_session or stored_last == end_day == date.today():
+                # Newer sessions are missing, or today's bar may still be forming
+                self._update(symbol, stored_first, end_day, interval)
+
+            history = self.store.read(symbol, start=first_session, end=end_day, interval=interval)
+            if len(history) < bars and stored_first > first_session and symbol not in self._listing_start:
+                # Older sessions are missing: fetch only the head of the window
+                fetched = self._fetch(symbol, first_session, stored_first - timedelta(days=1), interval)
+                if not fetched:
+                    # Nothing earlier exists (recent listing), don't ask again
+                    self._listing_start[symbol] = stored_first
+
+        history = self.store.read(symbol, start=first_session, end=end_day, interval=interval)
+        return history.tail(bars).reset_index(drop=True)
+
+    def load_intraday(self, symbol: str, interval: str, bars: int, end: Optional[DateLike] = None,
+                      base_interval: str = BASE_INTERVAL) -> pd.DataFrame:
+        """Return the last `bars` intraday bars of `interval` (5m, 15m, 1H...) ending on `end`, oldest first.
+
+        Only `base_interval` bars are fetched and stored; every other
+        interval is aggregated from them, so 15m and 1H share one download.
+        """
+        symbol = symbol.strip().upper()
+        end_day = pd.Timestamp(end or datetime.now()).date()
+        last_session = self.calendar.previous_trading_day(end_day)
+        sessions = math.ceil(bars / bars_per_session(interval)) + SAFETY_SESSIONS
+        first_session = self.calendar.sessions_back(last_session, sessions)
+
+        coverage = self.store.coverage(symbol, base_interval)
+        if coverage is None or coverage[0].date() > first_session:
+            self._fetch(symbol, first_session, end_day, base_interval)
+        elif coverage[1].date() < last_session or coverage[1].date() == end_day == date.today():
+            # Refetch from the last stored day, which may have been stored mid-session
+            self._fetch(symbol, coverage[1].date(), end_day, base_interval)
+
+        base = self.store.read(symbol, start=first_session, end=end_day, interval=base_interval)
+        if interval != base_interval:
+            base = aggregate_bars(base, interval)
+        return base.tail(bars).reset_index(drop=True)
+
+    def _update(self, symbol: str, stored_first: date, end: date, interval: str):
+        """Fetch the bars after the stored ones, overlapping the last stored sessions to catch adjustments."""
+        recent = self.store.tail(symbol, REVISION_CHECK_SESSIONS, interval=interval)
+        bars = self.fetcher(symbol, recent['time'].iloc[0].date(), end, interval=interval, source=self.source)
+        if bars is None or bars.empty:
+            return
+        bars = normalize_bars(bars)
+        # The last stored bar may have been stored mid-session, so only the earlier ones tell
+        overlap = recent.iloc[:-1].merge(bars, on='time', suffixes=('_stored', ''))
+        if len(overlap) and not np.allclose(overlap['close'], overlap['close_stored'], rtol=1e-9, atol=0):
+            # The source adjusted its history: replace the stored range instead of merging into it
+            self._fetch(symbol, stored_first, end, interval, replace=True)
+        else:
+            self.store.write(symbol, bars, interval)
+
+    def _fetch(self, symbol: str, start: date, end: date, interval: str, replace: bool = False) -> int:
+        """Fetch bars into the store and return how many were received."""
+        if start > end:
+            return 0
+        bars = self.fetcher(symbol, start, end, interval=interval, source=self.source)
+        if bars is None or bars.empty:
+            return 0
+        self.store.write(symbol, normalize_bars(bars), interval, replace=replace)
+        return len(bars)
@@ -0,0 +1,106 @@
+import math
+from typing import List, Optional
+
+import pandas as pd
+
+# Supported intraday intervals, in minutes
+INTRADAY_MINUTES = {'1m': 1, '5m': 5, '15m': 15, '30m': 30, '1H': 60}
+# Interval fetched from vnstock and aggregated into the others
+BASE_INTERVAL = '1m'
+
+# HOSE trading hours: morning 09:00-11:30, afternoon 13:00-14:45 (ATC included;
+# data sources stamp the closing auction's bar 14:45)
+SESSIONS = (((9, 0), (11, 30)), ((13, 0), (14, 45)))
+_SESSION_MINUTES = tuple((sh * 60 + sm, eh * 60 + em) for (sh, sm), (eh, em) in SESSIONS)
+_NS_PER_MINUTE = 60 * 10**9
+
+
+def is_intraday(interval: str) -> bool:
+    return interval in INTRADAY_MINUTES
+
+
+def bars_per_session(interval: str) -> int:
+    """Return how many bars of `interval` one trading day has (a bar never spans the lunch break)."""
+    minutes = INTRADAY_MINUTES[interval]
+    return sum(math.ceil(((eh - sh) * 60 + em - sm) / minutes) for (sh, sm), (eh, em) in SESSIONS)
+
+
+def session_end(minute_of_day: int) -> Optional[int]:
+    """Return the end (minute of the day) of the session a bar starting at `minute_of_day` belongs to."""
+    ends = [end for start, end in _SESSION_MINUTES if start <= minute_of_day]
+    return ends[-1] if ends else None
+
+
+def bucket_start(times, interval: str) -> pd.DatetimeIndex:
+    """Return the start of the `interval` bar each time falls in."""
+    return pd.DatetimeIndex(times).floor(f"{INTRADAY_MINUTES[interval]}min")
+
+
+def aggregate_bars(bars: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """Aggregate finer OHLCV bars (oldest first) into `interval` bars, all at once."""
+    if bars.empty:
+        return bars.copy()
+    grouped = bars.groupby(bucket_start(bars['time'], interval), sort=True)
+    result = grouped.agg(open=('open', 'first'), high=('high', 'max'), low=('low', 'min'),
+                         close=('close', 'last'), volume=('volume', 'sum'))
+    return result.rename_axis('time').reset_index()
+
+
+class BarAggregator:
+    """Build `interval` bars from a stream of finer bars, holding only the bar being formed.
+
+    A bar is emitted as soon as the incoming bar reaches its end, or the end
+    of the morning/afternoon session (a bar stamped at or after it, like the
+    14:45 closing auction, closes at once), so it doesn't wait for the next
+    bar to arrive (after lunch, or the next day).
+
+    Example:
+        >>> aggregator = BarAggregator("15m", base_interval="1m")
+        >>> for bar in aggregator.push(time, open, high, low, close, volume):  # empty until a bar closes
+    """
+
+    def __init__(self, interval: str, base_interval: str = BASE_INTERVAL):
+        self.interval = interval
+        self.minutes = INTRADAY_MINUTES[interval]
+        self.base_minutes = INTRADAY_MINUTES[base_interval]
+        self.current: Optional[dict] = None
+        self._start = None
+
+    def push(self, time, open_, high, low, close, volume) -> List[dict]:
+        """Add one finer bar and return the `interval` bars it completes (usually none or one)."""
+        # Integer minute arithmetic: every interval divides a day, so buckets align with midnight
+        minute = pd.Timestamp(time).value // _NS_PER_MINUTE
+        start = minute - minute % self.minutes
+        completed = []
+        if self.current is not None and self._start != start:
+            # A bar that never reached its end (e.g. a missing last minute) closes when the next one starts
+            completed.append(self.current)
+            self.current = None
+
+        if self.current is None:
+            self._start = start
+            self.current = {'time': pd.Timestamp(start * _NS_PER_MINUTE), 'open': open_, 'high': high,
+                            'low': low, 'close': close, 'volume': volume}
+        else:
+            bar = self.current
+            bar['high'] = max(bar['high'], high)
+            bar['low'] = min(bar['low'], low)
+            bar['close'] = close
+            bar['volume'] += volume
+
+        end = minute + self.base_minutes
+        closing = session_end(minute % 1440)
+        if end >= start + self.minutes or (closing is not None and minute % 1440 + self.base_minutes >= closing):
+            completed.append(self.current)
+            self.current = None
+        return completed
+
+    def resume(self, bar: dict):
+        """Continue forming `bar` (an aggregated, possibly incomplete bar from history)."""
+        self.current = dict(bar, time=pd.Timestamp(bar['time']))
+        self._start = self.current['time'].value // _NS_PER_MINUTE
+
+    def flush(self) -> Optional[dict]:
+        """Return and clear the bar being formed, e.g. at the end of the day."""
+        bar, self.current = self.current, None
+        return bar
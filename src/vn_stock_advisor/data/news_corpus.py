@@ -0,0 +1,210 @@
+import hashlib
+import re
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from vn_stock_advisor.data.calendar import DateLike
+from vn_stock_advisor.data.scrape_cache import canonical_url
+from vn_stock_advisor.utils.cache import get_cache_dir
+from vn_stock_advisor.utils.reducer import strip_boilerplate
+from vn_stock_advisor.utils.text import fold_diacritics
+
+_HEADING = re.compile(r'^\s*#{1,2}\s+(.+?)\s*#*\s*$', re.MULTILINE)
+_VN_DATE = re.compile(r'\b(\d{1,2})[/-](\d{1,2})[/-](\d{4})\b')
+_ISO_DATE = re.compile(r'\b(\d{4})-(\d{2})-(\d{2})\b')
+_WORD = re.compile(r'\w+')
+# The publication date is looked for right below (or just above) the headline: page
+# headers show today's date and article bodies quote the dates of other events
+DATE_LINES_AFTER = 6
+DATE_LINES_BEFORE = 2
+
+# `published` is NULL when the article's date is unknown
+_ARTICLES = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    url TEXT UNIQUE NOT NULL,
+    title TEXT NOT NULL,
+    published TEXT,
+    source TEXT NOT NULL,
+    body TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    added_at TEXT NOT NULL
+);
+"""
+_SCHEMA = _ARTICLES + """
+CREATE INDEX IF NOT EXISTS articles_published ON articles (published);
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5 (title, body, tokenize = 'unicode61');
+"""
+# Corpora created before undated articles were stored declare `published` NOT NULL
+_ALLOW_UNDATED = """
+ALTER TABLE articles RENAME TO articles_old;
+""" + _ARTICLES + """
+INSERT INTO articles SELECT * FROM articles_old;
+DROP TABLE articles_old;
+CREATE INDEX IF NOT EXISTS articles_published ON articles (published);
+"""
+
+
+def _line_date(line: str) -> Optional[date]:
+    for match in _VN_DATE.finditer(line):
+        day, month, year = map(int, match.groups())
+        try:
+            return date(year, month, day)
+        except ValueError:
+            continue
+    for match in _ISO_DATE.finditer(line):
+        try:
+            return date(*map(int, match.groups()))
+        except ValueError:
+            continue
+    return None
+
+
+def article_metadata(markdown: str) -> Dict[str, Optional[str]]:
+    """Guess the title (first heading, else first line) and publication date of a scraped article.
+
+    The date is the first one on the lines just below the title, else just
+    above it; it is None when there is none there.
+    """
+    heading = _HEADING.search(markdown)
+    lines = strip_boilerplate(markdown)
+    title = heading.group(1) if heading else (lines[0] if lines else '')
+    page = markdown.splitlines()
+    if heading:
+        title_line = markdown.count("\n", 0, heading.start(1))
+    else:
+        title_line = next((i for i, line in enumerate(page) if title and title in line), 0)
+    nearby = page[title_line + 1:title_line + 1 + DATE_LINES_AFTER] + \
+        page[max(title_line - DATE_LINES_BEFORE, 0):title_line][::-1]
+    published = next((day for day in map(_line_date, nearby) if day is not None), None)
+    return {'title': title[:300], 'published': published.isoformat() if published else None}
+
+
+def match_query(query: str) -> Optional[str]:
+    """Build an FTS5 MATCH expression from free text, diacritics folded.
+
+    Adjacent syllables become phrases ("lai suat") and single syllables
+    alternatives, all OR-ed: bm25 then ranks articles matching the most
+    (and rarest) phrases first.
+    """
+    words = _WORD.findall(fold_diacritics(query))
+    if not words:
+        return None
+    phrases = [f'"{a} {b}"' for a, b in zip(words, words[1:])]
+    return " OR ".join(phrases + [f'"{w}"' for w in dict.fromkeys(words)])
+
+
+class NewsCorpus:
+    """Local store of scraped news articles with a full-text index.
+
+    Articles (title, publication date, source, body) live in SQLite, with
+    an FTS5 index over their diacritic-folded text, so "lãi suất" and
+    "lai suat" match the same articles. Re-adding an unchanged article is a
+    no-op; a changed one replaces the old version. Articles whose date is
+    unknown are kept undated and never match a date window.
+
+    Example:
+        >>> corpus = NewsCorpus()
+        >>> corpus.add_page(url, markdown)
+        >>> corpus.search("lãi suất điều hành", since="2025-07-01", until="2025-10-01")
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else get_cache_dir("news") / "corpus.sqlite"
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._lock, self._db:
+            self._db.executescript(_SCHEMA)
+            columns = {row['name']: row for row in self._db.execute("PRAGMA table_info(articles)")}
+            if columns['published']['notnull']:
+                self._db.executescript(_ALLOW_UNDATED)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def add(self, url: str, title: str, body: str, published: Optional[DateLike] = None,
+            source: Optional[str] = None) -> bool:
+        """Store an article; return False when the same content is already stored for its URL."""
+        url = canonical_url(url)
+        content_hash = hashlib.sha256(f"{title}\n{body}".encode("utf-8")).hexdigest()
+        published = str(published)[:10] if published else None
+        source = source or urlsplit(url).hostname or ''
+        with self._lock, self._db:
+            row = self._db.execute("SELECT id, content_hash FROM articles WHERE url = ?", (url,)).fetchone()
+            if row is not None and row['content_hash'] == content_hash:
+                return False
+            if row is not None:
+                self._db.execute("DELETE FROM articles_fts WHERE rowid = ?", (row['id'],))
+                self._db.execute("DELETE FROM articles WHERE id = ?", (row['id'],))
+            cursor = self._db.execute(
+                "INSERT INTO articles (url, title, published, source, body, content_hash, added_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, title, published, source, body, content_hash, datetime.now().isoformat(timespec='seconds')),
+            )
+            self._db.execute("INSERT INTO articles_fts (rowid, title, body) VALUES (?, ?, ?)",
+                             (cursor.lastrowid, fold_diacritics(title), fold_diacritics(body)))
+        return True
+
+    def add_page(self, url: str, markdown: str) -> bool:
+        """Store a scraped page, taking its title and date from the markdown (undated if it shows none)."""
+        meta = article_metadata(markdown)
+        body = "\n".join(strip_boilerplate(markdown))
+        if not body:
+            return False
+        return self.add(url, meta['title'], body, meta['published'])
+
+    def search(self, query: str, since: Optional[DateLike] = None, until: Optional[DateLike] = None,
+               limit: int = 10, undated: bool = False) -> List[Dict]:
+        """Return the best matching articles published between `since` and `until` (inclusive), best first.
+
+        Articles of unknown date are only returned with `undated` (never for
+        an analysis of a past date, as they may have been published after it).
+        """
+        expression = match_query(query)
+        if expression is None:
+            return []
+        sql = ("SELECT a.url, a.title, a.published, a.source, a.body, bm25(articles_fts, 5.0, 1.0) AS score"
+               " FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid"
+               " WHERE articles_fts MATCH ?")
+        params: list = [expression]
+        window = []
+        if since is not None:
+            window.append("a.published >= ?")
+            params.append(str(since)[:10])
+        if until is not None:
+            window.append("a.published <= ?")
+            params.append(str(until)[:10])
+        if window:
+            sql += f" AND ({' AND '.join(window)}{' OR a.published IS NULL' if undated else ''})"
+        sql += " ORDER BY score, a.published DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            return [dict(row) for row in self._db.execute(sql, params)]
+
+    def recent(self, days: int = 7, until: Optional[DateLike] = None, limit: int = 50) -> List[Dict]:
+        """Return the latest articles of the `days` days up to `until` (default today), newest first."""
+        end = date.fromisoformat(str(until)[:10]) if until else date.today()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT url, title, published, source, body FROM articles WHERE published BETWEEN ? AND ?"
+                " ORDER BY published DESC, id DESC LIMIT ?",
+                ((end - timedelta(days=days)).isoformat(), end.isoformat(), limit),
+            )
+            return [dict(row) for row in rows]
+
+    def prune(self, before: DateLike) -> int:
+        """Delete articles published before `before`; return how many were removed."""
+        with self._lock, self._db:
+            cutoff = str(before)[:10]
+            self._db.execute("DELETE FROM articles_fts WHERE rowid IN (SELECT id FROM articles WHERE published < ?)",
+                             (cutoff,))
+            return self._db.execute("DELETE FROM articles WHERE published < ?", (cutoff,)).rowcount
+
+    def close(self):
+        self._db.close()
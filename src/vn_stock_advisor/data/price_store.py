@@ -0,0 +1,131 @@
+import os
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from vn_stock_advisor.data.calendar import DateLike
+from vn_stock_advisor.utils.cache import get_cache_dir
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+# On-disk record layout: one row per bar
+BAR_DTYPE = np.dtype([('time', 'datetime64[ns]')] + [(column, 'f8') for column in PRICE_COLUMNS])
+
+
+def normalize_bars(df: pd.DataFrame) -> pd.DataFrame:
+    """Return bars with a datetime 'time' column plus OHLCV as float, sorted and de-duplicated."""
+    if df is None or df.empty:
+        return pd.DataFrame({'time': pd.Series(dtype='datetime64[ns]'), **{c: pd.Series(dtype=float) for c in PRICE_COLUMNS}})
+    data = df.reset_index() if 'time' not in df.columns else df
+    times = pd.to_datetime(data['time'])
+    if times.dt.tz is not None:
+        times = times.dt.tz_localize(None)
+    bars = pd.DataFrame({'time': times.astype('datetime64[ns]').to_numpy()})
+    for column in PRICE_COLUMNS:
+        bars[column] = data[column].to_numpy(dtype=float) if column in data.columns else np.nan
+    bars = bars.drop_duplicates(subset='time', keep='last').sort_values('time')
+    return bars.reset_index(drop=True)
+
+
+class PriceStore:
+    """On-disk store of price bars, one .npy record array per (symbol, interval).
+
+    Files are memory-mapped on read, so taking the last 200 bars of a symbol
+    touches only those rows. That keeps loads fast enough to read the whole
+    exchange in one pass without any extra storage dependency.
+
+    Example:
+        >>> store = PriceStore()
+        >>> store.write("HPG", price_data)
+        >>> store.read("HPG", start="2024-01-01")
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root) if root else None
+        self._lock = threading.Lock()
+
+    def _dir(self, interval: str) -> Path:
+        if self.root is None:
+            return get_cache_dir("prices", interval)
+        path = Path(self.root, interval)
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def _path(self, symbol: str, interval: str) -> Path:
+        return self._dir(interval) / f"{symbol.strip().upper()}.npy"
+
+    def read(self, symbol: str, start: Optional[DateLike] = None, end: Optional[DateLike] = None, interval: str = "1D") -> pd.DataFrame:
+        """Return stored bars between `start` and `end` (inclusive, by date)."""
+        return self._load(symbol, interval, start=start, end=end)
+
+    def read_records(self, symbol: str, start: Optional[DateLike] = None, end: Optional[DateLike] = None,
+                     interval: str = "1D") -> np.ndarray:
+        """Like `read`, as a BAR_DTYPE record array."""
+        return self._slice(symbol, interval, start=start, end=end)
+
+    def tail(self, symbol: str, bars: int, end: Optional[DateLike] = None, interval: str = "1D") -> pd.DataFrame:
+        """Return the last `bars` stored bars up to `end` (inclusive, by date)."""
+        return self._load(symbol, interval, end=end, bars=bars)
+
+    def tail_records(self, symbol: str, bars: int, end: Optional[DateLike] = None, interval: str = "1D") -> np.ndarray:
+        """Like `tail`, as a BAR_DTYPE record array (skips building a DataFrame per symbol)."""
+        return self._slice(symbol, interval, end=end, bars=bars)
+
+    def _records(self, symbol: str, interval: str) -> Optional[np.ndarray]:
+        path = self._path(symbol, interval)
+        if not path.exists():
+            return None
+        return np.load(path, mmap_mode='r')
+
+    def _slice(self, symbol: str, interval: str, start=None, end=None, bars: Optional[int] = None) -> np.ndarray:
+        records = self._records(symbol, interval)
+        if records is None:
+            return np.empty(0, dtype=BAR_DTYPE)
+        times = records['time']
+        hi = len(times) if end is None else int(np.searchsorted(times, np.datetime64(pd.Timestamp(end).normalize() + pd.Timedelta(days=1)), side="left"))
+        if bars is not None:
+            lo = max(hi - bars, 0)
+        else:
+            lo = 0 if start is None else int(np.searchsorted(times, np.datetime64(pd.Timestamp(start).normalize()), side="left"))
+        # Copy only the requested rows out of the memory map
+        return np.array(records[lo:hi])
+
+    def _load(self, symbol: str, interval: str, start=None, end=None, bars: Optional[int] = None) -> pd.DataFrame:
+        rows = self._slice(symbol, interval, start=start, end=end, bars=bars)
+        return pd.DataFrame({column: rows[column] for column in BAR_DTYPE.names})
+
+    def write(self, symbol: str, bars: pd.DataFrame, interval: str = "1D", replace: bool = False) -> pd.DataFrame:
+        """Merge `bars` into the stored history (new values win on equal times) and return the result.
+
+        With `replace`, `bars` become the whole stored history instead, e.g.
+        after prices were adjusted for a dividend or split.
+        """
+        new_bars = normalize_bars(bars)
+        with self._lock:
+            merged = new_bars if replace else normalize_bars(
+                pd.concat([self.read(symbol, interval=interval), new_bars], ignore_index=True))
+            if merged.empty:
+                return merged
+            records = np.empty(len(merged), dtype=BAR_DTYPE)
+            records['time'] = merged['time'].to_numpy(dtype='datetime64[ns]')
+            for column in PRICE_COLUMNS:
+                records[column] = merged[column].to_numpy(dtype=float)
+            path = self._path(symbol, interval)
+            tmp_path = path.with_name(path.stem + ".tmp.npy")
+            np.save(tmp_path, records)
+            os.replace(tmp_path, path)
+        return merged
+
+    def coverage(self, symbol: str, interval: str = "1D") -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """Return the first and last stored bar times, or None when nothing is stored."""
+        records = self._records(symbol, interval)
+        if records is None or len(records) == 0:
+            return None
+        return pd.Timestamp(records['time'][0]), pd.Timestamp(records['time'][-1])
+
+    def symbols(self, interval: str = "1D") -> List[str]:
+        """Return every symbol that has stored bars."""
+        return sorted(p.stem for p in self._dir(interval).glob("*.npy") if not p.stem.endswith(".tmp"))
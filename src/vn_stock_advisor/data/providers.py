@@ -0,0 +1,298 @@
+"""
+Market data provider with per-source health tracking and failover.
+
+vnstock serves the same data from several sources (TCBS, VCI) with
+different column names and very different latency depending on the time
+of day. DataProvider keeps an exponentially weighted latency and error
+rate per source, sends each request to the healthy source expected to
+answer soonest (a fast source that often fails or times out is not), moves
+on to the next one when a request fails, times out or comes back empty,
+and returns frames with the same canonical columns whichever source
+answered. Identical requests made concurrently (several crews or
+Streamlit sessions on the same ticker) share a single download.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+from vnstock import Vnstock
+
+from vn_stock_advisor.data.cassette import recorded
+from vn_stock_advisor.data.schema import SchemaResolver
+from vn_stock_advisor.utils.singleflight import SingleFlight
+from vn_stock_advisor.utils.tracing import annotate, get_tracer
+
+DEFAULT_SOURCES = ("TCBS", "VCI")
+# Floor of a source's success rate in its expected cost, so a source failing every request still sorts
+MIN_SUCCESS_RATE = 0.05
+
+# Canonical income statement and company columns (TCBS names), with VCI equivalents
+INCOME_ALIASES = {
+    'revenue': ['revenue', 'Revenue (Bn. VND)', 'Net Sales', 'net_revenue'],
+    'gross_profit': ['gross_profit', 'Gross Profit'],
+    'operation_profit': ['operation_profit', 'Operating Profit/Loss'],
+    'pre_tax_profit': ['pre_tax_profit', 'Profit before tax'],
+    'post_tax_profit': ['post_tax_profit', 'Net Profit For the Year', 'Attribute to parent company (Bn. VND)'],
+    'year': ['year', 'yearReport'],
+    'quarter': ['quarter', 'lengthReport'],
+}
+COMPANY_ALIASES = {
+    'company_name': ['company_name', 'organ_name', 'short_name'],
+    'industry': ['industry', 'icb_name3', 'icb_name2', 'industry_en'],
+}
+INCOME_SCHEMA = SchemaResolver(INCOME_ALIASES)
+COMPANY_SCHEMA = SchemaResolver(COMPANY_ALIASES)
+# Ratio frames keep their source names (FundamentalData resolves them) but
+# need flat report period columns
+PERIOD_SCHEMA = SchemaResolver({'year': ['yearReport'], 'quarter': ['lengthReport']})
+
+
+# vnstock calls behind each endpoint, and the schema normalizing their result
+ENDPOINTS = {
+    'history': (lambda stock, **params: stock.quote.history(**params), None),
+    'ratio': (lambda stock, **params: stock.finance.ratio(**params), PERIOD_SCHEMA),
+    'income_statement': (lambda stock, **params: stock.finance.income_statement(**params), INCOME_SCHEMA),
+    'profile': (lambda stock, **params: stock.company.profile(**params), COMPANY_SCHEMA),
+    'overview': (lambda stock, **params: stock.company.overview(**params), COMPANY_SCHEMA),
+}
+
+
+def _replay_history(recordings: List[pd.DataFrame], params: dict) -> pd.DataFrame:
+    """Answer a history request from recordings of other date ranges.
+
+    Incremental updates record short tails, so no single recording has to
+    cover the range: all are merged (the latest recording of a bar wins)
+    and the bars in the requested start/end dates are kept.
+    """
+    frames = [data for data in recordings if data is not None and not data.empty and 'time' in data.columns]
+    if not frames:
+        return recordings[-1]
+    data = pd.concat(frames, ignore_index=True)
+    data = data.assign(_time=pd.to_datetime(data['time'])).drop_duplicates('_time', keep='last')
+    data = data.sort_values('_time').drop(columns='_time')
+    days = pd.to_datetime(data['time']).dt.normalize()
+    start, end = pd.Timestamp(params.get('start', days.min())), pd.Timestamp(params.get('end', days.max()))
+    return data[(days >= start) & (days <= end)].reset_index(drop=True)
+
+
+def vnstock_client(symbol: str, source: str):
+    """Return the vnstock object serving `symbol` from `source`."""
+    return Vnstock().stock(symbol=symbol, source=source)
+
+
+@dataclass
+class SourceStats:
+    """Exponentially weighted health of one data source."""
+    latency: Optional[float] = None  # seconds, successful requests only
+    failure_latency: Optional[float] = None  # seconds lost on failed requests (errors, timeouts)
+    error_rate: float = 0.0
+    requests: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    unhealthy_until: float = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+
+    @property
+    def expected_cost(self) -> float:
+        """Seconds spent per request over the chance of success: sorting by it minimizes the expected wait with failover."""
+        latency = self.latency if self.latency is not None else (self.failure_latency or 0.0)
+        spent = (1 - self.error_rate) * latency + self.error_rate * (self.failure_latency or 0.0)
+        return spent / max(1 - self.error_rate, MIN_SUCCESS_RATE)
+
+
+class DataProvider:
+    """Fetch vnstock data from the fastest healthy source, failing over to the others.
+
+    Example:
+        >>> provider = get_provider()
+        >>> ratios = provider.ratio("HPG")
+        >>> provider.stats()  # latency and error rate per source
+    """
+
+    def __init__(
+        self,
+        sources: Sequence[str] = DEFAULT_SOURCES,
+        client_factory: Callable[[str, str], object] = vnstock_client,
+        timeout: Optional[float] = 30.0,
+        smoothing: float = 0.3,
+        max_failures: int = 3,
+        cooldown: float = 300.0,
+    ):
+        """
+        Args:
+            sources: Sources in order of preference while nothing is known about them.
+            timeout: Seconds before a request is abandoned for the next source
+                (the abandoned call finishes in the background).
+            smoothing: Weight of the newest request in the latency and error averages.
+            max_failures: Consecutive failures that mark a source unhealthy.
+            cooldown: Seconds an unhealthy source is only used as a last resort.
+        """
+        self.sources = [s.upper() for s in sources]
+        self.client_factory = client_factory
+        self.timeout = timeout
+        self.smoothing = smoothing
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self._stats: Dict[str, SourceStats] = {s: SourceStats() for s in self.sources}
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+
+    def route(self, sources: Optional[Sequence[str]] = None) -> List[str]:
+        """Return sources in the order they will be tried: healthy first, then by expected time to an answer."""
+        candidates = [s.upper() for s in sources] if sources else self.sources
+        with self._lock:
+            stats = {s: self._stats.setdefault(s, SourceStats()) for s in candidates}
+            # Untried sources keep their preference order ahead of slow ones, so they get measured
+            return sorted(candidates, key=lambda s: (
+                not stats[s].healthy, stats[s].expected_cost, candidates.index(s)))
+
+    def _record(self, source: str, elapsed: float, ok: bool):
+        with self._lock:
+            stats = self._stats.setdefault(source, SourceStats())
+            a = self.smoothing
+            stats.requests += 1
+            stats.error_rate = (1 - a) * stats.error_rate + a * (0.0 if ok else 1.0)
+            if ok:
+                stats.latency = elapsed if stats.latency is None else (1 - a) * stats.latency + a * elapsed
+                stats.consecutive_failures = 0
+                stats.unhealthy_until = 0.0
+            else:
+                stats.failure_latency = elapsed if stats.failure_latency is None else (1 - a) * stats.failure_latency + a * elapsed
+                stats.failures += 1
+                stats.consecutive_failures += 1
+                if stats.consecutive_failures >= self.max_failures:
+                    stats.unhealthy_until = time.monotonic() + self.cooldown
+
+    def _call(self, request: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        if self.timeout is None:
+            return request()
+        outcome = {}
+
+        def run():
+            try:
+                outcome['result'] = request()
+            except BaseException as e:
+                outcome['error'] = e
+
+        worker = threading.Thread(target=run, daemon=True)
+        worker.start()
+        worker.join(self.timeout)
+        if worker.is_alive():
+            raise TimeoutError(f"no response after {self.timeout:g}s")
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome['result']
+
+    def fetch(self, symbol: str, endpoint: Callable[[object], pd.DataFrame],
+              sources: Optional[Sequence[str]] = None) -> Tuple[pd.DataFrame, str]:
+        """Call `endpoint(vnstock_object)` on the best source and return (data, source).
+
+        Empty results move on to the next source too. If every source comes
+        back empty the last empty frame is returned; if none answers, a
+        RuntimeError lists each source's error.
+        """
+        symbol = symbol.strip().upper()
+        empty, errors = None, []
+        for source in self.route(sources):
+            start = time.perf_counter()
+            try:
+                data = self._call(lambda: endpoint(self.client_factory(symbol, source)))
+            except Exception as e:
+                self._record(source, time.perf_counter() - start, ok=False)
+                errors.append(f"{source}: {e}")
+                continue
+            self._record(source, time.perf_counter() - start, ok=True)
+            if data is not None and not data.empty:
+                annotate(source=source, failed_sources=len(errors))
+                return data, source
+            empty = (data, source)
+        if empty is not None:
+            return empty
+        raise RuntimeError(f"Không lấy được dữ liệu {symbol} từ nguồn nào ({'; '.join(errors)})")
+
+    def _endpoint(self, symbol: str, endpoint: str, sources: Optional[Sequence[str]], params: dict):
+        call, schema = ENDPOINTS[endpoint]
+        symbol = symbol.strip().upper()
+        # Concurrent identical requests share one download
+        key = (tuple(s.upper() for s in sources) if sources else None, symbol, endpoint, tuple(sorted(params.items())))
+
+        def live():
+            data, _ = self.fetch(symbol, lambda stock: call(stock, **params), sources)
+            return data
+
+        def fetch():
+            # Recorded answers don't depend on the source; replays of other date ranges merge the recorded bars
+            window = {k: v for k, v in params.items() if k not in ('start', 'end')}
+            return recorded("vnstock", [symbol, endpoint, params], live, group=[symbol, endpoint, window],
+                            adapt=(lambda recordings: _replay_history(recordings, params)) if endpoint == 'history' else None)
+        return key, fetch, schema
+
+    def request(self, symbol: str, endpoint: str, sources: Optional[Sequence[str]] = None, **params) -> pd.DataFrame:
+        """Fetch one of ENDPOINTS, e.g. request("HPG", "ratio", period="quarter"), with canonical columns."""
+        key, fetch, schema = self._endpoint(symbol, endpoint, sources, params)
+        with get_tracer().span(f"vnstock.{endpoint}", "fetch", symbol=key[1]) as span:
+            data = self._flights.do(key, fetch)
+            if data is not None:
+                span.set(rows=len(data), bytes=int(data.memory_usage(deep=True).sum()))
+        return schema.rename(data) if schema is not None else data
+
+    async def request_async(self, symbol: str, endpoint: str, sources: Optional[Sequence[str]] = None,
+                            **params) -> pd.DataFrame:
+        """`request` for asyncio code; joins requests in flight from threads or other tasks."""
+        key, fetch, schema = self._endpoint(symbol, endpoint, sources, params)
+        data = await self._flights.do_async(key, fetch)
+        return schema.rename(data) if schema is not None else data
+
+    def history(self, symbol: str, start: date, end: date, interval: str = "1D",
+                sources: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Return price bars; every source already uses time/open/high/low/close/volume."""
+        return self.request(symbol, "history", sources, start=start.strftime("%Y-%m-%d"),
+                            end=end.strftime("%Y-%m-%d"), interval=interval)
+
+    def ratio(self, symbol: str, period: str = "quarter", sources: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Return financial ratios, newest first, with flat columns and year/quarter period columns."""
+        return self.request(symbol, "ratio", sources, period=period)
+
+    def income_statement(self, symbol: str, period: str = "quarter",
+                         sources: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Return income statements, newest first, with TCBS column names."""
+        return self.request(symbol, "income_statement", sources, period=period)
+
+    def profile(self, symbol: str, sources: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        return self.request(symbol, "profile", sources)
+
+    def overview(self, symbol: str, sources: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        return self.request(symbol, "overview", sources)
+
+    def stats(self) -> pd.DataFrame:
+        """Return latency (ms), error rate and health per source, in routing order."""
+        order = self.route(list(self._stats))
+        with self._lock:
+            return pd.DataFrame([{
+                'source': s,
+                'latency_ms': self._stats[s].latency * 1000 if self._stats[s].latency is not None else None,
+                'error_rate': self._stats[s].error_rate,
+                'requests': self._stats[s].requests,
+                'failures': self._stats[s].failures,
+                'healthy': self._stats[s].healthy,
+            } for s in order]).set_index('source')
+
+
+_provider = None
+
+
+def get_provider() -> DataProvider:
+    """Return the process-wide provider; VN_STOCK_SOURCES="VCI,TCBS" changes the sources and their preference."""
+    global _provider
+    if _provider is None:
+        sources = [s.strip() for s in os.getenv("VN_STOCK_SOURCES", "").split(",") if s.strip()]
+        _provider = DataProvider(sources or DEFAULT_SOURCES)
+    return _provider
@@ -0,0 +1,75 @@
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from vn_stock_advisor.utils.text import fold_diacritics
+
+
+def _normalize(name) -> str:
+    # "ROE (%)", "roe" and "Roe" compare equal; so do "P/E" and "p_e"
+    return re.sub(r"[^0-9a-z]+", "", fold_diacritics(str(name)))
+
+
+def column_names(columns: pd.Index) -> Tuple[str, ...]:
+    """Return the column names of a frame, using the last level of MultiIndex columns (VCI)."""
+    if isinstance(columns, pd.MultiIndex):
+        return tuple(str(c[-1]) for c in columns)
+    return tuple(str(c) for c in columns)
+
+
+class SchemaResolver:
+    """Map source-specific column names (TCBS, VCI...) to canonical names.
+
+    The mapping is worked out once per schema signature (the tuple of column
+    names) and cached, so extracting values from many frames of the same
+    source costs one dict lookup per frame instead of scanning every alias.
+
+    Example:
+        >>> RATIO_SCHEMA.select(ratios, ['price_to_earning', 'roe'])
+    """
+
+    def __init__(self, aliases: Dict[str, Sequence[str]]):
+        self.aliases = {canonical: list(names) for canonical, names in aliases.items()}
+        # normalized alias -> (canonical name, preference); earlier aliases win
+        self._lookup = {}
+        for canonical, names in self.aliases.items():
+            for rank, alias in enumerate([canonical] + list(names)):
+                self._lookup.setdefault(_normalize(alias), (canonical, rank))
+        self._cache: Dict[Tuple[str, ...], Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, columns: Iterable) -> Dict[str, int]:
+        """Return {canonical name: column position} for the columns of one schema."""
+        signature = column_names(columns) if isinstance(columns, pd.Index) else tuple(map(str, columns))
+        mapping = self._cache.get(signature)
+        if mapping is None:
+            best = {}
+            for position, name in enumerate(signature):
+                match = self._lookup.get(_normalize(name))
+                if match and (match[0] not in best or match[1] < best[match[0]][1]):
+                    best[match[0]] = (position, match[1])
+            mapping = {canonical: position for canonical, (position, _) in best.items()}
+            with self._lock:
+                self._cache[signature] = mapping
+        return mapping
+
+    def select(self, df: pd.DataFrame, names: Optional[List[str]] = None) -> pd.DataFrame:
+        """Return `names` (default: every canonical name) as numeric columns, NaN where the source lacks one."""
+        names = list(self.aliases) if names is None else list(names)
+        mapping = self.resolve(df.columns)
+        found = [name for name in names if name in mapping]
+        selected = df.iloc[:, [mapping[name] for name in found]]
+        selected = selected.apply(pd.to_numeric, errors='coerce')
+        selected.columns = found
+        return selected.reindex(columns=names)
+
+    def rename(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Return `df` with flat columns, the recognized ones renamed to their canonical names."""
+        names = list(column_names(df.columns))
+        for canonical, position in self.resolve(df.columns).items():
+            names[position] = canonical
+        renamed = df.copy()
+        renamed.columns = names
+        return renamed
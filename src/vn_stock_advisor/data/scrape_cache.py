@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from vn_stock_advisor.utils.cache import get_cache_dir
+
+# Query parameters that only track the visit and never change the page
+TRACKING_PARAMS = {'fbclid', 'gclid', 'dclid', 'msclkid', 'zarsrc', 'zalo_source', 'ref', 'refsrc', 'mc_cid', 'mc_eid'}
+TRACKING_PREFIXES = ('utm_',)
+
+# How long a scraped page is reused, by domain (subdomains included). News
+# articles rarely change once published; market data pages change daily.
+DOMAIN_TTLS = {
+    'cafef.vn': timedelta(days=7),
+    'vneconomy.vn': timedelta(days=7),
+    'vnexpress.net': timedelta(days=7),
+    'tinnhanhchungkhoan.vn': timedelta(days=7),
+    'ndh.vn': timedelta(days=7),
+    'vietstock.vn': timedelta(days=1),
+    'fireant.vn': timedelta(hours=6),
+}
+DEFAULT_TTL = timedelta(days=1)
+
+
+def canonical_url(url: str) -> str:
+    """Normalize a URL so that variants of the same page share one cache entry.
+
+    Lowercases the scheme and host, drops "www.", default ports, fragments,
+    tracking parameters and trailing slashes, and sorts the remaining
+    query parameters.
+    """
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or 'https').lower()
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and (scheme, parts.port) not in (('http', 80), ('https', 443)):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+
+def domain_ttl(url: str, ttls: Optional[Dict[str, timedelta]] = None) -> timedelta:
+    """Return the cache lifetime of `url`, matching its domain or any parent domain."""
+    ttls = DOMAIN_TTLS if ttls is None else ttls
+    host = urlsplit(canonical_url(url)).hostname or ''
+    labels = host.split('.')
+    for i in range(len(labels) - 1):
+        ttl = ttls.get('.'.join(labels[i:]))
+        if ttl is not None:
+            return ttl
+    return DEFAULT_TTL
+
+
+class ScrapeCache:
+    """On-disk cache of scraped pages, keyed by canonical URL and deduplicated by content.
+
+    Each URL has a small JSON entry pointing to a zlib-compressed content
+    blob named after the content's hash, so mirrors, AMP pages and URLs
+    differing only by tracking parameters store the article text once.
+
+    Example:
+        >>> cache = ScrapeCache()
+        >>> cache.get(url) or cache.put(url, scrape(url))
+    """
+
+    def __init__(self, root: Optional[str] = None, ttls: Optional[Dict[str, timedelta]] = None):
+        self.root = Path(root) if root else get_cache_dir("scrapes")
+        self.ttls = DOMAIN_TTLS if ttls is None else ttls
+        (self.root / "urls").mkdir(parents=True, exist_ok=True)
+        (self.root / "content").mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _entry_path(self, url: str) -> Path:
+        return self.root / "urls" / f"{hashlib.sha1(canonical_url(url).encode()).hexdigest()}.json"
+
+    def _blob_path(self, content_hash: str) -> Path:
+        return self.root / "content" / f"{content_hash}.z"
+
+    def get(self, url: str) -> Optional[str]:
+        """Return the cached content of `url`, or None when missing or older than its domain TTL."""
+        try:
+            entry = json.loads(self._entry_path(url).read_text(encoding="utf-8"))
+            if time.time() - entry['fetched_at'] > domain_ttl(url, self.ttls).total_seconds():
+                return None
+            return zlib.decompress(self._blob_path(entry['content_hash']).read_bytes()).decode("utf-8")
+        except (OSError, ValueError, KeyError, zlib.error):
+            return None
+
+    def put(self, url: str, content: str) -> str:
+        """Store `content` for `url` and return it."""
+        data = content.encode("utf-8")
+        content_hash = hashlib.sha256(data).hexdigest()
+        blob = self._blob_path(content_hash)
+        entry = {'url': canonical_url(url), 'content_hash': content_hash, 'fetched_at': time.time(), 'size': len(data)}
+        with self._lock:
+            if not blob.exists():
+                self._write(blob, zlib.compress(data, 6))
+            self._write(self._entry_path(url), json.dumps(entry).encode("utf-8"))
+        return content
+
+    def contents(self) -> Iterator[str]:
+        """Yield the content of every stored page, each distinct content once."""
+        for blob in sorted((self.root / "content").glob("*.z")):
+            try:
+                yield zlib.decompress(blob.read_bytes()).decode("utf-8")
+            except (OSError, zlib.error):
+                continue
+
+    def _write(self, path: Path, data: bytes):
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def prune(self) -> int:
+        """Delete expired entries and unreferenced blobs; return the number of files removed."""
+        removed, live = 0, set()
+        for path in (self.root / "urls").glob("*.json"):
+            try:
+                entry = json.loads(path.read_text(encoding="utf-8"))
+                expired = time.time() - entry['fetched_at'] > domain_ttl(entry['url'], self.ttls).total_seconds()
+            except (OSError, ValueError, KeyError):
+                expired, entry = True, {}
+            if expired:
+                path.unlink(missing_ok=True)
+                removed += 1
+            else:
+                live.add(entry['content_hash'])
+        for blob in (self.root / "content").glob("*.z"):
+            if blob.stem not in live:
+                blob.unlink(missing_ok=True)
+                removed += 1
+        return removed
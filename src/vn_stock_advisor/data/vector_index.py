@@ -0,0 +1,232 @@
+"""
+Persistent local vector index shared across runs.
+
+Chunks are keyed by the hash of their text, so a chunk is embedded once
+however many runs, documents or crews use it, and a document whose
+content hash hasn't changed is skipped without any embedding call. The
+embedding backend is pluggable: OpenAI embeddings in production, a
+deterministic hashing embedder offline and in tests.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from vn_stock_advisor.utils.cache import get_cache_dir
+from vn_stock_advisor.utils.reducer import terms
+
+
+class HashingEmbedder:
+    """Offline embedder: feature-hashed, diacritic-folded syllables and bigrams, L2-normalized.
+
+    Deterministic and dependency-free; good enough for keyword-like lookups
+    (industry names, tickers) and for tests.
+    """
+
+    # Cosine below which a chunk shares little more than a common word (PE, ngành) with the query
+    min_score = 0.15
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def __call__(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for term in terms(text):
+                digest = hashlib.md5(term.encode("utf-8")).digest()
+                index = int.from_bytes(digest[:4], "little") % self.dim
+                vectors[row, index] += 1.0 if digest[4] & 1 else -1.0
+        return _normalize(vectors)
+
+
+class OpenAIEmbedder:
+    """OpenAI embeddings API, in batches."""
+
+    # Unrelated texts still score 0.1-0.2 with these models
+    min_score = 0.3
+
+    def __init__(self, model: str = "text-embedding-3-small", api_key: Optional[str] = None, batch_size: int = 256):
+        self.model = model
+        self.name = model
+        self.api_key = api_key
+        self.batch_size = batch_size
+
+    def __call__(self, texts: Sequence[str]) -> np.ndarray:
+        from openai import OpenAI
+
+        client = OpenAI(api_key=self.api_key or os.getenv("OPENAI_API_KEY"))
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            response = client.embeddings.create(model=self.model, input=list(texts[start:start + self.batch_size]))
+            vectors.extend(item.embedding for item in response.data)
+        return _normalize(np.asarray(vectors, dtype=np.float32))
+
+
+def get_embedder():
+    """Return the embedder selected by VN_STOCK_EMBEDDER ("openai" or "hashing").
+
+    Defaults to OpenAI when OPENAI_API_KEY is set, the offline hashing
+    embedder otherwise.
+    """
+    choice = (os.getenv("VN_STOCK_EMBEDDER") or ("openai" if os.getenv("OPENAI_API_KEY") else "hashing")).lower()
+    return OpenAIEmbedder() if choice == "openai" else HashingEmbedder()
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class VectorIndex:
+    """Named on-disk vector index of documents split into chunks.
+
+    The index keeps one row per distinct chunk text (`vectors.npy`) and a
+    JSON catalogue mapping each document to its content hash and chunks.
+    Each embedder gets its own index, since vectors of different models
+    don't compare.
+
+    Example:
+        >>> index = VectorIndex("knowledge")
+        >>> index.sync({"pe_pb.json": chunks})  # embeds only new chunks, drops stale documents
+        >>> index.search("ngành thép", k=3)
+    """
+
+    def __init__(self, name: str, embedder=None, root: Optional[str] = None):
+        self.embedder = embedder or get_embedder()
+        self.dir = (Path(root) if root else get_cache_dir("vectors")) / f"{name}-{self.embedder.name}"
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            catalogue = json.loads((self.dir / "index.json").read_text(encoding="utf-8"))
+            self._vectors = np.load(self.dir / "vectors.npy")
+            self._chunks: List[Dict] = catalogue['chunks']
+            self._docs: Dict[str, Dict] = catalogue['docs']
+            if len(self._chunks) != len(self._vectors):
+                raise ValueError("index.json and vectors.npy are out of step")
+        except (OSError, ValueError, KeyError):
+            self._vectors = np.zeros((0, 0), dtype=np.float32)
+            self._chunks, self._docs = [], {}
+        self._rows = {chunk['hash']: row for row, chunk in enumerate(self._chunks)}
+
+    def _save(self):
+        catalogue = json.dumps({'chunks': self._chunks, 'docs': self._docs}, ensure_ascii=False)
+        tmp_index, tmp_vectors = self.dir / "index.json.tmp", self.dir / "vectors.tmp.npy"
+        tmp_index.write_text(catalogue, encoding="utf-8")
+        np.save(tmp_vectors, self._vectors)
+        os.replace(tmp_vectors, self.dir / "vectors.npy")
+        os.replace(tmp_index, self.dir / "index.json")
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._docs
+
+    def documents(self) -> List[str]:
+        return list(self._docs)
+
+    def chunks(self, doc_id: str) -> List[str]:
+        return [self._chunks[self._rows[h]]['text'] for h in self._docs.get(doc_id, {}).get('chunks', [])]
+
+    def metadata(self, doc_id: str) -> Dict:
+        return dict(self._docs.get(doc_id, {}).get('metadata', {}))
+
+    def upsert(self, doc_id: str, chunks: Sequence[str], metadata: Optional[Dict] = None) -> int:
+        """Add or replace a document; return how many chunks had to be embedded (0 when unchanged)."""
+        with self._lock:
+            embedded = self._upsert(doc_id, chunks, metadata)
+            if embedded is None:
+                return 0
+            self._collect()
+            self._save()
+            return embedded
+
+    def _upsert(self, doc_id: str, chunks: Sequence[str], metadata: Optional[Dict]) -> Optional[int]:
+        # None when the document is unchanged, else the number of chunks embedded (0 for a metadata-only change)
+        chunks = [c for c in chunks if c.strip()]
+        doc_hash = _digest("\x1f".join(chunks))
+        stored = self._docs.get(doc_id)
+        if stored is not None and stored['hash'] == doc_hash:
+            if metadata is None or metadata == stored['metadata']:
+                return None
+            stored['metadata'] = metadata
+            return 0
+        hashes = [_digest(c) for c in chunks]
+        new = {h: c for h, c in zip(hashes, chunks) if h not in self._rows}
+        if new:
+            vectors = self.embedder(list(new.values()))
+            self._vectors = vectors if not self._chunks else np.vstack([self._vectors, vectors])
+            for h, text in new.items():
+                self._rows[h] = len(self._chunks)
+                self._chunks.append({'hash': h, 'text': text})
+        self._docs[doc_id] = {'hash': doc_hash, 'chunks': hashes, 'metadata': metadata or {}}
+        return len(new)
+
+    def delete(self, doc_id: str) -> bool:
+        """Remove a document and the chunks no other document uses."""
+        with self._lock:
+            if self._docs.pop(doc_id, None) is None:
+                return False
+            self._collect()
+            self._save()
+            return True
+
+    def sync(self, documents: Dict[str, Sequence[str]], metadata: Optional[Dict[str, Dict]] = None) -> Dict[str, int]:
+        """Make the index hold exactly `documents` ({doc_id: chunks}); return embedded/deleted counts."""
+        metadata = metadata or {}
+        with self._lock:
+            results = [self._upsert(doc_id, chunks, metadata.get(doc_id)) for doc_id, chunks in documents.items()]
+            stale = [doc_id for doc_id in self._docs if doc_id not in documents]
+            for doc_id in stale:
+                del self._docs[doc_id]
+            changed = [r for r in results if r is not None]
+            if changed or stale:
+                self._collect()
+                self._save()
+            return {'embedded': sum(changed), 'deleted': len(stale)}
+
+    def _collect(self) -> bool:
+        # Drop chunk rows no document references any more
+        live = {h for doc in self._docs.values() for h in doc['chunks']}
+        keep = [row for row, chunk in enumerate(self._chunks) if chunk['hash'] in live]
+        if len(keep) == len(self._chunks):
+            return False
+        self._vectors = self._vectors[keep]
+        self._chunks = [self._chunks[row] for row in keep]
+        self._rows = {chunk['hash']: row for row, chunk in enumerate(self._chunks)}
+        return True
+
+    def search(self, query: str, k: int = 5, doc_ids: Optional[Iterable[str]] = None,
+               min_score: float = float('-inf')) -> List[Dict]:
+        """Return the `k` chunks most similar to `query` (cosine, at least `min_score`), best first, with their documents."""
+        if not self._chunks:
+            return []
+        owners: Dict[str, str] = {}
+        for doc_id, doc in self._docs.items():
+            for h in doc['chunks']:
+                owners.setdefault(h, doc_id)
+        rows = np.arange(len(self._chunks))
+        if doc_ids is not None:
+            allowed = set(doc_ids)
+            rows = np.array([r for r in rows if owners.get(self._chunks[r]['hash']) in allowed], dtype=int)
+            if not len(rows):
+                return []
+        scores = self._vectors[rows] @ self.embedder([query])[0]
+        order = np.argsort(-scores, kind='stable')[:k]
+        best = rows[order[scores[order] >= min_score]]
+        ranked = dict(zip(rows, scores))
+        return [{'doc_id': owners.get(self._chunks[r]['hash']), 'text': self._chunks[r]['text'],
+                 'score': float(ranked[r])} for r in best]
@@ -0,0 +1,371 @@
+import copy
+import json
+import math
+import os
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from vn_stock_advisor.indicators.registry import DEFAULT_INDICATORS
+from vn_stock_advisor.indicators.technical import calculate_indicators
+from vn_stock_advisor.utils.cache import get_cache_dir
+
+# Same windows as the default indicators in the registry
+CLOSE_SMA_WINDOWS = (20, 50, 200)
+VOLUME_SMA_WINDOWS = (10, 20, 50)
+EMA_SPANS = (12, 26)
+MACD_SIGNAL_SPAN = 9
+RSI_WINDOW = 14
+BB_WINDOW = 20
+BB_STD = 2
+
+INDICATOR_COLUMNS = DEFAULT_INDICATORS
+
+# Running sums are re-added from the window every so often to bound float drift
+RESYNC_EVERY = 10_000
+# Overlapping bars compared with the processed ones: a dividend or split
+# adjusts every earlier close, not only the last bar's
+REVISION_CHECK_BARS = 5
+
+
+class WindowSums:
+    """Recent values of one series with a running sum for each window length."""
+
+    def __init__(self, windows: Iterable[int], values: Iterable[float] = ()):
+        self.windows = tuple(sorted(windows))
+        self.values = deque(values, maxlen=self.windows[-1])
+        self.resync()
+
+    def resync(self):
+        values = list(self.values)
+        self.sums = {w: math.fsum(values[-w:]) for w in self.windows}
+        self.nonzero = {w: sum(1 for v in values[-w:] if v != 0) for w in self.windows}
+        self.pushes = 0
+
+    def push(self, value: float):
+        # Drop the value that leaves each window before appending the new one
+        for w in self.windows:
+            if len(self.values) >= w:
+                old = self.values[-w]
+                self.sums[w] -= old
+                if old != 0:
+                    self.nonzero[w] -= 1
+            self.sums[w] += value
+            if value != 0:
+                self.nonzero[w] += 1
+        self.values.append(value)
+
+        self.pushes += 1
+        if self.pushes >= RESYNC_EVERY:
+            self.resync()
+
+    def mean(self, window: int) -> float:
+        if len(self.values) < window:
+            return np.nan
+        if self.nonzero[window] == 0:
+            return 0.0
+        return self.sums[window] / window
+
+    def std(self, window: int) -> float:
+        """Sample standard deviation (ddof=1) over the last `window` values."""
+        if len(self.values) < window:
+            return np.nan
+        return float(np.std(list(self.values)[-window:], ddof=1))
+
+
+def _ema_step(previous: Optional[float], value: float, span: int) -> float:
+    # Matches pandas ewm(span=..., adjust=False): the first value seeds the average
+    if previous is None:
+        return value
+    alpha = 2 / (span + 1)
+    return alpha * value + (1 - alpha) * previous
+
+
+class IndicatorState:
+    """Rolling state needed to advance calculate_indicators by one bar."""
+
+    def __init__(self, symbol: str, interval: str = "1D"):
+        self.symbol = symbol
+        self.interval = interval
+        self.last_time: Optional[str] = None
+        self.bars = 0
+        self.closes = WindowSums(CLOSE_SMA_WINDOWS)
+        self.volumes = WindowSums(VOLUME_SMA_WINDOWS)
+        self.gains = WindowSums((RSI_WINDOW,))
+        self.losses = WindowSums((RSI_WINDOW,))
+        self.ema: Dict[int, Optional[float]] = {span: None for span in EMA_SPANS}
+        self.macd_signal: Optional[float] = None
+        self.obv = 0.0
+        self.last_close: Optional[float] = None
+        self.last_row: Dict[str, float] = {}
+
+    def advance(self, time, close: float, volume: float) -> Dict[str, float]:
+        """Consume one bar and return its indicator values."""
+        close = float(close)
+        volume = float(volume)
+
+        if self.last_close is None:
+            # diff() is NaN on the first bar, which calculate_indicators turns into a zero gain/loss
+            delta = 0.0
+            self.obv = volume
+        else:
+            delta = close - self.last_close
+            if delta > 0:
+                self.obv += volume
+            elif delta < 0:
+                self.obv -= volume
+
+        self.closes.push(close)
+        self.volumes.push(volume)
+        self.gains.push(delta if delta > 0 else 0.0)
+        self.losses.push(-delta if delta < 0 else 0.0)
+
+        for span in EMA_SPANS:
+            self.ema[span] = _ema_step(self.ema[span], close, span)
+        macd = self.ema[12] - self.ema[26]
+        self.macd_signal = _ema_step(self.macd_signal, macd, MACD_SIGNAL_SPAN)
+
+        row = {'time': time, 'close': close, 'volume': volume}
+        for w in CLOSE_SMA_WINDOWS:
+            row[f'SMA_{w}'] = self.closes.mean(w)
+        for span in EMA_SPANS:
+            row[f'EMA_{span}'] = self.ema[span]
+        row['MACD'] = macd
+        row['MACD_Signal'] = self.macd_signal
+        row['MACD_Hist'] = macd - self.macd_signal
+
+        gain = self.gains.mean(RSI_WINDOW)
+        loss = self.losses.mean(RSI_WINDOW)
+        if np.isnan(gain) or np.isnan(loss) or loss == 0:
+            row['RSI_14'] = 50.0  # Same neutral fill as calculate_indicators
+        else:
+            row['RSI_14'] = 100 - (100 / (1 + gain / loss))
+
+        std_dev = self.closes.std(BB_WINDOW)
+        row['BB_Middle'] = row[f'SMA_{BB_WINDOW}']
+        row['BB_Upper'] = row['BB_Middle'] + std_dev * BB_STD
+        row['BB_Lower'] = row['BB_Middle'] - std_dev * BB_STD
+
+        for w in VOLUME_SMA_WINDOWS:
+            row[f'Volume_SMA_{w}'] = self.volumes.mean(w)
+        for w in (10, 20):
+            sma = row[f'Volume_SMA_{w}']
+            row[f'Volume_Ratio_{w}'] = volume / sma if sma else np.nan
+        row['OBV'] = self.obv
+
+        self.last_close = close
+        self.last_time = str(pd.Timestamp(time)) if time is not None else None
+        self.bars += 1
+        self.last_row = row
+        return row
+
+    def to_dict(self) -> dict:
+        return {
+            'symbol': self.symbol,
+            'interval': self.interval,
+            'last_time': self.last_time,
+            'bars': self.bars,
+            'closes': list(self.closes.values),
+            'volumes': list(self.volumes.values),
+            'gains': list(self.gains.values),
+            'losses': list(self.losses.values),
+            'ema': {str(span): value for span, value in self.ema.items()},
+            'macd_signal': self.macd_signal,
+            'obv': self.obv,
+            'last_close': self.last_close,
+            'last_row': {k: (str(v) if k == 'time' else _json_float(v)) for k, v in self.last_row.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "IndicatorState":
+        state = cls(data['symbol'], data.get('interval', '1D'))
+        state.last_time = data['last_time']
+        state.bars = data['bars']
+        state.closes = WindowSums(CLOSE_SMA_WINDOWS, data['closes'])
+        state.volumes = WindowSums(VOLUME_SMA_WINDOWS, data['volumes'])
+        state.gains = WindowSums((RSI_WINDOW,), data['gains'])
+        state.losses = WindowSums((RSI_WINDOW,), data['losses'])
+        state.ema = {int(span): value for span, value in data['ema'].items()}
+        state.macd_signal = data['macd_signal']
+        state.obv = data['obv']
+        state.last_close = data['last_close']
+        state.last_row = {k: (v if v is not None else np.nan) for k, v in data.get('last_row', {}).items()}
+        return state
+
+
+def _json_float(value):
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+class IncrementalIndicatorEngine:
+    """Per-symbol indicator state that advances by only the bars it has not seen yet.
+
+    State is kept in memory and persisted as one small JSON file per
+    (symbol, interval), so a later process (the next intraday refresh or
+    tomorrow's batch run) resumes from the last computed bar instead of
+    recomputing the whole window.
+
+    Example:
+        >>> engine = IncrementalIndicatorEngine()
+        >>> engine.update("HPG", price_data)  # first call: every bar
+        >>> engine.update("HPG", refreshed_price_data)  # later: only bars after the last one seen
+    """
+
+    def __init__(self, state_dir: Optional[str] = None, persist: bool = True):
+        self.persist = persist
+        self.state_dir = Path(state_dir) if state_dir else None
+        self._states: Dict[Tuple[str, str], IndicatorState] = {}
+        # State before the last processed bar, so a revised last bar can replace it
+        self._previous: Dict[Tuple[str, str], Optional[IndicatorState]] = {}
+        self._lock = threading.Lock()
+
+    def _state_path(self, key: Tuple[str, str]) -> Path:
+        state_dir = self.state_dir or get_cache_dir("indicator_state")
+        return Path(state_dir, f"{key[0]}_{key[1]}.json")
+
+    def _load(self, key: Tuple[str, str]) -> Tuple[Optional[IndicatorState], Optional[IndicatorState]]:
+        if key in self._states:
+            return self._states[key], self._previous.get(key)
+        if not self.persist:
+            return None, None
+        path = self._state_path(key)
+        if not path.exists():
+            return None, None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            state = IndicatorState.from_dict(data['state'])
+            previous = IndicatorState.from_dict(data['previous']) if data.get('previous') else None
+        except (OSError, ValueError, KeyError):
+            # A corrupt or outdated state file only costs a full rebuild
+            return None, None
+        # Keep what was read, so a call that adds no bar (weekend rerun) still has it
+        self._states[key], self._previous[key] = state, previous
+        return state, previous
+
+    def _save(self, key: Tuple[str, str], state: IndicatorState, previous: Optional[IndicatorState]):
+        self._states[key] = state
+        self._previous[key] = previous
+        if not self.persist:
+            return
+        path = self._state_path(key)
+        tmp_path = path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({'state': state.to_dict(), 'previous': previous.to_dict() if previous else None}, f)
+        os.replace(tmp_path, path)
+
+    def update(self, symbol: str, bars: pd.DataFrame, interval: str = "1D", contiguous: bool = False) -> pd.DataFrame:
+        """Advance the symbol's indicators with `bars` and return rows for the bars processed.
+
+        Args:
+            symbol: Stock symbol.
+            bars: Price bars with 'time', 'close' and 'volume' columns, oldest first.
+            interval: Bar interval, kept as part of the state key.
+            contiguous: Set when `bars` directly continue the last processed bar
+                (e.g. a live feed). Otherwise `bars` must overlap the last
+                processed bar, or the state is rebuilt from `bars` to avoid
+                silently skipping a gap.
+
+        A bar with the same time as the last processed one replaces it, so an
+        intraday refresh of today's daily bar does not double count it. When
+        the closes of the bars before it differ from the processed ones
+        (prices adjusted for a dividend or split), the state is rebuilt.
+        """
+        key = (symbol.strip().upper(), interval)
+        times = pd.to_datetime(bars['time']) if 'time' in bars.columns else pd.Series([None] * len(bars))
+        closes = bars['close'].to_numpy(dtype=float)
+        volumes = bars['volume'].to_numpy(dtype=float)
+
+        with self._lock:
+            state, previous = self._load(key)
+            start = 0
+            if state is not None and state.last_time is not None and times.notna().all():
+                last_time = pd.Timestamp(state.last_time)
+                start = int(np.searchsorted(times.to_numpy(), np.datetime64(last_time), side="right"))
+                overlaps = start > 0 and times.iloc[start - 1] == last_time
+                if start == len(bars) and not overlaps:
+                    # Everything is older than the state: nothing new to add
+                    return pd.DataFrame(columns=['time', 'close', 'volume'] + INDICATOR_COLUMNS)
+                older = closes[max(start - REVISION_CHECK_BARS, 0):start - 1] if overlaps else closes[:0]
+                processed = list(state.closes.values)[-len(older) - 1:-1] if len(older) else []
+                if len(older) and len(processed) == len(older) and not np.array_equal(older, processed):
+                    # Earlier bars were adjusted (dividend, split): the whole state is stale
+                    state = None
+                elif overlaps and (closes[start - 1] != state.last_close or volumes[start - 1] != state.last_row.get('volume')):
+                    if previous is not None:
+                        # The last processed bar was revised: roll back and re-apply it
+                        state = copy.deepcopy(previous)
+                        start -= 1
+                    else:
+                        state = None
+                elif not overlaps and not contiguous:
+                    state = None
+            elif state is not None and not contiguous:
+                # Without timestamps there is no way to tell which bars are new
+                state = None
+
+            if state is None:
+                state = IndicatorState(key[0], interval)
+                start = 0
+
+            rows = []
+            previous = copy.deepcopy(state) if start < len(bars) else previous
+            for i in range(start, len(bars)):
+                if i == len(bars) - 1 and i > start:
+                    previous = copy.deepcopy(state)
+                rows.append(state.advance(times.iloc[i], closes[i], volumes[i]))
+
+            if rows:
+                self._save(key, state, previous)
+
+        return pd.DataFrame(rows, columns=['time', 'close', 'volume'] + INDICATOR_COLUMNS)
+
+    def latest(self, symbol: str, bars: pd.DataFrame, interval: str = "1D") -> pd.Series:
+        """Advance with `bars` and return the indicator values of the most recent bar."""
+        self.update(symbol, bars, interval)
+        key = (symbol.strip().upper(), interval)
+        with self._lock:
+            state, _ = self._load(key)
+        return pd.Series(state.last_row) if state is not None else pd.Series(dtype=float)
+
+    def reset(self, symbol: str, interval: str = "1D"):
+        """Forget the stored state of a symbol."""
+        key = (symbol.strip().upper(), interval)
+        with self._lock:
+            self._states.pop(key, None)
+            self._previous.pop(key, None)
+            if self.persist:
+                self._state_path(key).unlink(missing_ok=True)
+
+
+def compare_with_full_recomputation(bars: pd.DataFrame, chunk_size: int = 1, rtol: float = 1e-9, atol: float = 1e-6) -> Dict[str, float]:
+    """Replay `bars` through a fresh engine in chunks and compare with calculate_indicators.
+
+    Returns:
+        The largest absolute difference for each indicator column that is
+        outside the tolerance. An empty dict means the incremental engine
+        matches full recomputation.
+    """
+    bars = bars.reset_index(drop=True)
+    engine = IncrementalIndicatorEngine(persist=False)
+    chunks = [
+        engine.update("CHECK", bars.iloc[i:i + chunk_size], contiguous=True)
+        for i in range(0, len(bars), chunk_size)
+    ]
+    incremental = pd.concat(chunks, ignore_index=True)
+    full = calculate_indicators(bars)
+
+    mismatches = {}
+    for column in INDICATOR_COLUMNS:
+        expected = full[column].to_numpy(dtype=float)
+        actual = incremental[column].to_numpy(dtype=float)
+        if not np.allclose(actual, expected, rtol=rtol, atol=atol, equal_nan=True):
+            diff = np.abs(actual - expected)
+            diff[np.isnan(actual) != np.isnan(expected)] = np.inf
+            mismatches[column] = float(np.nanmax(diff))
+    return mismatches
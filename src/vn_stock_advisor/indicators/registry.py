@@ -0,0 +1,338 @@
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+PRICE_INPUTS = ('open', 'high', 'low', 'close', 'volume', 'time')
+
+
+def rolling(data, window: int, how: str):
+    """Trailing `window` aggregate (mean, std, sum, min or max) of a Series or a panel DataFrame.
+
+    pandas rolls a DataFrame one column at a time, which dominates panel
+    computations over hundreds of symbols; for DataFrames every window of
+    every column is reduced with numpy at once instead. Each window is
+    reduced on its own (no running sums), and flat windows give exactly
+    their value and a std of 0, as in pandas: halted or limit-locked
+    sessions must not turn equalities into float noise. A window containing
+    NaN yields NaN, as in pandas.
+    """
+    if not isinstance(data, pd.DataFrame):
+        return getattr(data.rolling(window=window), how)()
+    values = data.to_numpy(dtype=float)
+    result = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(values, window, axis=0)
+        if how in ('min', 'max', 'sum'):
+            reduced = getattr(windows, how)(axis=-1)
+        else:
+            low, high = windows.min(axis=-1), windows.max(axis=-1)
+            flat = low == high
+            if how == 'mean':
+                reduced = np.where(flat, low, windows.mean(axis=-1))
+            else:
+                reduced = np.where(flat, 0.0, windows.std(axis=-1, ddof=1))
+        result[window - 1:] = reduced
+    return pd.DataFrame(result, index=data.index, columns=data.columns)
+
+
+class IndicatorContext:
+    """Per-request cache of price columns, computed indicators and shared intermediates.
+
+    `df` is either one symbol's bars (columns are Series) or a panel mapping
+    each price column to a bars x symbols DataFrame, in which case every
+    indicator is computed for all symbols at once.
+
+    Intermediates such as a 20-bar rolling mean of close are memoized by
+    (operation, source, parameter), so SMA_20 and BB_Middle share a single
+    computation.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.results: Dict[str, pd.Series] = {}
+        self._cache: Dict[tuple, pd.Series] = {}
+
+    def column(self, name: str) -> pd.Series:
+        if name in self.results:
+            return self.results[name]
+        return self.df[name]
+
+    def _memo(self, key: tuple, compute: Callable[[], pd.Series]) -> pd.Series:
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def rolling_mean(self, source: str, window: int) -> pd.Series:
+        return self._memo(('mean', source, window), lambda: rolling(self.column(source), window, 'mean'))
+
+    def rolling_std(self, source: str, window: int) -> pd.Series:
+        return self._memo(('std', source, window), lambda: rolling(self.column(source), window, 'std'))
+
+    def rolling_sum(self, source: str, window: int) -> pd.Series:
+        return self._memo(('sum', source, window), lambda: rolling(self.column(source), window, 'sum'))
+
+    def ewm_mean(self, source: str, span: Optional[int] = None, alpha: Optional[float] = None) -> pd.Series:
+        return self._memo(
+            ('ewm', source, span, alpha),
+            lambda: self.column(source).ewm(span=span, alpha=alpha, adjust=False).mean(),
+        )
+
+    def diff(self, source: str) -> pd.Series:
+        return self._memo(('diff', source), lambda: self.column(source).diff())
+
+    def true_range(self) -> pd.Series:
+        def compute():
+            prev_close = self.column('close').shift()
+            high, low = self.column('high'), self.column('low')
+            # Element-wise max that skips NaN (no previous close on the first bar)
+            true_range = high - low
+            for gap in ((high - prev_close).abs(), (low - prev_close).abs()):
+                true_range = true_range.mask(gap > true_range, gap)
+            return true_range
+        return self._memo(('true_range',), compute)
+
+
+@dataclass(frozen=True)
+class Indicator:
+    """An output column, the columns it reads and the bars it needs before it is defined."""
+    name: str
+    compute: Callable[[IndicatorContext, dict], pd.Series]
+    inputs: Tuple[str, ...]
+    lookback: int
+    params: dict = field(default_factory=dict)
+
+
+class IndicatorRegistry:
+    """Named indicators resolved in dependency order.
+
+    Only the requested indicators (and whatever they depend on) are computed,
+    so registering more indicators does not slow down callers that don't ask
+    for them.
+
+    Example:
+        >>> registry.compute(price_data, ["RSI_14", "Volume_Ratio_20"])
+        >>> registry.lookback(["SMA_200"])  # 200
+    """
+
+    def __init__(self):
+        self._indicators: Dict[str, Indicator] = {}
+
+    def register(self, name: str, inputs: Iterable[str], lookback: int, **params):
+        """Decorator registering `compute(ctx, params) -> Series` under `name`."""
+        def decorator(compute):
+            self.add(Indicator(name, compute, tuple(inputs), lookback, params))
+            return compute
+        return decorator
+
+    def add(self, indicator: Indicator):
+        self._indicators[indicator.name] = indicator
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._indicators
+
+    def __getitem__(self, name: str) -> Indicator:
+        return self._indicators[name]
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._indicators)
+
+    def resolve(self, names: Iterable[str]) -> List[Indicator]:
+        """Return the indicators needed for `names`, dependencies first."""
+        ordered: List[Indicator] = []
+        visiting, done = set(), set()
+
+        def visit(name):
+            if name in done or name in PRICE_INPUTS:
+                return
+            if name not in self._indicators:
+                raise KeyError(f"Unknown indicator: {name}")
+            if name in visiting:
+                raise ValueError(f"Circular indicator dependency at {name}")
+            visiting.add(name)
+            indicator = self._indicators[name]
+            for dependency in indicator.inputs:
+                visit(dependency)
+            visiting.discard(name)
+            done.add(name)
+            ordered.append(indicator)
+
+        for name in names:
+            visit(name)
+        return ordered
+
+    def lookback(self, names: Iterable[str]) -> int:
+        """Return the number of bars needed for every indicator in `names` to be defined."""
+        return max((indicator.lookback for indicator in self.resolve(names)), default=1)
+
+    def required_inputs(self, names: Iterable[str]) -> List[str]:
+        """Return the price columns read by `names`."""
+        inputs = {i for indicator in self.resolve(names) for i in indicator.inputs if i in PRICE_INPUTS}
+        return [column for column in PRICE_INPUTS if column in inputs]
+
+    def compute(self, df: pd.DataFrame, names: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Compute `names` (default: every registered indicator) over the bars in `df`.
+
+        Returns:
+            A DataFrame aligned with `df` holding only the requested columns.
+        """
+        names = list(names) if names is not None else self.names
+        ctx = IndicatorContext(df)
+        for indicator in self.resolve(names):
+            ctx.results[indicator.name] = indicator.compute(ctx, indicator.params)
+        return pd.DataFrame({name: ctx.column(name) for name in names}, index=df.index)
+
+    def compute_panel(self, panel: Dict[str, pd.DataFrame], names: Iterable[str]) -> Dict[str, pd.DataFrame]:
+        """Compute `names` for many symbols at once.
+
+        Args:
+            panel: Price column name -> DataFrame of bars (rows) x symbols (columns).
+
+        Returns:
+            Indicator name -> DataFrame shaped like the panel.
+        """
+        names = list(names)
+        ctx = IndicatorContext(panel)
+        for indicator in self.resolve(names):
+            ctx.results[indicator.name] = indicator.compute(ctx, indicator.params)
+        return {name: ctx.column(name) for name in names}
+
+
+registry = IndicatorRegistry()
+
+
+def _register_sma(name, source, window):
+    registry.add(Indicator(name, lambda ctx, p: ctx.rolling_mean(p['source'], p['window']), (source,), window,
+                           {'source': source, 'window': window}))
+
+
+def _register_ema(name, source, span, lookback):
+    registry.add(Indicator(name, lambda ctx, p: ctx.ewm_mean(p['source'], span=p['span']), (source,), lookback,
+                           {'source': source, 'span': span}))
+
+
+# Moving averages
+for _window in (20, 50, 200):
+    _register_sma(f'SMA_{_window}', 'close', _window)
+
+# EMAs start on the first bar; ~3 spans are needed for the seed to fade out
+_register_ema('EMA_12', 'close', 12, 36)
+_register_ema('EMA_26', 'close', 26, 78)
+
+
+@registry.register('MACD', inputs=('EMA_12', 'EMA_26'), lookback=78)
+def _macd(ctx, p):
+    return ctx.column('EMA_12') - ctx.column('EMA_26')
+
+
+_register_ema('MACD_Signal', 'MACD', 9, 78 + 27)
+
+
+@registry.register('MACD_Hist', inputs=('MACD', 'MACD_Signal'), lookback=78 + 27)
+def _macd_hist(ctx, p):
+    return ctx.column('MACD') - ctx.column('MACD_Signal')
+
+
+@registry.register('RSI_14', inputs=('close',), lookback=15, window=14)
+def _rsi(ctx, p):
+    delta = ctx.diff('close')
+    gain = rolling(delta.where(delta > 0, 0), p['window'], 'mean')
+    loss = rolling(-delta.where(delta < 0, 0), p['window'], 'mean')
+
+    # Avoid division by zero
+    rs = gain / loss.replace(0, np.nan)
+    return (100 - (100 / (1 + rs))).fillna(50)  # Fill NaN values with neutral RSI
+
+
+# Bollinger Bands share the 20-bar rolling mean with SMA_20
+@registry.register('BB_Middle', inputs=('close',), lookback=20, window=20)
+def _bb_middle(ctx, p):
+    return ctx.rolling_mean('close', p['window'])
+
+
+@registry.register('BB_Upper', inputs=('BB_Middle',), lookback=20, window=20, num_std=2)
+def _bb_upper(ctx, p):
+    return ctx.column('BB_Middle') + ctx.rolling_std('close', p['window']) * p['num_std']
+
+
+@registry.register('BB_Lower', inputs=('BB_Middle',), lookback=20, window=20, num_std=2)
+def _bb_lower(ctx, p):
+    return ctx.column('BB_Middle') - ctx.rolling_std('close', p['window']) * p['num_std']
+
+
+# Volume
+for _window in (10, 20, 50):
+    _register_sma(f'Volume_SMA_{_window}', 'volume', _window)
+
+for _window in (10, 20):
+    registry.add(Indicator(
+        f'Volume_Ratio_{_window}',
+        lambda ctx, p: ctx.column('volume') / ctx.column(f"Volume_SMA_{p['window']}"),
+        ('volume', f'Volume_SMA_{_window}'),
+        _window,
+        {'window': _window},
+    ))
+
+
+@registry.register('OBV', inputs=('close', 'volume'), lookback=1)
+def _obv(ctx, p):
+    # +volume on up closes, -volume on down closes, starting from the first bar's volume
+    close = ctx.column('close')
+    direction = np.sign(ctx.diff('close')).mask(close.shift().isna() & close.notna(), 1)
+    return (direction.fillna(0) * ctx.column('volume')).cumsum()
+
+
+# Optional indicators, only computed when requested
+@registry.register('ATR_14', inputs=('high', 'low', 'close'), lookback=15, window=14)
+def _atr(ctx, p):
+    return rolling(ctx.true_range(), p['window'], 'mean')
+
+
+@registry.register('Stoch_K_14', inputs=('high', 'low', 'close'), lookback=14, window=14)
+def _stoch_k(ctx, p):
+    lowest = rolling(ctx.column('low'), p['window'], 'min')
+    highest = rolling(ctx.column('high'), p['window'], 'max')
+    return 100 * (ctx.column('close') - lowest) / (highest - lowest).replace(0, np.nan)
+
+
+@registry.register('Stoch_D_3', inputs=('Stoch_K_14',), lookback=16, window=3)
+def _stoch_d(ctx, p):
+    return ctx.rolling_mean('Stoch_K_14', p['window'])
+
+
+@registry.register('ADX_14', inputs=('high', 'low', 'close'), lookback=28, window=14)
+def _adx(ctx, p):
+    # Wilder smoothing is an EMA with alpha = 1 / window
+    alpha = 1 / p['window']
+    up_move = ctx.diff('high')
+    down_move = -ctx.diff('low')
+    plus_dm = up_move.where((up_move > down_move) & (up_move > 0), 0.0)
+    minus_dm = down_move.where((down_move > up_move) & (down_move > 0), 0.0)
+
+    atr = ctx.true_range().ewm(alpha=alpha, adjust=False).mean()
+    plus_di = 100 * plus_dm.ewm(alpha=alpha, adjust=False).mean() / atr
+    minus_di = 100 * minus_dm.ewm(alpha=alpha, adjust=False).mean() / atr
+    dx = 100 * (plus_di - minus_di).abs() / (plus_di + minus_di).replace(0, np.nan)
+    return dx.ewm(alpha=alpha, adjust=False).mean()
+
+
+@registry.register('VWAP', inputs=('high', 'low', 'close', 'volume'), lookback=1)
+def _vwap(ctx, p):
+    # Anchored to each trading day when bar times are available (intraday bars)
+    typical_volume = (ctx.column('high') + ctx.column('low') + ctx.column('close')) / 3 * ctx.column('volume')
+    if isinstance(ctx.df, pd.DataFrame) and 'time' in ctx.df.columns:
+        session = pd.to_datetime(ctx.df['time']).dt.date
+        return typical_volume.groupby(session).cumsum() / ctx.column('volume').groupby(session).cumsum()
+    return typical_volume.cumsum() / ctx.column('volume').cumsum()
+
+
+# Indicators reported by TechDataTool, in output order
+DEFAULT_INDICATORS = [
+    'SMA_20', 'SMA_50', 'SMA_200', 'EMA_12', 'EMA_26',
+    'MACD', 'MACD_Signal', 'MACD_Hist', 'RSI_14',
+    'BB_Middle', 'BB_Upper', 'BB_Lower',
+    'Volume_SMA_10', 'Volume_SMA_20', 'Volume_SMA_50',
+    'Volume_Ratio_10', 'Volume_Ratio_20', 'OBV',
+]
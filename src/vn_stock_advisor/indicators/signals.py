@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+# Indicators read by the rule set (plus the bar's 'volume')
+SIGNAL_INDICATORS = [
+    'SMA_20', 'SMA_50', 'SMA_200', 'RSI_14', 'MACD', 'MACD_Signal',
+    'BB_Upper', 'BB_Lower', 'Volume_SMA_10', 'Volume_SMA_20', 'Volume_SMA_50', 'Volume_Ratio_20',
+]
+
+# Every rule maps to one categorical column
+SIGNAL_COLUMNS = ['long_trend', 'short_trend', 'rsi_zone', 'macd', 'bollinger', 'volume_level', 'volume_trend', 'volume_signal']
+
+# Contribution of each signal value to the composite score
+SIGNAL_SCORES = {
+    'long_trend': {'UP': 1, 'DOWN': -1},
+    'short_trend': {'UP': 1, 'DOWN': -1},
+    'rsi_zone': {'OVERSOLD': 1, 'OVERBOUGHT': -1},
+    'macd': {'POSITIVE': 1, 'NEGATIVE': -1},
+    'bollinger': {'BELOW_LOWER': 1, 'NEAR_LOWER': 1, 'NEAR_UPPER': -1, 'ABOVE_UPPER': -1},
+    'volume_signal': {'POSITIVE': 1, 'NEGATIVE': -1},
+}
+
+
+def _select(conditions, choices, default):
+    # NaN comparisons are False, so missing indicators fall through to `default`.
+    # Selecting label positions and taking the labels once is much cheaper than
+    # np.select on strings for large panels.
+    labels = np.array(list(choices) + [default])
+    codes = np.select([np.asarray(c, dtype=bool) for c in conditions], range(len(choices)), default=len(choices))
+    result = labels[codes]
+    return result.item() if result.ndim == 0 else result
+
+
+def classify_signals(indicators, price):
+    """Evaluate the TechDataTool rule set.
+
+    Works on scalars (one symbol, e.g. the latest indicator row) or on aligned
+    arrays/Series (many symbols at once), so the agent report and the
+    market-wide screener apply exactly the same rules.
+
+    Args:
+        indicators: Mapping with the SIGNAL_INDICATORS values and 'volume'.
+        price: Current price(s).
+
+    Returns:
+        A dict from signal name to its category (a string, or an array of strings).
+    """
+    def get(name):
+        return np.asarray(indicators[name], dtype=float)
+
+    price = np.asarray(price, dtype=float)
+    sma_20, sma_50, sma_200 = get('SMA_20'), get('SMA_50'), get('SMA_200')
+    bb_upper, bb_lower = get('BB_Upper'), get('BB_Lower')
+    rsi = get('RSI_14')
+    volume_ratio_20 = get('Volume_Ratio_20')
+    volume_sma_10, volume_sma_20, volume_sma_50 = get('Volume_SMA_10'), get('Volume_SMA_20'), get('Volume_SMA_50')
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        position = (price - bb_lower) / (bb_upper - bb_lower)
+
+    return {
+        'long_trend': _select(
+            [(price > sma_200) & (sma_50 > sma_200), (price < sma_200) & (sma_50 < sma_200)],
+            ['UP', 'DOWN'], 'NEUTRAL'),
+        'short_trend': _select(
+            [(price > sma_20) & (sma_20 > sma_50), (price < sma_20) & (sma_20 < sma_50)],
+            ['UP', 'DOWN'], 'NEUTRAL'),
+        'rsi_zone': _select([rsi > 70, rsi < 30], ['OVERBOUGHT', 'OVERSOLD'], 'NEUTRAL'),
+        'macd': _select([get('MACD') > get('MACD_Signal')], ['POSITIVE'], 'NEGATIVE'),
+        'bollinger': _select(
+            [price > bb_upper, price < bb_lower, position > 0.8, position < 0.2],
+            ['ABOVE_UPPER', 'BELOW_LOWER', 'NEAR_UPPER', 'NEAR_LOWER'], 'MIDDLE'),
+        'volume_level': _select(
+            [volume_ratio_20 > 2.0, volume_ratio_20 > 1.5, volume_ratio_20 < 0.5],
+            ['VERY_HIGH', 'HIGH', 'LOW'], 'NORMAL'),
+        'volume_trend': _select(
+            [(volume_sma_10 > volume_sma_20) & (volume_sma_20 > volume_sma_50),
+             (volume_sma_10 < volume_sma_20) & (volume_sma_20 < volume_sma_50)],
+            ['UP', 'DOWN'], 'NEUTRAL'),
+        'volume_signal': _select(
+            [(get('volume') > volume_sma_20 * 1.5) & (price > sma_20), get('volume') > volume_sma_20 * 1.5],
+            ['POSITIVE', 'NEGATIVE'], 'NONE'),
+    }
+
+
+def signal_score(signals) -> np.ndarray:
+    """Sum bullish (+1) and bearish (-1) signals into one composite score."""
+    score = 0
+    for name, values in SIGNAL_SCORES.items():
+        categories = np.asarray(signals[name])
+        for category, points in values.items():
+            score = score + points * (categories == category)
+    return score
+
+
+def signals_frame(indicators: pd.DataFrame, price) -> pd.DataFrame:
+    """Return the signal categories and score for every row of `indicators`."""
+    signals = classify_signals(indicators, price)
+    frame = pd.DataFrame({name: np.atleast_1d(signals[name]) for name in SIGNAL_COLUMNS}, index=indicators.index)
+    frame['score'] = np.atleast_1d(signal_score(signals))
+    return frame
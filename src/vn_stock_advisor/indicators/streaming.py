@@ -0,0 +1,69 @@
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+
+from vn_stock_advisor.data.intraday import BASE_INTERVAL, BarAggregator, aggregate_bars
+from vn_stock_advisor.indicators.incremental import IndicatorState
+
+DEFAULT_INTRADAY_INTERVALS = ('5m', '15m', '1H')
+
+
+class StreamingIndicators:
+    """Intraday indicators of one symbol on several timeframes, fed one base bar at a time.
+
+    Each timeframe keeps a BarAggregator (the bar being formed) and an
+    IndicatorState, whose windows are fixed-size ring buffers as long as the
+    longest indicator (SMA 200). Memory therefore stays constant however
+    long the session runs, and every completed bar costs one incremental update.
+
+    Example:
+        >>> stream = StreamingIndicators("HPG", intervals=("5m", "1H"))
+        >>> stream.warm_up(minute_bars)  # history, aggregated in one pass
+        >>> stream.on_bar(time, open, high, low, close, volume)  # {"5m": {...}} when a 5m bar closes
+        >>> stream.latest("1H")
+    """
+
+    def __init__(self, symbol: str, intervals: Iterable[str] = DEFAULT_INTRADAY_INTERVALS,
+                 base_interval: str = BASE_INTERVAL):
+        self.symbol = symbol.strip().upper()
+        self.base_interval = base_interval
+        self.intervals = tuple(intervals)
+        self.aggregators = {i: BarAggregator(i, base_interval) for i in self.intervals}
+        self.states = {i: IndicatorState(self.symbol, i) for i in self.intervals}
+
+    def warm_up(self, bars: pd.DataFrame):
+        """Seed every timeframe from historical base bars (oldest first)."""
+        for interval in self.intervals:
+            aggregated = aggregate_bars(bars, interval)
+            state = self.states[interval]
+            # The last bucket may still be forming: hand it to the aggregator instead
+            for time, close, volume in zip(aggregated['time'].iloc[:-1], aggregated['close'].iloc[:-1],
+                                           aggregated['volume'].iloc[:-1]):
+                state.advance(time, close, volume)
+            if not aggregated.empty:
+                self.aggregators[interval].resume(aggregated.iloc[-1].to_dict())
+
+    def on_bar(self, time, open_, high, low, close, volume) -> Dict[str, dict]:
+        """Consume one base bar; return the indicator rows of the timeframes whose bar just closed."""
+        updates = {}
+        for interval in self.intervals:
+            for bar in self.aggregators[interval].push(time, open_, high, low, close, volume):
+                updates[interval] = self.states[interval].advance(bar['time'], bar['close'], bar['volume'])
+        return updates
+
+    def close_day(self) -> Dict[str, dict]:
+        """Close the bars still being formed (e.g. when the feed stops for the day)."""
+        updates = {}
+        for interval in self.intervals:
+            bar = self.aggregators[interval].flush()
+            if bar is not None:
+                updates[interval] = self.states[interval].advance(bar['time'], bar['close'], bar['volume'])
+        return updates
+
+    def latest(self, interval: str) -> Optional[dict]:
+        """Return the indicator row of the last completed `interval` bar."""
+        return self.states[interval].last_row or None
+
+    def forming(self, interval: str) -> Optional[dict]:
+        return self.aggregators[interval].current
+
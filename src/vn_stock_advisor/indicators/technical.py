@@ -0,0 +1,18 @@
+import pandas as pd
+
+from vn_stock_advisor.indicators.registry import DEFAULT_INDICATORS, registry
+
+# Sessions needed for every default indicator to be defined on the last bar (SMA_200)
+LOOKBACK_BARS = registry.lookback(DEFAULT_INDICATORS)
+
+
+def calculate_indicators(df, indicators=None):
+    """Calculate technical indicators and append them to the price data.
+
+    Args:
+        df: Price bars with at least 'close' and 'volume' columns.
+        indicators: Registered indicator names to compute. Defaults to the
+            set reported by TechDataTool.
+    """
+    computed = registry.compute(df, indicators or DEFAULT_INDICATORS)
+    return pd.concat([df, computed], axis=1)
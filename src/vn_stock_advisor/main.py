@@ -3,6 +3,7 @@ import warnings
 from datetime import date
 
 from vn_stock_advisor.crew import VnStockAdvisor
+from vn_stock_advisor.utils.tracing import report_run
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
@@ -24,5 +25,8 @@ def run():
         VnStockAdvisor().crew().kickoff(inputs=inputs)
     except Exception as e:
         raise Exception(f"An error occurred while running the crew: {e}")
+    finally:
+        # Where the run spent its time: agents, LLM calls, tools, data fetches
+        print(report_run())
 
 
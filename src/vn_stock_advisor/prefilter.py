@@ -0,0 +1,312 @@
+"""
+Deterministic pre-analysis stage in front of the VnStockAdvisor crew.
+
+Every ticker is scored from the same data the crew's tools read (financial
+ratios as in FundDataTool, indicators and signal rules as in TechDataTool).
+Only tickers scoring at or above the threshold are sent to the full crew;
+the rest get a rules-based summary in the InvestmentDecision format without
+any LLM call.
+"""
+
+import argparse
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from vn_stock_advisor.data.calendar import DateLike
+from vn_stock_advisor.data.decision_ledger import DecisionLedger
+from vn_stock_advisor.data.fundamentals import load_fundamentals
+from vn_stock_advisor.data.history import HistoryLoader
+from vn_stock_advisor.indicators.registry import registry
+from vn_stock_advisor.indicators.signals import SIGNAL_INDICATORS, classify_signals, signal_score
+from vn_stock_advisor.indicators.technical import LOOKBACK_BARS
+from vn_stock_advisor.tools.custom_tool import TechDataTool
+from vn_stock_advisor.utils.text import fold_diacritics
+
+DEFAULT_THRESHOLD = 3
+INDUSTRY_AVERAGES_PATH = "knowledge/PE_PB_industry_average.json"
+
+
+def fetch_fundamentals(symbol: str, as_of: Optional[DateLike] = None, source: Optional[str] = None) -> dict:
+    """Fetch the ratios scored by the pre-filter, as FundDataTool sees them on `as_of`."""
+    data = load_fundamentals(symbol, as_of=as_of, source=source)
+    return {
+        'full_name': data.full_name,
+        'industry': data.industry,
+        'pe': data.ratio('price_to_earning'),
+        'pb': data.ratio('price_to_book'),
+        'roe': data.ratio('roe'),
+        'debt_on_equity': data.ratio('debt_on_equity'),
+        # Latest quarter against the same quarter last year
+        'profit_growth_yoy': data.latest('post_tax_profit_yoy'),
+    }
+
+
+def load_industry_averages(path: str = INDUSTRY_AVERAGES_PATH) -> Dict[str, dict]:
+    """Return industry P/E, P/B averages keyed by accent-folded industry name."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f).get("data", {})
+    except (OSError, ValueError):
+        return {}
+    return {fold_diacritics(name): values for name, values in data.items()}
+
+
+@dataclass
+class PreFilterResult:
+    """Score and reasons for one ticker."""
+    symbol: str
+    date: str
+    score: int
+    tech_score: int
+    fund_score: int
+    escalate: bool
+    threshold: int = DEFAULT_THRESHOLD
+    full_name: str = ""
+    industry: str = ""
+    signals: Dict[str, str] = field(default_factory=dict)
+    fund_reasons: List[str] = field(default_factory=list)
+    tech_reasoning: str = ""
+    error: Optional[str] = None
+
+    @property
+    def decision(self) -> str:
+        """Rules-based recommendation; escalated tickers get theirs from the crew."""
+        return "BÁN" if self.score <= -self.threshold else "GIỮ"
+
+    def to_decision(self) -> dict:
+        """Return the rules-based summary with the fields of InvestmentDecision."""
+        fund_reasoning = "\n".join(self.fund_reasons) or "Không đủ dữ liệu cơ bản để đánh giá."
+        return {
+            'stock_ticker': self.symbol,
+            'full_name': self.full_name,
+            'industry': self.industry,
+            'today_date': self.date,
+            'decision': self.decision,
+            'macro_reasoning': "Không phân tích (mã không vượt qua vòng lọc sơ bộ).",
+            'fund_reasoning': f"Điểm cơ bản: {self.fund_score:+d}\n{fund_reasoning}",
+            'tech_reasoning': f"Điểm kỹ thuật: {self.tech_score:+d}\n{self.tech_reasoning}",
+        }
+
+
+class PreFilter:
+    """Score tickers without LLM calls and decide which ones go to the crew.
+
+    The technical score is the TechDataTool signal score (-6 to +6). The
+    fundamental score adds one point per favourable ratio and removes one per
+    unfavourable ratio: P/E and P/B against the industry average, ROE,
+    debt/equity and year-over-year profit growth.
+
+    A ticker whose data can't be fetched or scored (data outage, rate
+    limit, unknown symbol) is not escalated by default: the crew reads the
+    same sources and would fail too, after spending LLM calls.
+    `escalate_on_error` sends it to the crew anyway.
+
+    Example:
+        >>> prefilter = PreFilter(threshold=3)
+        >>> result = prefilter.evaluate("HPG")
+        >>> result.escalate, result.score
+    """
+
+    def __init__(
+        self,
+        threshold: int = DEFAULT_THRESHOLD,
+        history_loader: Optional[HistoryLoader] = None,
+        fundamentals_fetcher: Optional[Callable[..., dict]] = None,
+        industry_averages: Optional[Dict[str, dict]] = None,
+        escalate_on_error: bool = False,
+    ):
+        self.threshold = threshold
+        self.escalate_on_error = escalate_on_error
+        self.history_loader = history_loader or HistoryLoader()
+        self.fundamentals_fetcher = fundamentals_fetcher or fetch_fundamentals
+        self.industry_averages = load_industry_averages() if industry_averages is None else industry_averages
+
+    def evaluate(self, symbol: str, current_date: Optional[DateLike] = None) -> PreFilterResult:
+        """Score `symbol` as of `current_date` (default today)."""
+        symbol = symbol.strip().upper()
+        day = str(pd.Timestamp(current_date or date.today()).date())
+        try:
+            tech_score, signals, tech_reasoning = self.technical_score(symbol, day)
+            # Past dates only see reports published by then; today sees the latest ones
+            as_of = day if pd.Timestamp(day) < pd.Timestamp(date.today()) else None
+            fundamentals = self.fundamentals_fetcher(symbol, as_of=as_of)
+            fund_score, fund_reasons = self.fundamental_score(fundamentals)
+        except Exception as e:
+            return PreFilterResult(symbol, day, 0, 0, 0, self.escalate_on_error, self.threshold,
+                                   error=f"{type(e).__name__}: {e}")
+
+        score = tech_score + fund_score
+        return PreFilterResult(
+            symbol, day, score, tech_score, fund_score, score >= self.threshold, self.threshold,
+            full_name=fundamentals.get('full_name') or symbol,
+            industry=fundamentals.get('industry') or "Unknown",
+            signals=signals, fund_reasons=fund_reasons, tech_reasoning=tech_reasoning,
+        )
+
+    def technical_score(self, symbol: str, day: str):
+        """Return (score, signal categories, TechDataTool analysis text)."""
+        bars = self.history_loader.load(symbol, bars=LOOKBACK_BARS, end=day)
+        if bars.empty:
+            raise ValueError(f"No price data for symbol {symbol}")
+        latest = registry.compute(bars, SIGNAL_INDICATORS).iloc[-1].to_dict()
+        latest['volume'] = bars['volume'].iloc[-1]
+        price = bars['close'].iloc[-1]
+
+        signals = classify_signals(latest, price)
+        text = TechDataTool()._get_technical_analysis(latest, price, "")
+        return int(signal_score(signals)), signals, text
+
+    def fundamental_score(self, fundamentals: dict):
+        """Return (score, reasons) for the ratios in `fundamentals`."""
+        score, reasons = 0, []
+
+        def add(points, reason):
+            nonlocal score
+            score += points
+            reasons.append(f"- {reason} ({points:+d})")
+
+        industry = self.industry_averages.get(fold_diacritics(str(fundamentals.get('industry') or "")), {})
+        pe, pb = fundamentals.get('pe'), fundamentals.get('pb')
+        industry_pe, industry_pb = industry.get('PE'), industry.get('PB')
+
+        if pe is not None and pe <= 0:
+            add(-1, "P/E âm: doanh nghiệp đang lỗ")
+        elif pe is not None and industry_pe and industry_pe > 0:
+            if pe < industry_pe:
+                add(1, f"P/E {pe:.2f} thấp hơn trung bình ngành {industry_pe:.2f}")
+            elif pe > 1.5 * industry_pe:
+                add(-1, f"P/E {pe:.2f} cao hơn 1,5 lần trung bình ngành {industry_pe:.2f}")
+
+        if pb is not None and industry_pb and industry_pb > 0 and pb > 0:
+            if pb < industry_pb:
+                add(1, f"P/B {pb:.2f} thấp hơn trung bình ngành {industry_pb:.2f}")
+            elif pb > 1.5 * industry_pb:
+                add(-1, f"P/B {pb:.2f} cao hơn 1,5 lần trung bình ngành {industry_pb:.2f}")
+
+        # vnstock (TCBS) reports ROE as a fraction
+        roe = fundamentals.get('roe')
+        if roe is not None:
+            if roe >= 0.15:
+                add(1, f"ROE cao ({roe:.1%})")
+            elif roe < 0.05:
+                add(-1, f"ROE thấp ({roe:.1%})")
+
+        # Leverage is structural for banks, so D/E is only scored for other industries
+        de = fundamentals.get('debt_on_equity')
+        if de is not None and de > 2 and "ngan hang" not in fold_diacritics(str(fundamentals.get('industry') or "")):
+            add(-1, f"Hệ số nợ trên vốn chủ sở hữu cao (D/E {de:.2f})")
+
+        growth = fundamentals.get('profit_growth_yoy')
+        if growth is not None:
+            if growth > 0.2:
+                add(1, f"Lợi nhuận sau thuế tăng {growth:.0%} so với cùng kỳ")
+            elif growth < -0.2:
+                add(-1, f"Lợi nhuận sau thuế giảm {-growth:.0%} so với cùng kỳ")
+
+        return score, reasons
+
+
+def run_batch(
+    symbols: Iterable[str],
+    threshold: int = DEFAULT_THRESHOLD,
+    current_date: Optional[DateLike] = None,
+    output_file: Optional[str] = "batch_decisions.json",
+    prefilter: Optional[PreFilter] = None,
+    crew_factory: Optional[Callable[[], object]] = None,
+    ledger: Optional[DecisionLedger] = None,
+    escalate_on_error: bool = False,
+) -> List[dict]:
+    """Pre-filter `symbols`, run the crew only for escalated ones and collect every decision.
+
+    A symbol that fails (data error, crew error) gets a record with source
+    "error" and the batch goes on; with `escalate_on_error`, symbols whose
+    data can't be scored go to the crew instead. `output_file` is rewritten after every
+    symbol, so a long batch that stops still leaves the decisions made so far.
+
+    Args:
+        crew_factory: Returns a crew to kick off (default: VnStockAdvisor().crew(),
+            which records its own decisions in the ledger).
+        ledger: Where rules-based decisions are recorded (default: the local ledger).
+    """
+    prefilter = prefilter or PreFilter(threshold=threshold, escalate_on_error=escalate_on_error)
+    day = str(pd.Timestamp(current_date or date.today()).date())
+    decisions = []
+
+    try:
+        for symbol in symbols:
+            record = {}
+            try:
+                result = prefilter.evaluate(symbol, day)
+                record['prefilter'] = {k: v for k, v in asdict(result).items() if k in ('score', 'tech_score', 'fund_score', 'escalate', 'error')}
+                if result.escalate:
+                    if crew_factory is None:
+                        from vn_stock_advisor.crew import VnStockAdvisor
+                        crew_factory = lambda: VnStockAdvisor().crew()
+                    output = crew_factory().kickoff(inputs={"symbol": result.symbol, "current_date": day})
+                    decision = getattr(output, 'json_dict', None) or {'stock_ticker': result.symbol, 'raw': str(output)}
+                    record.update(decision, source="crew")
+                elif result.error:
+                    print(f"Không chấm điểm được mã {result.symbol}: {result.error}")
+                    record.update(stock_ticker=result.symbol, today_date=day, error=result.error, source="error")
+                else:
+                    record.update(result.to_decision(), source="rules")
+            except Exception as e:
+                print(f"Lỗi khi xử lý mã {symbol}: {e}")
+                record.update(stock_ticker=str(symbol).strip().upper(), today_date=day,
+                              error=f"{type(e).__name__}: {e}", source="error")
+            decisions.append(record)
+            if output_file:
+                _write_decisions(output_file, decisions)
+    finally:
+        rules_based = [d for d in decisions if d['source'] == "rules"]
+        if rules_based:
+            (ledger or DecisionLedger()).append(rules_based, config=f"prefilter-{prefilter.threshold}", model="rules", source="rules")
+    return decisions
+
+
+def _write_decisions(path: str, decisions: List[dict]):
+    # Through a temporary file, so the output is never left half-written
+    tmp_path = Path(f"{path}.tmp")
+    tmp_path.write_text(json.dumps(decisions, ensure_ascii=False, indent=2, default=str), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def main():
+    """Pre-filter a list of tickers from the command line."""
+    parser = argparse.ArgumentParser(description="Lọc sơ bộ danh sách mã, chỉ chạy phân tích đầy đủ cho mã có điểm cao.")
+    parser.add_argument("symbols", help="Danh sách mã, phân tách bằng dấu phẩy, ví dụ: HPG,FPT,VNM")
+    parser.add_argument("--threshold", type=int, default=DEFAULT_THRESHOLD, help="Điểm tối thiểu để chạy phân tích đầy đủ")
+    parser.add_argument("--date", help="Ngày phân tích (YYYY-MM-DD)")
+    parser.add_argument("--output", default="batch_decisions.json", help="Tệp kết quả")
+    parser.add_argument("--dry-run", action="store_true", help="Chỉ chấm điểm, không chạy phân tích đầy đủ")
+    parser.add_argument("--escalate-on-error", action="store_true",
+                        help="Vẫn chạy phân tích đầy đủ cho mã không lấy được dữ liệu để chấm điểm")
+    args = parser.parse_args()
+
+    symbols = [s for s in args.symbols.split(",") if s.strip()]
+    if args.dry_run:
+        prefilter = PreFilter(threshold=args.threshold, escalate_on_error=args.escalate_on_error)
+        for symbol in symbols:
+            result = prefilter.evaluate(symbol, args.date)
+            if result.error and not result.escalate:
+                print(f"{result.symbol}: lỗi dữ liệu ({result.error})")
+                continue
+            status = "-> crew" if result.escalate else result.decision
+            print(f"{result.symbol}: {result.score:+d} (kỹ thuật {result.tech_score:+d}, cơ bản {result.fund_score:+d}) {status}")
+        return
+
+    decisions = run_batch(symbols, threshold=args.threshold, current_date=args.date, output_file=args.output,
+                          escalate_on_error=args.escalate_on_error)
+    escalated = sum(d['source'] == "crew" for d in decisions)
+    failed = sum(d['source'] == "error" for d in decisions)
+    print(f"Đã xử lý {len(decisions)} mã, {escalated} mã được phân tích đầy đủ, {failed} mã lỗi. Kết quả: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Market-wide technical screener.
+
+Evaluates the same rules as TechDataTool._get_technical_analysis for every
+symbol in the local price store at once, to pick which tickers deserve a
+full crew run.
+"""
+
+import argparse
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from vn_stock_advisor.data.calendar import DateLike
+from vn_stock_advisor.data.price_store import PRICE_COLUMNS, PriceStore
+from vn_stock_advisor.indicators.registry import registry
+from vn_stock_advisor.indicators.signals import SIGNAL_INDICATORS, signals_frame
+from vn_stock_advisor.indicators.technical import LOOKBACK_BARS
+
+Query = Union[str, Callable[[pd.DataFrame], pd.Series]]
+
+
+def build_panel(store: PriceStore, symbols: Sequence[str], bars: int, end: Optional[DateLike] = None,
+                interval: str = "1D", columns: Optional[List[str]] = None) -> Tuple[Dict[str, pd.DataFrame], pd.Series]:
+    """Load the last `bars` bars of each symbol into bars x symbols arrays.
+
+    Each symbol is right-aligned on its own bar sequence (row -1 is its
+    latest bar), so indicators match a per-symbol computation even when a
+    symbol was halted on some sessions. Shorter histories are NaN-padded.
+
+    Args:
+        columns: Price columns to load (default: all).
+
+    Returns:
+        (panel, last bar time per symbol)
+    """
+    columns = list(columns or PRICE_COLUMNS)
+    arrays = {column: np.full((bars, len(symbols)), np.nan) for column in columns}
+    last_times = np.full(len(symbols), np.datetime64("NaT"), dtype="datetime64[ns]")
+
+    for j, symbol in enumerate(symbols):
+        records = store.tail_records(symbol, bars, end=end, interval=interval)
+        n = len(records)
+        if n == 0:
+            continue
+        for column in columns:
+            arrays[column][bars - n:, j] = records[column]
+        last_times[j] = records['time'][-1]
+
+    panel = {column: pd.DataFrame(values, columns=list(symbols)) for column, values in arrays.items()}
+    return panel, pd.Series(last_times, index=list(symbols), name='time')
+
+
+class TechnicalScreener:
+    """Rank symbols from the local price store by TechDataTool's technical signals.
+
+    Example:
+        >>> screener = TechnicalScreener()
+        >>> screener.screen("RSI_14 < 30 and Volume_Ratio_20 > 1.5")
+        >>> screener.screen(lambda df: df['long_trend'] == 'UP', limit=20)
+    """
+
+    def __init__(self, store: Optional[PriceStore] = None, bars: int = LOOKBACK_BARS):
+        self.store = store or PriceStore()
+        self.bars = bars
+
+    def snapshot(self, symbols: Optional[Iterable[str]] = None, end: Optional[DateLike] = None,
+                 indicators: Optional[Iterable[str]] = None, fresh_only: bool = True) -> pd.DataFrame:
+        """Return the latest indicators, signal categories and score for every symbol.
+
+        Args:
+            symbols: Symbols to evaluate. Defaults to every symbol in the store.
+            end: Evaluate as of this date instead of the latest stored bar.
+            indicators: Extra registered indicators to include (e.g. "ATR_14").
+            fresh_only: Drop symbols whose last bar is older than the most
+                recent bar in the panel (delisted or halted).
+        """
+        symbols = [s.strip().upper() for s in symbols] if symbols is not None else self.store.symbols()
+        names = list(dict.fromkeys(SIGNAL_INDICATORS + list(indicators or [])))
+        if not symbols:
+            return pd.DataFrame(columns=['time', 'close', 'volume'] + names)
+
+        bars = max(self.bars, registry.lookback(names))
+        # 'close' and 'volume' are always needed for the signal rules
+        columns = [c for c in PRICE_COLUMNS if c in ('close', 'volume') or c in registry.required_inputs(names)]
+        panel, last_times = build_panel(self.store, symbols, bars, end=end, columns=columns)
+        computed = registry.compute_panel(panel, names)
+
+        table = pd.DataFrame({'time': last_times})
+        table['close'] = panel['close'].iloc[-1].to_numpy()
+        table['volume'] = panel['volume'].iloc[-1].to_numpy()
+        for name in names:
+            table[name] = computed[name].iloc[-1].to_numpy()
+        table.index.name = 'symbol'
+
+        table = table[table['time'].notna()]
+        if fresh_only and not table.empty:
+            table = table[table['time'] == table['time'].max()]
+
+        return pd.concat([table, signals_frame(table, table['close'])], axis=1)
+
+    def screen(self, query: Optional[Query] = None, symbols: Optional[Iterable[str]] = None,
+               end: Optional[DateLike] = None, sort_by: Union[str, List[str]] = ('score', 'Volume_Ratio_20'),
+               ascending: bool = False, limit: Optional[int] = None,
+               indicators: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Return the symbols matching `query`, ranked by `sort_by`.
+
+        Args:
+            query: A pandas query string over the snapshot columns (indicator
+                names, signal categories such as rsi_zone == 'OVERSOLD', score),
+                or a callable returning a boolean mask.
+            limit: Keep only the top rows.
+        """
+        table = self.snapshot(symbols, end=end, indicators=indicators)
+        if query is not None and not table.empty:
+            table = table.query(query) if isinstance(query, str) else table[query(table)]
+        table = table.sort_values(list([sort_by] if isinstance(sort_by, str) else sort_by), ascending=ascending)
+        return table.head(limit) if limit else table
+
+
+def main():
+    """Screen the local price store from the command line."""
+    parser = argparse.ArgumentParser(description="Lọc cổ phiếu theo tín hiệu kỹ thuật từ dữ liệu giá đã lưu.")
+    parser.add_argument("query", nargs="?", help="Điều kiện lọc, ví dụ: \"RSI_14 < 30 and Volume_Ratio_20 > 1.5\"")
+    parser.add_argument("--symbols", help="Danh sách mã, phân tách bằng dấu phẩy (mặc định: toàn bộ dữ liệu đã lưu)")
+    parser.add_argument("--end", help="Ngày đánh giá (YYYY-MM-DD)")
+    parser.add_argument("--limit", type=int, default=30, help="Số dòng tối đa")
+    args = parser.parse_args()
+
+    symbols = args.symbols.split(",") if args.symbols else None
+    result = TechnicalScreener().screen(args.query, symbols=symbols, end=args.end, limit=args.limit)
+    columns = ['time', 'close', 'RSI_14', 'Volume_Ratio_20', 'long_trend', 'short_trend', 'rsi_zone', 'macd', 'bollinger', 'score']
+    print(result[columns].to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,8 @@ import time
 from typing import Type, Optional, Any
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
+from vn_stock_advisor.data.cassette import http_get, replaying
+from vn_stock_advisor.utils.tracing import annotate, traced_tool
 
 class BraveSearchInput(BaseModel):
     """Input schema for Brave Search Tool"""
@@ -35,6 +37,7 @@ class BraveSearchTool(BaseTool):
         self._api_key = api_key or os.environ.get("BRAVE_API_KEY")
         self._base_url = "https://api.search.brave.com/res/v1/web/search"
     
+    @traced_tool
     def _run(self, query: str, count: int = 10, country: str = "ALL", freshness: str = "") -> str:
         """
         Execute search using Brave Search API
@@ -49,7 +52,7 @@ class BraveSearchTool(BaseTool):
             Formatted search results as string
         """
         try:
-            if not self._api_key:
+            if not self._api_key and not replaying():
                 return "Error: Brave Search API key not found. Please set BRAVE_API_KEY environment variable."
             
             headers = {
@@ -78,7 +81,7 @@ class BraveSearchTool(BaseTool):
             if freshness and freshness in valid_freshness:
                 params["freshness"] = freshness
             
-            response = requests.get(self._base_url, headers=headers, params=params)
+            response = http_get("brave", self._base_url, headers=headers, params=params)
             
             # Handle rate limiting
             if response.status_code == 429:
@@ -88,7 +91,7 @@ class BraveSearchTool(BaseTool):
                 try:
                     # Retry with minimal parameters
                     simple_params = {"q": query, "count": min(count, 10)}
-                    simple_response = requests.get(self._base_url, headers=headers, params=simple_params)
+                    simple_response = http_get("brave", self._base_url, headers=headers, params=simple_params)
                     simple_response.raise_for_status()
                     data = simple_response.json()
                 except Exception as fallback_error:
@@ -97,51 +100,9 @@ class BraveSearchTool(BaseTool):
             response.raise_for_status()
             
             data = response.json()
+            annotate(bytes=len(response.content))
             
-            # Format results
-            results = []
-            
-            # Web results
-            web_results = data.get("web", {}).get("results", [])
-            if web_results:
-                results.append("🔍 **Web Search Results:**")
-                for i, result in enumerate(web_results[:count], 1):
-                    title = result.get("title", "No title")
-                    url = result.get("url", "")
-                    description = result.get("description", "No description")
-                    age = result.get("age", "")
-                    
-                    results.append(f"{i}. **{title}**")
-                    if age:
-                        results.append(f"   📅 {age}")
-                    results.append(f"   {description}")
-                    results.append(f"   🔗 {url}")
-                    results.append("")
-            
-            # News results
-            news_results = data.get("news", {}).get("results", [])
-            if news_results:
-                results.append("📰 **News Results:**")
-                for i, result in enumerate(news_results[:min(count, 5)], 1):
-                    title = result.get("title", "No title")
-                    url = result.get("url", "")
-                    description = result.get("description", "No description")
-                    age = result.get("age", "")
-                    source = result.get("meta", {}).get("url", "")
-                    
-                    results.append(f"{i}. **{title}**")
-                    if age:
-                        results.append(f"   📅 {age}")
-                    if source:
-                        results.append(f"   🏢 Source: {source}")
-                    results.append(f"   {description}")
-                    results.append(f"   🔗 {url}")
-                    results.append("")
-            
-            if not results:
-                return "No search results found for the given query."
-            
-            return "\n".join(results)
+            return self._format_results(data, count)
             
         except requests.exceptions.RequestException as e:
             if "429" in str(e):
@@ -153,6 +114,53 @@ class BraveSearchTool(BaseTool):
         except Exception as e:
             return f"⚠️ Error processing search results: {str(e)}"
 
+    def _format_results(self, data: dict, count: int = 10) -> str:
+        """Format a Brave Search API response (web and news results) as text for the agent."""
+        # Format results
+        results = []
+
+        # Web results
+        web_results = data.get("web", {}).get("results", [])
+        if web_results:
+            results.append("🔍 **Web Search Results:**")
+            for i, result in enumerate(web_results[:count], 1):
+                title = result.get("title", "No title")
+                url = result.get("url", "")
+                description = result.get("description", "No description")
+                age = result.get("age", "")
+
+                results.append(f"{i}. **{title}**")
+                if age:
+                    results.append(f"   📅 {age}")
+                results.append(f"   {description}")
+                results.append(f"   🔗 {url}")
+                results.append("")
+
+        # News results
+        news_results = data.get("news", {}).get("results", [])
+        if news_results:
+            results.append("📰 **News Results:**")
+            for i, result in enumerate(news_results[:min(count, 5)], 1):
+                title = result.get("title", "No title")
+                url = result.get("url", "")
+                description = result.get("description", "No description")
+                age = result.get("age", "")
+                source = result.get("meta", {}).get("url", "")
+
+                results.append(f"{i}. **{title}**")
+                if age:
+                    results.append(f"   📅 {age}")
+                if source:
+                    results.append(f"   🏢 Source: {source}")
+                results.append(f"   {description}")
+                results.append(f"   🔗 {url}")
+                results.append("")
+
+        if not results:
+            return "No search results found for the given query."
+
+        return "\n".join(results)
+
 # Alternative class for backward compatibility (similar to SerperDevTool interface)
 class BraveDevTool(BaseTool):
     """
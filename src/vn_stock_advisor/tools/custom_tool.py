@@ -1,10 +1,19 @@
 from typing import Type, Optional, Any
+import re
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
-from vnstock import Vnstock
-from datetime import datetime, timedelta
+from datetime import datetime
 import pandas as pd
 import numpy as np
+from vn_stock_advisor.tools.line_index import get_line_index
+from vn_stock_advisor.indicators.technical import calculate_indicators, LOOKBACK_BARS
+from vn_stock_advisor.indicators.incremental import IncrementalIndicatorEngine
+from vn_stock_advisor.indicators.signals import classify_signals
+from vn_stock_advisor.data.history import HistoryLoader
+from vn_stock_advisor.data.intraday import is_intraday
+from vn_stock_advisor.data.financials import load_company_info
+from vn_stock_advisor.data.fundamentals import FundamentalData, load_fundamentals
+from vn_stock_advisor.utils.tracing import get_tracer, traced_tool
 
 class MyToolInput(BaseModel):
     """Input schema for MyCustomTool."""
@@ -14,153 +23,116 @@ class FundDataTool(BaseTool):
     name: str = "Công cụ tra cứu dữ liệu cổ phiếu phục vụ phân tích cơ bản."
     description: str = "Công cụ tra cứu dữ liệu cổ phiếu phục vụ phân tích cơ bản."
     args_schema: Type[BaseModel] = MyToolInput
+    # Analyze as of this date (YYYY-MM-DD) using only reports published by then; None means today
+    as_of_date: Optional[str] = None
 
+    @traced_tool
     def _run(self, argument: str) -> str:
         try:
             # Validate input
             if not argument or not isinstance(argument, str):
                 return "Error: Invalid stock symbol provided"
-            
-            argument = argument.strip().upper()
-            
-            # Initialize the class 
-            stock = Vnstock().stock(symbol=argument, source="TCBS")
-            financial_ratios = stock.finance.ratio(period="quarter")
-            income_df = stock.finance.income_statement(period="quarter")
-            company = Vnstock().stock(symbol=argument, source='TCBS').company
+
+            data = self.fetch(argument)
 
             # Validate data availability
-            if financial_ratios.empty or income_df.empty:
-                return f"Error: No data available for symbol {argument}"
+            if data.ratios.empty or data.income.empty:
+                return f"Error: No data available for symbol {data.symbol}"
 
-            # Get company full name & industry with safe access
-            profile_data = company.profile()
-            overview_data = company.overview()
-            
-            full_name = profile_data.get("company_name").iloc[0] if not profile_data.empty else argument
-            industry = overview_data.get("industry").iloc[0] if not overview_data.empty else "Unknown"
+            return self.render(data)
+        except Exception as e:
+            return f"Lỗi khi lấy dữ liệu: {e}"
 
-            # Get data from the latest row of DataFrame for financial ratios
-            latest_ratios = financial_ratios.iloc[0] if not financial_ratios.empty else None
+    def fetch(self, argument: str) -> FundamentalData:
+        """Return the full quarterly ratio and income history known on the analysis date."""
+        # Reports published before the analysis date, from the local cache where possible
+        return load_fundamentals(argument, as_of=_resolve_as_of(self.as_of_date))
+
+    def render(self, data: FundamentalData) -> str:
+        """Format the latest ratios and the last 4 quarters as text for the agent."""
+        # Every ratio of the latest quarter in one selection
+        latest = data.ratio_panel().head(1)
+        latest = latest.iloc[0] if not latest.empty else pd.Series(np.nan, index=latest.columns)
+
+        def ratio(name):
+            value = latest[name]
+            if pd.isna(value):
+                return "N/A"
+            # Format as percentage for ratios that should be percentages
+            return f"{value:.2f}%" if name in ['roe', 'roa', 'gross_profit_margin'] else f"{value:.2f}"
+
+        def money(value):
+            return f"{value:,.0f} VND" if isinstance(value, (int, float, np.number)) and pd.notna(value) else "N/A"
+
+        def growth(value):
+            return f"{value:+.2%}" if pd.notna(value) else "N/A"
+
+        # Format quarterly income data
+        quarterly_trends = []
+        for i, (_, quarter) in enumerate(data.income.head(4).iterrows()):
+            quarter_info = f"""
+            Quý T - {i + 1}:
+            - Doanh thu thuần: {money(quarter.get("revenue"))} (so với cùng kỳ: {growth(quarter.get("revenue_yoy"))})
+            - Lợi nhuận gộp: {money(quarter.get("gross_profit"))}
+            - Lợi nhuận sau thuế: {money(quarter.get("post_tax_profit"))} (so với cùng kỳ: {growth(quarter.get("post_tax_profit_yoy"))})
+            """
+            quarterly_trends.append(quarter_info)
 
-            # Get last 4 quarters of income statement
-            last_4_quarters = income_df.head(4)
-            
-            # Helper function to safely extract and format ratios
-            def safe_extract_ratio(df, column_name, default="N/A"):
-                """Safely extract ratio value from DataFrame with proper handling of NaN values"""
-                if df is None or df.empty:
-                    return default
-                
-                # Try multiple possible column names for each ratio
-                column_mapping = {
-                    'price_to_earning': ['price_to_earning', 'pe', 'P/E', 'p_e_ratio'],
-                    'price_to_book': ['price_to_book', 'pb', 'P/B', 'p_b_ratio'],
-                    'roe': ['roe', 'ROE', 'return_on_equity', 'return_on_equity_percent'],
-                    'roa': ['roa', 'ROA', 'return_on_assets', 'return_on_assets_percent'],
-                    'earning_per_share': ['earning_per_share', 'eps', 'EPS', 'earnings_per_share'],
-                    'debt_on_equity': ['debt_on_equity', 'de', 'D/E', 'debt_equity_ratio'],
-                    'gross_profit_margin': ['gross_profit_margin', 'gross_margin', 'profit_margin'],
-                    'value_before_ebitda': ['value_before_ebitda', 'ev_ebitda', 'ev_ebitda_ratio']
-                }
-                
-                possible_names = column_mapping.get(column_name, [column_name])
-                
-                for name in possible_names:
-                    if name in df.index if isinstance(df, pd.Series) else name in df.columns:
-                        value = df[name] if isinstance(df, pd.Series) else df[name].iloc[0]
-                        if pd.notna(value) and str(value).strip():
-                            # Format as percentage for ratios that should be percentages
-                            if column_name in ['roe', 'roa', 'gross_profit_margin']:
-                                return f"{float(value):.2f}%"
-                            else:
-                                return f"{float(value):.2f}" if isinstance(value, (int, float)) else str(value)
-                
-                return default
-
-            # Extract financial ratios data with proper handling
-            pe_ratio = safe_extract_ratio(latest_ratios, "price_to_earning")
-            pb_ratio = safe_extract_ratio(latest_ratios, "price_to_book")
-            roe = safe_extract_ratio(latest_ratios, "roe")
-            roa = safe_extract_ratio(latest_ratios, "roa")
-            eps = safe_extract_ratio(latest_ratios, "earning_per_share")
-            de = safe_extract_ratio(latest_ratios, "debt_on_equity")
-            profit_margin = safe_extract_ratio(latest_ratios, "gross_profit_margin")
-            evebitda = safe_extract_ratio(latest_ratios, "value_before_ebitda")
-
-            # Format quarterly income data
-            quarterly_trends = []
-            for i, (_, quarter) in enumerate(last_4_quarters.iterrows()):          
-                # Handle formatting of values properly
-                revenue = quarter.get("revenue", "N/A")
-                revenue_formatted = f"{revenue:,.0f} VND" if isinstance(revenue, (int, float)) else revenue
-                
-                gross_profit = quarter.get("gross_profit", "N/A")
-                gross_profit_formatted = f"{gross_profit:,.0f} VND" if isinstance(gross_profit, (int, float)) else gross_profit
-                
-                post_tax_profit = quarter.get("post_tax_profit", "N/A")
-                post_tax_profit_formatted = f"{post_tax_profit:,.0f} VND" if isinstance(post_tax_profit, (int, float)) else post_tax_profit
-                
-                quarter_info = f"""
-                Quý T - {i + 1}:
-                - Doanh thu thuần: {revenue_formatted}
-                - Lợi nhuận gộp: {gross_profit_formatted}
-                - Lợi nhuận sau thuế: {post_tax_profit_formatted}
-                """
-                quarterly_trends.append(quarter_info)
-            
-            return f"""Mã cổ phiếu: {argument}
-            Tên công ty: {full_name}
-            Ngành: {industry}
-            Ngày phân tích: {datetime.now().strftime('%Y-%m-%d')}
+        return f"""Mã cổ phiếu: {data.symbol}
+            Tên công ty: {data.full_name}
+            Ngành: {data.industry}
+            Ngày phân tích: {_analysis_date(data.as_of)}
             
-            Tỷ lệ P/E: {pe_ratio}
-            Tỷ lệ P/B: {pb_ratio}
-            Tỷ lệ ROE: {roe}
-            Tỷ lệ ROA: {roa}
-            Biên lợi nhuận: {profit_margin}
-            Lợi nhuận trên mỗi cổ phiếu EPS (VND): {eps}
-            Hệ số nợ trên vốn chủ sở hữu D/E: {de}
-            Tỷ lệ EV/EBITDA: {evebitda}
+            Tỷ lệ P/E: {ratio("price_to_earning")}
+            Tỷ lệ P/B: {ratio("price_to_book")}
+            Tỷ lệ ROE: {ratio("roe")}
+            Tỷ lệ ROA: {ratio("roa")}
+            Biên lợi nhuận: {ratio("gross_profit_margin")}
+            Lợi nhuận trên mỗi cổ phiếu EPS (VND): {ratio("earning_per_share")}
+            Hệ số nợ trên vốn chủ sở hữu D/E: {ratio("debt_on_equity")}
+            Tỷ lệ EV/EBITDA: {ratio("value_before_ebitda")}
+
+            4 QUÝ GẦN NHẤT (TTM):
+            - Doanh thu thuần: {money(data.latest("revenue_ttm"))}
+            - Lợi nhuận sau thuế: {money(data.latest("post_tax_profit_ttm"))}
 
             XU HƯỚNG 4 QUÝ GẦN NHẤT:
             {"".join(quarterly_trends)}
             """
-        except Exception as e:
-            return f"Lỗi khi lấy dữ liệu: {e}"
         
 class TechDataTool(BaseTool):
     name: str = "Công cụ tra cứu dữ liệu cổ phiếu phục vụ phân tích kĩ thuật."
     description: str = "Công cụ tra cứu dữ liệu cổ phiếu phục vụ phân tích kĩ thuật, cung cấp các chỉ số như SMA, EMA, RSI, MACD, Bollinger Bands, và vùng hỗ trợ/kháng cự."
     args_schema: Type[BaseModel] = MyToolInput
-
+    # Advance persisted per-symbol indicator state instead of recomputing the whole window
+    incremental: bool = False
+    # Analyze as of this date (YYYY-MM-DD) using only data available then; None means today
+    as_of_date: Optional[str] = None
+    # Bar interval: "1D", or an intraday one ("1m", "5m", "15m", "30m", "1H") aggregated from 1m bars
+    interval: str = "1D"
+
+    @traced_tool
     def _run(self, argument: str) -> str:
         try:
             # Validate input
             if not argument or not isinstance(argument, str):
                 return "Error: Invalid stock symbol provided"
+            if self.interval != "1D" and not is_intraday(self.interval):
+                return f"Error: Unsupported interval {self.interval}"
             
             argument = argument.strip().upper()
+            as_of = _resolve_as_of(self.as_of_date)
             
-            # Initialize vnstock and get historical price data
-            stock = Vnstock().stock(symbol=argument, source="TCBS")
-            company = Vnstock().stock(symbol=argument, source='TCBS').company
-
             # Get company full name & industry with safe access
-            profile_data = company.profile()
-            overview_data = company.overview()
-            
-            full_name = profile_data.get("company_name").iloc[0] if not profile_data.empty else argument
-            industry = overview_data.get("industry").iloc[0] if not overview_data.empty else "Unknown"
+            full_name, industry = load_company_info(argument)
             
-            # Get price data for the last 200 days
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=200)
-            price_data = stock.quote.history(
-                start=start_date.strftime("%Y-%m-%d"),
-                end=end_date.strftime("%Y-%m-%d"),
-                interval="1D"  # Daily data
-            )
+            # Get enough bars for the longest indicator window (SMA 200), ending on
+            # the analysis date, reading from the local price store and fetching
+            # only what is missing
+            if is_intraday(self.interval):
+                price_data = _get_history_loader().load_intraday(argument, self.interval, bars=LOOKBACK_BARS, end=as_of)
+            else:
+                price_data = _get_history_loader().load(argument, bars=LOOKBACK_BARS, end=as_of)
             
             if price_data.empty or len(price_data) < 5:
                 return f"Không tìm thấy dữ liệu lịch sử cho cổ phiếu {argument}"
@@ -170,9 +142,6 @@ class TechDataTool(BaseTool):
             if not all(col in price_data.columns for col in required_columns):
                 return f"Error: Missing required data columns for {argument}"
             
-            # Calculate technical indicators
-            tech_data = self._calculate_indicators(price_data)
-            
             # Identify support and resistance levels
             support_resistance = self._find_support_resistance(price_data)
             
@@ -182,13 +151,19 @@ class TechDataTool(BaseTool):
             current_volume = price_data['volume'].iloc[-1] if len(price_data) > 0 else 0
             recent_volumes = price_data['volume'].iloc[-5:-1] if len(price_data) >= 5 else price_data['volume']
             
-            # Format result with safe access
-            latest_indicators = tech_data.iloc[-1] if not tech_data.empty else {}
+            # Calculate technical indicators (the incremental state only tracks the latest bars)
+            with get_tracer().span("indicators", "compute", symbol=argument, bars=len(price_data)):
+                if self.incremental and as_of is None:
+                    latest_indicators = _get_indicator_engine().latest(argument, price_data, self.interval)
+                else:
+                    tech_data = self._calculate_indicators(price_data)
+                    latest_indicators = tech_data.iloc[-1] if not tech_data.empty else {}
             
             result = f"""Mã cổ phiếu: {argument}
             Tên công ty: {full_name}
             Ngành: {industry}
-            Ngày phân tích: {datetime.now().strftime('%Y-%m-%d')}
+            Ngày phân tích: {_analysis_date(as_of)}
+            Khung thời gian: {self.interval}
             Giá hiện tại: {current_price:,.2f} VND
             Khối lượng giao dịch: {current_volume:,.0f} cp
 
@@ -235,60 +210,7 @@ class TechDataTool(BaseTool):
     
     def _calculate_indicators(self, df):
         """Calculate various technical indicators."""
-        # Make a copy to avoid modifying original data
-        data = df.copy()
-        
-        # Simple Moving Averages
-        data['SMA_20'] = data['close'].rolling(window=20).mean()
-        data['SMA_50'] = data['close'].rolling(window=50).mean()
-        data['SMA_200'] = data['close'].rolling(window=200).mean()
-        
-        # Exponential Moving Averages
-        data['EMA_12'] = data['close'].ewm(span=12, adjust=False).mean()
-        data['EMA_26'] = data['close'].ewm(span=26, adjust=False).mean()
-        
-        # MACD
-        data['MACD'] = data['EMA_12'] - data['EMA_26']
-        data['MACD_Signal'] = data['MACD'].ewm(span=9, adjust=False).mean()
-        data['MACD_Hist'] = data['MACD'] - data['MACD_Signal']
-        
-        # RSI
-        delta = data['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        
-        # Avoid division by zero
-        rs = gain / loss.replace(0, np.nan)
-        data['RSI_14'] = 100 - (100 / (1 + rs))
-        data['RSI_14'] = data['RSI_14'].fillna(50)  # Fill NaN values with neutral RSI
-        
-        # Bollinger Bands
-        data['BB_Middle'] = data['close'].rolling(window=20).mean()
-        std_dev = data['close'].rolling(window=20).std()
-        data['BB_Upper'] = data['BB_Middle'] + (std_dev * 2)
-        data['BB_Lower'] = data['BB_Middle'] - (std_dev * 2)
-
-        # Calculate volume moving averages
-        data['Volume_SMA_10'] = data['volume'].rolling(window=10).mean()
-        data['Volume_SMA_20'] = data['volume'].rolling(window=20).mean()
-        data['Volume_SMA_50'] = data['volume'].rolling(window=50).mean()
-        
-        # Calculate volume ratio compared to average
-        data['Volume_Ratio_10'] = data['volume'] / data['Volume_SMA_10']
-        data['Volume_Ratio_20'] = data['volume'] / data['Volume_SMA_20']
-        
-        # On-Balance Volume (OBV)
-        data['OBV'] = 0
-        data.loc[0, 'OBV'] = data.loc[0, 'volume']
-        for i in range(1, len(data)):
-            if data.loc[i, 'close'] > data.loc[i-1, 'close']:
-                data.loc[i, 'OBV'] = data.loc[i-1, 'OBV'] + data.loc[i, 'volume']
-            elif data.loc[i, 'close'] < data.loc[i-1, 'close']:
-                data.loc[i, 'OBV'] = data.loc[i-1, 'OBV'] - data.loc[i, 'volume']
-            else:
-                data.loc[i, 'OBV'] = data.loc[i-1, 'OBV']
-        
-        return data
+        return calculate_indicators(df)
     
     def _find_support_resistance(self, df, window=10, threshold=0.03):
         """Find support and resistance levels."""
@@ -353,90 +275,112 @@ class TechDataTool(BaseTool):
     
     def _get_technical_analysis(self, indicators, current_price, support_resistance):
         """Generate technical analysis text based on indicators."""
+        signals = classify_signals(indicators, current_price)
         analysis = []
         
         # Trend analysis based on SMAs
-        if current_price > indicators['SMA_200'] and indicators['SMA_50'] > indicators['SMA_200']:
-            analysis.append("- Xu hướng dài hạn: TĂNG (Giá trên SMA 200, SMA 50 trên SMA 200)")
-        elif current_price < indicators['SMA_200'] and indicators['SMA_50'] < indicators['SMA_200']:
-            analysis.append("- Xu hướng dài hạn: GIẢM (Giá dưới SMA 200, SMA 50 dưới SMA 200)")
-        else:
-            analysis.append("- Xu hướng dài hạn: TRUNG LẬP (Tín hiệu trái chiều giữa các SMA)")
+        analysis.append({
+            'UP': "- Xu hướng dài hạn: TĂNG (Giá trên SMA 200, SMA 50 trên SMA 200)",
+            'DOWN': "- Xu hướng dài hạn: GIẢM (Giá dưới SMA 200, SMA 50 dưới SMA 200)",
+            'NEUTRAL': "- Xu hướng dài hạn: TRUNG LẬP (Tín hiệu trái chiều giữa các SMA)",
+        }[signals['long_trend']])
         
         # Short-term trend
-        if current_price > indicators['SMA_20'] and indicators['SMA_20'] > indicators['SMA_50']:
-            analysis.append("- Xu hướng ngắn hạn: TĂNG (Giá trên SMA 20, SMA 20 trên SMA 50)")
-        elif current_price < indicators['SMA_20'] and indicators['SMA_20'] < indicators['SMA_50']:
-            analysis.append("- Xu hướng ngắn hạn: GIẢM (Giá dưới SMA 20, SMA 20 dưới SMA 50)")
-        else:
-            analysis.append("- Xu hướng ngắn hạn: TRUNG LẬP (Tín hiệu trái chiều giữa SMA ngắn hạn)")
+        analysis.append({
+            'UP': "- Xu hướng ngắn hạn: TĂNG (Giá trên SMA 20, SMA 20 trên SMA 50)",
+            'DOWN': "- Xu hướng ngắn hạn: GIẢM (Giá dưới SMA 20, SMA 20 dưới SMA 50)",
+            'NEUTRAL': "- Xu hướng ngắn hạn: TRUNG LẬP (Tín hiệu trái chiều giữa SMA ngắn hạn)",
+        }[signals['short_trend']])
         
         # RSI analysis
-        if indicators['RSI_14'] > 70:
-            analysis.append("- RSI: QUÁ MUA (RSI > 70), có khả năng điều chỉnh giảm")
-        elif indicators['RSI_14'] < 30:
-            analysis.append("- RSI: QUÁ BÁN (RSI < 30), có khả năng hồi phục")
-        else:
-            analysis.append(f"- RSI: TRUNG TÍNH ({indicators['RSI_14']:.2f})")
+        analysis.append({
+            'OVERBOUGHT': "- RSI: QUÁ MUA (RSI > 70), có khả năng điều chỉnh giảm",
+            'OVERSOLD': "- RSI: QUÁ BÁN (RSI < 30), có khả năng hồi phục",
+            'NEUTRAL': f"- RSI: TRUNG TÍNH ({indicators['RSI_14']:.2f})",
+        }[signals['rsi_zone']])
         
         # MACD analysis
-        if indicators['MACD'] > indicators['MACD_Signal']:
-            analysis.append("- MACD: TÍCH CỰC (MACD trên Signal Line)")
-        else:
-            analysis.append("- MACD: TIÊU CỰC (MACD dưới Signal Line)")
+        analysis.append({
+            'POSITIVE': "- MACD: TÍCH CỰC (MACD trên Signal Line)",
+            'NEGATIVE': "- MACD: TIÊU CỰC (MACD dưới Signal Line)",
+        }[signals['macd']])
         
         # Bollinger Bands analysis
-        if current_price > indicators['BB_Upper']:
-            analysis.append("- Bollinger Bands: QUÁ MUA (Giá trên dải trên BB)")
-        elif current_price < indicators['BB_Lower']:
-            analysis.append("- Bollinger Bands: QUÁ BÁN (Giá dưới dải dưới BB)")
-        else:
-            position = (current_price - indicators['BB_Lower']) / (indicators['BB_Upper'] - indicators['BB_Lower'])
-            if position > 0.8:
-                analysis.append("- Bollinger Bands: GẦN VÙNG QUÁ MUA (Giá gần dải trên BB)")
-            elif position < 0.2:
-                analysis.append("- Bollinger Bands: GẦN VÙNG QUÁ BÁN (Giá gần dải dưới BB)")
-            else:
-                analysis.append("- Bollinger Bands: TRUNG TÍNH (Giá trong khoảng giữa dải BB)")
+        analysis.append({
+            'ABOVE_UPPER': "- Bollinger Bands: QUÁ MUA (Giá trên dải trên BB)",
+            'BELOW_LOWER': "- Bollinger Bands: QUÁ BÁN (Giá dưới dải dưới BB)",
+            'NEAR_UPPER': "- Bollinger Bands: GẦN VÙNG QUÁ MUA (Giá gần dải trên BB)",
+            'NEAR_LOWER': "- Bollinger Bands: GẦN VÙNG QUÁ BÁN (Giá gần dải dưới BB)",
+            'MIDDLE': "- Bollinger Bands: TRUNG TÍNH (Giá trong khoảng giữa dải BB)",
+        }[signals['bollinger']])
         
         # Volume ratio analysis
-        volume_ratio_20 = indicators['Volume_Ratio_20']
-        if volume_ratio_20 > 2.0:
-            analysis.append("- Khối lượng: RẤT CAO (>200% trung bình 20 phiên)")
-        elif volume_ratio_20 > 1.5:
-            analysis.append("- Khối lượng: CAO (150-200% trung bình 20 phiên)")
-        elif volume_ratio_20 < 0.5:
-            analysis.append("- Khối lượng: THẤP (<50% trung bình 20 phiên)")
-        else:
-            analysis.append("- Khối lượng: BÌNH THƯỜNG (50-150% trung bình 20 phiên)")
+        analysis.append({
+            'VERY_HIGH': "- Khối lượng: RẤT CAO (>200% trung bình 20 phiên)",
+            'HIGH': "- Khối lượng: CAO (150-200% trung bình 20 phiên)",
+            'LOW': "- Khối lượng: THẤP (<50% trung bình 20 phiên)",
+            'NORMAL': "- Khối lượng: BÌNH THƯỜNG (50-150% trung bình 20 phiên)",
+        }[signals['volume_level']])
 
         # Volume trend analysis
-        if (indicators['Volume_SMA_10'] > indicators['Volume_SMA_20'] and 
-            indicators['Volume_SMA_20'] > indicators['Volume_SMA_50']):
-            analysis.append("- Xu hướng khối lượng: TĂNG (SMA 10 > SMA 20 > SMA 50)")
-        elif (indicators['Volume_SMA_10'] < indicators['Volume_SMA_20'] and 
-            indicators['Volume_SMA_20'] < indicators['Volume_SMA_50']):
-            analysis.append("- Xu hướng khối lượng: GIẢM (SMA 10 < SMA 20 < SMA 50)")
-        else:
-            analysis.append("- Xu hướng khối lượng: TRUNG LẬP")
+        analysis.append({
+            'UP': "- Xu hướng khối lượng: TĂNG (SMA 10 > SMA 20 > SMA 50)",
+            'DOWN': "- Xu hướng khối lượng: GIẢM (SMA 10 < SMA 20 < SMA 50)",
+            'NEUTRAL': "- Xu hướng khối lượng: TRUNG LẬP",
+        }[signals['volume_trend']])
 
         # OBV trend analysis
-        current_volume = indicators['volume']
-        if current_volume > indicators['Volume_SMA_20'] * 1.5:
-            if current_price > indicators['SMA_20']:
-                analysis.append("- Tín hiệu khối lượng: TÍCH CỰC (Khối lượng cao kèm giá tăng)")
-            else:
-                analysis.append("- Tín hiệu khối lượng: TIÊU CỰC (Khối lượng cao kèm giá giảm)")
+        if signals['volume_signal'] == 'POSITIVE':
+            analysis.append("- Tín hiệu khối lượng: TÍCH CỰC (Khối lượng cao kèm giá tăng)")
+        elif signals['volume_signal'] == 'NEGATIVE':
+            analysis.append("- Tín hiệu khối lượng: TIÊU CỰC (Khối lượng cao kèm giá giảm)")
 
         return "\n".join(analysis)
     
+def _resolve_as_of(as_of_date):
+    """Return the analysis date as a Timestamp, or None for today (latest data)."""
+    if not as_of_date:
+        return None
+    as_of = pd.Timestamp(as_of_date).normalize()
+    return as_of if as_of < pd.Timestamp.now().normalize() else None
+
+
+def _analysis_date(as_of):
+    return (as_of or datetime.now()).strftime('%Y-%m-%d')
+
+
+# Shared state for TechDataTool instances
+_indicator_engine = None
+_history_loader = None
+
+
+def _get_indicator_engine():
+    """Return the indicator engine shared by all TechDataTool instances."""
+    global _indicator_engine
+    if _indicator_engine is None:
+        _indicator_engine = IncrementalIndicatorEngine()
+    return _indicator_engine
+
+
+def _get_history_loader():
+    """Return the price history loader shared by all TechDataTool instances."""
+    global _history_loader
+    if _history_loader is None:
+        _history_loader = HistoryLoader()
+    return _history_loader
+
 # Re-write basic FileReadTool but with utf-8 encoding
 class FileReadToolSchema(BaseModel):
     """Input for FileReadTool."""
 
     file_path: str = Field(..., description="Mandatory file full path to read the file")
-    start_line: Optional[int] = Field(1, description="Line number to start reading from (1-indexed)")
+    start_line: Optional[int] = Field(1, description="Line number to start reading (or searching with 'query') from (1-indexed)")
     line_count: Optional[int] = Field(None, description="Number of lines to read. If None, reads the entire file")
+    max_bytes: Optional[int] = Field(None, description="Maximum number of bytes to return. Output stops at the last whole line within this budget")
+    query: Optional[str] = Field(None, description="Text to search for. When set, only matching lines are returned (case and Vietnamese accent insensitive)")
+    regex: Optional[bool] = Field(False, description="Treat 'query' as a regular expression")
+    context_lines: Optional[int] = Field(0, description="Number of lines to show before and after each matching line")
+    max_matches: Optional[int] = Field(20, description="Maximum number of matching lines to return")
 
 
 class FileReadTool(BaseTool):
@@ -461,12 +405,15 @@ class FileReadTool(BaseTool):
         >>> content = tool.run()  # Reads /path/to/file.txt
         >>> content = tool.run(file_path="/path/to/other.txt")  # Reads other.txt
         >>> content = tool.run(file_path="/path/to/file.txt", start_line=100, line_count=50)  # Reads lines 100-149
+        >>> content = tool.run(file_path="/path/to/file.txt", max_bytes=4000)  # Reads at most ~4KB of whole lines
+        >>> content = tool.run(file_path="/path/to/file.txt", query="xay dung", context_lines=1)  # Matching lines only
     """
 
     name: str = "Read a file's content"
-    description: str = "A tool that reads the content of a file. To use this tool, provide a 'file_path' parameter with the path to the file you want to read. Optionally, provide 'start_line' to start reading from a specific line and 'line_count' to limit the number of lines read."
+    description: str = "A tool that reads the content of a file. To use this tool, provide a 'file_path' parameter with the path to the file you want to read. Optionally, provide 'start_line' to start reading from a specific line and 'line_count' to limit the number of lines read. To look up specific data without reading the whole file, provide 'query' (and optionally 'context_lines') to return only the matching lines."
     args_schema: Type[BaseModel] = FileReadToolSchema
     file_path: Optional[str] = None
+    max_bytes: Optional[int] = None
 
     def __init__(self, file_path: Optional[str] = None, **kwargs: Any) -> None:
         """Initialize the FileReadTool.
@@ -474,16 +421,18 @@ class FileReadTool(BaseTool):
         Args:
             file_path (Optional[str]): Path to the file to be read. If provided,
                 this becomes the default file path for the tool.
-            **kwargs: Additional keyword arguments passed to BaseTool.
+            **kwargs: Additional keyword arguments passed to BaseTool. Pass
+                `max_bytes` to set a default output budget for every read.
         """
         if file_path is not None:
             kwargs["description"] = (
-                f"A tool that reads file content. The default file is {file_path}, but you can provide a different 'file_path' parameter to read another file. You can also specify 'start_line' and 'line_count' to read specific parts of the file."
+                f"A tool that reads file content. The default file is {file_path}, but you can provide a different 'file_path' parameter to read another file. You can also specify 'start_line' and 'line_count' to read specific parts of the file, or 'query' to return only the lines matching a keyword (e.g. an industry name)."
             )
 
         super().__init__(**kwargs)
         self.file_path = file_path
 
+    @traced_tool
     def _run(
         self,
         **kwargs: Any,
@@ -504,7 +453,7 @@ class FileReadTool(BaseTool):
                 
                 # Handle None-like strings
                 if cleaned.lower() in ['none', 'null', '']:
-                    return None if param_name == 'line_count' else default_value
+                    return None if param_name in ('line_count', 'max_bytes') else default_value
                 
                 # Try to parse as integer
                 try:
@@ -512,7 +461,7 @@ class FileReadTool(BaseTool):
                     return parsed_int if parsed_int > 0 else default_value
                 except ValueError:
                     # If parsing fails, return default
-                    return None if param_name == 'line_count' else default_value
+                    return None if param_name in ('line_count', 'max_bytes') else default_value
             
             # Handle non-string values
             if isinstance(value, (int, float)):
@@ -528,31 +477,114 @@ class FileReadTool(BaseTool):
         line_count_raw = kwargs.get("line_count", None)
         line_count = clean_and_parse_param(line_count_raw, 'line_count', None)
 
+        # Handle max_bytes parameter, falling back to the tool-level budget
+        max_bytes_raw = kwargs.get("max_bytes", None)
+        max_bytes = clean_and_parse_param(max_bytes_raw, 'max_bytes', None) or self.max_bytes
+
+        # Handle search parameters
+        query = kwargs.get("query", None)
+        if isinstance(query, str):
+            query = query.strip()
+        regex_raw = kwargs.get("regex", False)
+        regex = regex_raw.strip().lower() in ('true', '1', 'yes') if isinstance(regex_raw, str) else bool(regex_raw)
+        context_lines = clean_and_parse_param(kwargs.get("context_lines", 0), 'context_lines', 0)
+        max_matches = clean_and_parse_param(kwargs.get("max_matches", 20), 'max_matches', 20)
+
         if file_path is None:
             return (
                 "Error: No file path provided. Please provide a file path either in the constructor or as an argument."
             )
 
         try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                if start_line == 1 and line_count is None:
-                    return file.read()
+            if query:
+                return self._search_file(file_path, query, regex, context_lines, max_matches, max_bytes, start_line)
 
-                start_idx = max(start_line - 1, 0)
+            if start_line == 1 and line_count is None and max_bytes is None:
+                with open(file_path, "r", encoding="utf-8") as file:
+                    return file.read()
 
-                selected_lines = [
-                    line
-                    for i, line in enumerate(file)
-                    if i >= start_idx and (line_count is None or i < start_idx + line_count)
-                ]
+            # Slice only the requested lines through the cached line-offset index
+            index = get_line_index(file_path)
+            start_idx = max(start_line - 1, 0)
 
-                if not selected_lines and start_idx > 0:
+            if start_idx >= index.line_count:
+                if start_idx > 0:
                     return f"Error: Start line {start_line} exceeds the number of lines in the file."
-
-                return "".join(selected_lines)
+                return ""
+
+            content, lines_read, truncated = index.read_lines(start_idx, line_count, max_bytes)
+            if truncated:
+                next_line = start_line + lines_read
+                content += (
+                    f"\n[Output truncated at {max_bytes} bytes. "
+                    f"Continue with start_line={next_line} to read more.]"
+                )
+            return content
         except FileNotFoundError:
             return f"Error: File not found at path: {file_path}"
         except PermissionError:
             return f"Error: Permission denied when trying to read file: {file_path}"
         except Exception as e:
-            return f"Error: Failed to read file {file_path}. {str(e)}"
\ No newline at end of file
+            return f"Error: Failed to read file {file_path}. {str(e)}"
+
+    def _search_file(self, file_path, query, regex, context_lines, max_matches, max_bytes, start_line=1):
+        """Return only the lines matching `query` from `start_line` on, with surrounding context, grep style."""
+        index = get_line_index(file_path)
+        start_idx = max(start_line - 1, 0)
+        try:
+            matches = index.search(query, regex=regex, max_matches=max_matches + 1, start_idx=start_idx)
+        except re.error as e:
+            return f"Error: Invalid regular expression '{query}'. {str(e)}"
+
+        if not matches:
+            return f"No lines matching '{query}' found in {file_path}."
+
+        has_more = len(matches) > max_matches
+        matches = matches[:max_matches]
+        match_set = set(matches)
+
+        # Merge overlapping or adjacent context windows, without going back before start_line
+        windows = []
+        for idx in matches:
+            begin = max(idx - context_lines, start_idx)
+            end = min(idx + context_lines + 1, index.line_count)
+            if windows and begin <= windows[-1][1]:
+                windows[-1][1] = max(windows[-1][1], end)
+            else:
+                windows.append([begin, end])
+
+        def truncation_note(next_line, cut_line=None):
+            cut = (f" Line {cut_line} alone is longer than that, so only its start is shown; "
+                   f"read it with a larger max_bytes." if cut_line else "")
+            return (f"[Output truncated at {max_bytes} bytes.{cut} "
+                    f"Continue with start_line={next_line} (same query) to see the remaining matches.]")
+
+        output = f"Found {len(matches)}{'+' if has_more else ''} matching line(s) for '{query}' in {file_path}:\n"
+        size = len(output.encode("utf-8"))
+        shown = 0
+        # Room for the note, sized for the largest line number, so the whole output fits in max_bytes
+        last = index.line_count + 1
+        reserve = len(truncation_note(last).encode("utf-8"))
+        for w, (begin, end) in enumerate(windows):
+            text, _, _ = index.read_lines(begin, end - begin)
+            lines = text.split("\n")[:end - begin]
+            for i, line in enumerate(lines):
+                # Matching lines use "N:" and context lines "N-", like grep; windows are split by "--"
+                line_number = begin + i + 1
+                separator = "--\n" if w and not i else ""
+                entry = f"{separator}{line_number}{':' if begin + i in match_set else '-'} {line}\n"
+                entry_bytes = entry.encode("utf-8")
+                if max_bytes is not None and size + len(entry_bytes) > max_bytes - reserve:
+                    if shown:
+                        return output + truncation_note(line_number)
+                    # The first line alone exceeds the budget: show its head and say it was cut
+                    room = max_bytes - size - len(truncation_note(last, last).encode("utf-8")) - 1
+                    head = entry_bytes[:max(room, 0)].decode("utf-8", errors="ignore")
+                    return output + head + "\n" + truncation_note(line_number + 1, line_number)
+                output += entry
+                size += len(entry_bytes)
+                shown += 1
+
+        if has_more:
+            output += f"[More than {max_matches} matches. Refine the query or increase max_matches.]"
+        return output
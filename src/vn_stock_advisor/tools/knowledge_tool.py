@@ -0,0 +1,92 @@
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from vn_stock_advisor.data.vector_index import VectorIndex
+from vn_stock_advisor.utils.tracing import traced_tool
+
+
+class KnowledgeSearchInput(BaseModel):
+    """Input schema for KnowledgeSearchTool."""
+    query: str = Field(..., description="Nội dung cần tra cứu, ví dụ: tên ngành 'Thép' hoặc 'Ngân hàng'.")
+    k: int = Field(5, description="Số đoạn tài liệu trả về.")
+
+
+def knowledge_chunks(path: str) -> List[str]:
+    """Split a knowledge file into self-contained chunks: one per JSON record, else one per paragraph."""
+    text = Path(path).read_text(encoding="utf-8")
+    if path.endswith(".json"):
+        data = json.loads(text)
+        chunks = [data["description"]] if isinstance(data, dict) and "description" in data else []
+        records = data.get("data", data) if isinstance(data, dict) else dict(enumerate(data))
+        for key, value in records.items():
+            if key == "description":
+                continue
+            if isinstance(value, dict):
+                value = ", ".join(f"{k}: {v}" for k, v in value.items())
+            chunks.append(f"{key}: {value}")
+        return chunks
+    return [p.strip() for p in re.split(r'\n\s*\n', text) if p.strip()]
+
+
+class KnowledgeSearchTool(BaseTool):
+    """Semantic lookup in the knowledge files, through a persistent VectorIndex.
+
+    The index is synced on first use: files whose content hash is unchanged
+    since the last run are neither chunked nor embedded again, changed ones
+    only embed their new chunks, and removed files are dropped. Chunks less
+    similar than `min_score` (by default the embedder's) are not returned, so
+    a query the files don't cover gets a "not found" answer instead of the
+    least unrelated chunks.
+    """
+
+    name: str = "Công cụ tra cứu tài liệu tham khảo"
+    description: str = (
+        "Tra cứu ngữ nghĩa trong tài liệu tham khảo (P/E, P/B trung bình ngành...). "
+        "Trả về các đoạn liên quan nhất kèm điểm tương đồng."
+    )
+    args_schema: Type[BaseModel] = KnowledgeSearchInput
+    paths: List[str] = []
+    index: Any = None
+    synced: bool = False
+    min_score: Optional[float] = None
+
+    def __init__(self, paths: Sequence[str], index: Optional[VectorIndex] = None, **kwargs):
+        super().__init__(paths=list(paths), index=VectorIndex("knowledge") if index is None else index, **kwargs)
+
+    def sync(self) -> Dict[str, int]:
+        """Bring the index in line with the files; return embedded/deleted counts."""
+        documents, metadata = {}, {}
+        for path in self.paths:
+            doc_id = str(Path(path).resolve())
+            digest = hashlib.sha256(Path(path).read_bytes()).hexdigest()
+            if self.index.metadata(doc_id).get('file_hash') == digest:
+                # Unchanged since the last run: reuse the stored chunks, nothing to parse or embed
+                documents[doc_id] = self.index.chunks(doc_id)
+            else:
+                documents[doc_id] = knowledge_chunks(path)
+            metadata[doc_id] = {'file_hash': digest, 'path': path}
+        stats = self.index.sync(documents, metadata)
+        self.synced = True
+        return stats
+
+    @traced_tool
+    def _run(self, query: str, k: int = 5) -> str:
+        try:
+            if not query or not isinstance(query, str):
+                return "Error: Invalid query provided"
+            if not self.synced:
+                self.sync()
+            min_score = self.min_score if self.min_score is not None else getattr(self.index.embedder, 'min_score', 0.0)
+            results = self.index.search(query, k=k, min_score=min_score)
+            if not results:
+                return (f"Không tìm thấy tài liệu liên quan đến '{query}'. "
+                        f"Hãy đọc trực tiếp tệp {', '.join(self.paths)} bằng công cụ đọc tệp.")
+            return "\n".join(f"- {r['text']} (độ tương đồng {r['score']:.2f})" for r in results)
+        except Exception as e:
+            return f"Lỗi khi tra cứu tài liệu: {e}"
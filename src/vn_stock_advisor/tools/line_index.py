@@ -0,0 +1,152 @@
+import mmap
+import os
+import re
+import threading
+from collections import OrderedDict
+from itertools import islice
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from vn_stock_advisor.utils.text import fold_diacritics
+
+
+class LineIndex:
+    """Byte offsets of every line start in a file.
+
+    The offsets are computed once with a vectorized newline scan over an mmap
+    of the file, so reading a line range afterwards only touches the bytes of
+    the requested lines instead of decoding everything before them.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        stat = os.stat(path)
+        self.mtime_ns = stat.st_mtime_ns
+        self.size = stat.st_size
+        self._folded_lines: Optional[List[str]] = None
+
+        if self.size == 0:
+            self.starts = np.zeros(0, dtype=np.int64)
+            return
+
+        with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            newlines = np.flatnonzero(np.frombuffer(mm, dtype=np.uint8) == 0x0A)
+
+        # A line starts at offset 0 and right after every newline that is not the last byte
+        starts = newlines + 1
+        if len(starts) and starts[-1] == self.size:
+            starts = starts[:-1]
+        self.starts = np.concatenate(([0], starts)).astype(np.int64)
+
+    @property
+    def line_count(self) -> int:
+        return len(self.starts)
+
+    def is_stale(self) -> bool:
+        """Check whether the file changed on disk since the index was built."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return True
+        return stat.st_mtime_ns != self.mtime_ns or stat.st_size != self.size
+
+    def byte_range(self, start_idx: int, count: Optional[int] = None) -> Tuple[int, int]:
+        """Return the [begin, end) byte span covering `count` lines from the 0-indexed `start_idx`."""
+        begin = int(self.starts[start_idx])
+        stop_idx = self.line_count if count is None else min(start_idx + count, self.line_count)
+        end = int(self.starts[stop_idx]) if stop_idx < self.line_count else self.size
+        return begin, end
+
+    def line_end(self, idx: int) -> int:
+        """Return the byte offset right after line `idx` (including its newline)."""
+        return int(self.starts[idx + 1]) if idx + 1 < self.line_count else self.size
+
+    def read_lines(self, start_idx: int, count: Optional[int] = None, max_bytes: Optional[int] = None) -> Tuple[str, int, bool]:
+        """Read `count` lines starting at the 0-indexed `start_idx`.
+
+        When `max_bytes` is given, output stops at the last whole line that
+        fits in the budget (or at the budget itself if the first line alone
+        is larger).
+
+        Returns:
+            A tuple of (text, number of lines returned, truncated flag).
+        """
+        begin, end = self.byte_range(start_idx, count)
+        stop_idx = self.line_count if count is None else min(start_idx + count, self.line_count)
+        truncated = False
+
+        if max_bytes is not None and end - begin > max_bytes:
+            truncated = True
+            # Last line start that still fits entirely inside the budget
+            limit = begin + max_bytes
+            fit_idx = int(np.searchsorted(self.starts, limit, side="right")) - 1
+            fit_stop = fit_idx + 1 if self.line_end(fit_idx) <= limit else fit_idx
+            if fit_stop > start_idx:
+                stop_idx = fit_stop
+                end = int(self.starts[stop_idx]) if stop_idx < self.line_count else self.size
+            else:
+                # The first line alone exceeds the budget: return its head and count it as read
+                stop_idx = start_idx + 1
+                end = limit
+
+        with open(self.path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            chunk = mm[begin:end]
+
+        # A budget cut inside a line may split a multi-byte UTF-8 character
+        text = chunk.decode("utf-8", errors="ignore" if truncated else "strict")
+        return text.replace("\r\n", "\n"), stop_idx - start_idx, truncated
+
+    def folded_lines(self) -> List[str]:
+        """Return every line lowercased and stripped of diacritics, built lazily and kept with the index."""
+        if self._folded_lines is None:
+            text, _, _ = self.read_lines(0) if self.line_count else ("", 0, False)
+            lines = fold_diacritics(text).split("\n")
+            # split() yields one trailing empty element when the file ends with a newline
+            self._folded_lines = lines[:self.line_count]
+        return self._folded_lines
+
+    def search(self, query: str, regex: bool = False, max_matches: Optional[int] = None, start_idx: int = 0) -> List[int]:
+        """Return 0-indexed line numbers from `start_idx` on matching `query`, ignoring case and Vietnamese diacritics.
+
+        Raises:
+            re.error: If `regex` is True and the pattern is invalid.
+        """
+        if regex:
+            # Keep the pattern's case so escapes like \D or \S keep their meaning
+            pattern = re.compile(fold_diacritics(query, lowercase=False), re.IGNORECASE)
+            matcher = lambda line: pattern.search(line) is not None
+        else:
+            folded_query = fold_diacritics(query)
+            matcher = lambda line: folded_query in line
+
+        matches = []
+        for i, line in enumerate(islice(self.folded_lines(), start_idx, None), start_idx):
+            if matcher(line):
+                matches.append(i)
+                if max_matches is not None and len(matches) >= max_matches:
+                    break
+        return matches
+
+
+_CACHE_SIZE = 32
+_index_cache: "OrderedDict[str, LineIndex]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_line_index(path: str) -> LineIndex:
+    """Return the line index for `path`, rebuilding it only when the file's mtime or size changed."""
+    key = os.path.realpath(path)
+    with _cache_lock:
+        index = _index_cache.get(key)
+        if index is not None and not index.is_stale():
+            _index_cache.move_to_end(key)
+            return index
+
+    index = LineIndex(key)
+    with _cache_lock:
+        _index_cache[key] = index
+        _index_cache.move_to_end(key)
+        while len(_index_cache) > _CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return index
@@ -0,0 +1,56 @@
+from datetime import date, timedelta
+from typing import Any, Optional, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from vn_stock_advisor.data.news_corpus import NewsCorpus
+from vn_stock_advisor.utils.reducer import ArticleReducer
+from vn_stock_advisor.utils.tracing import traced_tool
+
+
+class NewsSearchInput(BaseModel):
+    """Input schema for NewsSearchTool."""
+    query: str = Field(..., description="Chủ đề cần tìm, ví dụ: 'lãi suất điều hành', 'tỷ giá', 'đầu tư công'.")
+    days: int = Field(90, description="Chỉ lấy bài đăng trong số ngày gần nhất này.")
+    limit: int = Field(8, description="Số bài tối đa trả về.")
+
+
+class NewsSearchTool(BaseTool):
+    """Search the local news corpus (articles scraped in earlier runs) before going to the web."""
+
+    name: str = "Công cụ tìm tin tức đã lưu"
+    description: str = (
+        "Tìm nhanh trong kho tin tức đã thu thập ở các lần chạy trước (tìm kiếm không dấu). "
+        "Trả về tiêu đề, ngày đăng, nguồn, URL và đoạn trích liên quan. Dùng trước khi tìm trên web."
+    )
+    args_schema: Type[BaseModel] = NewsSearchInput
+    corpus: Any = None
+    # Tokens of each article's excerpt
+    excerpt_budget: int = 120
+    # Analysis date (YYYY-MM-DD): articles published later are never returned
+    as_of_date: Optional[str] = None
+
+    def __init__(self, corpus: Optional[NewsCorpus] = None, **kwargs):
+        super().__init__(corpus=NewsCorpus() if corpus is None else corpus, **kwargs)
+
+    @traced_tool
+    def _run(self, query: str, days: int = 90, limit: int = 8) -> str:
+        try:
+            if not query or not isinstance(query, str):
+                return "Error: Invalid query provided"
+            until = date.fromisoformat(self.as_of_date[:10]) if self.as_of_date else date.today()
+            # Undated articles may postdate a past analysis date
+            articles = self.corpus.search(query, since=until - timedelta(days=days), until=until, limit=limit,
+                                          undated=not self.as_of_date)
+            if not articles:
+                return (f"Không có bài viết nào trong kho tin tức khớp với '{query}' trong {days} ngày gần nhất. "
+                        "Hãy tìm trên web.")
+            reducer = ArticleReducer(budget=self.excerpt_budget)
+            return "\n\n".join(
+                f"### {i}. {a['title']}\nNgày đăng: {a['published'] or 'không rõ'} | Nguồn: {a['source']} | URL: {a['url']}\n"
+                f"{reducer.reduce(a['body'], query)}"
+                for i, a in enumerate(articles, 1)
+            )
+        except Exception as e:
+            return f"Lỗi khi tìm trong kho tin tức: {e}"
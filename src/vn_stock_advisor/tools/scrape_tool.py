@@ -0,0 +1,170 @@
+import contextvars
+import re
+import sqlite3
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Type, Union
+from urllib.parse import urlsplit
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from vn_stock_advisor.data.cassette import recorded
+from vn_stock_advisor.data.news_corpus import NewsCorpus
+from vn_stock_advisor.data.scrape_cache import ScrapeCache, canonical_url
+from vn_stock_advisor.utils.reducer import ArticleReducer
+from vn_stock_advisor.utils.tracing import get_tracer, traced_tool
+
+# Tokens of the "### Bài i: <url>" line before each article of a batch (long news URLs included)
+SECTION_HEADER_TOKENS = 60
+
+
+class ScrapeInput(BaseModel):
+    """Input schema for CachedScrapeTool."""
+    url: str = Field(..., description="Địa chỉ URL của bài viết cần đọc.")
+    query: Optional[str] = Field(None, description="Chủ đề cần quan tâm, để giữ lại các câu liên quan nhất.")
+
+
+class BatchScrapeInput(BaseModel):
+    """Input schema for BatchScrapeTool."""
+    urls: List[str] = Field(..., description="Danh sách URL các bài viết cần đọc (tối đa 10).")
+    query: Optional[str] = Field(None, description="Chủ đề cần quan tâm, để giữ lại các câu liên quan nhất.")
+
+
+def page_text(result: Any) -> str:
+    """Return the markdown of a Firecrawl scrape result (document object, dict or plain text)."""
+    if result is None:
+        return ""
+    if isinstance(result, str):
+        return result
+    if isinstance(result, dict):
+        return result.get("markdown") or result.get("content") or ""
+    return getattr(result, "markdown", None) or str(result)
+
+
+class CachedScrapeTool(BaseTool):
+    """Scrape a page through another tool (Firecrawl), serving repeat URLs from the local ScrapeCache.
+
+    The full page is cached; what the agent gets is reduced by `reducer`
+    to the sentences most relevant to the query, within a token budget.
+    With a `corpus`, every article read is also added to the local news
+    corpus for later runs.
+    """
+
+    name: str = "Công cụ đọc nội dung trang web"
+    description: str = "Đọc nội dung chính của một bài viết/trang web từ URL (có bộ nhớ đệm cục bộ)."
+    args_schema: Type[BaseModel] = ScrapeInput
+    # Tool (e.g. FirecrawlScrapeWebsiteTool) or function doing the actual scrape
+    scraper: Any = None
+    cache: Any = None
+    reducer: Any = None
+    corpus: Any = None
+
+    def __init__(self, scraper: Any = None, cache: Optional[ScrapeCache] = None,
+                 reducer: Optional[ArticleReducer] = None, corpus: Optional[NewsCorpus] = None, **kwargs):
+        super().__init__(scraper=scraper, cache=cache or ScrapeCache(), reducer=reducer or ArticleReducer(),
+                         corpus=corpus, **kwargs)
+
+    def _scrape(self, url: str) -> str:
+        scrape: Callable = self.scraper._run if isinstance(self.scraper, BaseTool) else self.scraper
+        # Through the active cassette, if any; empty (blocked) pages aren't recorded
+        return recorded("firecrawl", canonical_url(url), lambda: page_text(scrape(url)),
+                        keep=lambda text: bool(text.strip()))
+
+    def fetch(self, url: str) -> str:
+        """Return the page content, scraping it only when the cache has no fresh copy."""
+        with get_tracer().span("scrape", "fetch", host=urlsplit(canonical_url(url)).hostname or '') as span:
+            content = self.cache.get(url)
+            span.set(cache_hits=int(content is not None))
+            if content is None:
+                content = self._scrape(url)
+                span.set(bytes=len(content.encode("utf-8")))
+                # Empty pages (blocked, paywalled) are retried next time instead of cached
+                if not content.strip():
+                    return content
+                self.cache.put(url, content)
+        if self.corpus is not None:
+            try:
+                self.corpus.add_page(url, content)
+            except sqlite3.Error as e:
+                print(f"Không thể lưu bài viết vào kho tin tức: {e}")
+        return content
+
+    @traced_tool
+    def _run(self, url: str, query: Optional[str] = None) -> str:
+        try:
+            if not url or not isinstance(url, str):
+                return "Error: Invalid URL provided"
+            content = self.fetch(url)
+            return self.reducer.reduce(content, query) if content else f"Không đọc được nội dung từ {url}"
+        except Exception as e:
+            return f"Lỗi khi đọc trang {url}: {e}"
+
+
+class BatchScrapeTool(BaseTool):
+    """Scrape several pages in one call, concurrently, with at most `per_domain` requests per site at a time.
+
+    Pages go through a CachedScrapeTool, so cached articles cost nothing,
+    and each one is reduced by the CachedScrapeTool's reducer.
+    """
+
+    name: str = "Công cụ đọc nhiều trang web"
+    description: str = (
+        "Đọc đồng thời nội dung chính của nhiều bài viết trong một lần gọi. "
+        "Đầu vào là danh sách URL; kết quả gồm nội dung rút gọn của từng bài."
+    )
+    args_schema: Type[BaseModel] = BatchScrapeInput
+    scraper: Any = None
+    max_workers: int = 8
+    per_domain: int = 2
+    max_urls: int = 10
+
+    def __init__(self, scraper: Optional[CachedScrapeTool] = None, **kwargs):
+        super().__init__(scraper=scraper or CachedScrapeTool(), **kwargs)
+
+    def output_budget(self) -> int:
+        """Tokens of the longest output: `max_urls` reduced articles and their headers."""
+        return self.max_urls * (self.scraper.reducer.budget + SECTION_HEADER_TOKENS)
+
+    def fetch_all(self, urls: List[str]) -> List[Union[str, Exception]]:
+        """Return the full content of each URL (or the exception it raised), in input order."""
+        limits = defaultdict(lambda: threading.Semaphore(self.per_domain))
+        hosts = [urlsplit(canonical_url(url)).hostname or '' for url in urls]
+        # Create the semaphores up front: defaultdict insertion is not thread-safe
+        for host in hosts:
+            limits[host]
+
+        def fetch(url: str, host: str) -> Union[str, Exception]:
+            with limits[host]:
+                try:
+                    return self.scraper.fetch(url)
+                except Exception as e:
+                    return e
+
+        # Each worker runs in a copy of the caller's context, so its spans nest under this tool call
+        contexts = [contextvars.copy_context() for _ in urls]
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(urls)))) as pool:
+            return list(pool.map(lambda context, url, host: context.run(fetch, url, host), contexts, urls, hosts))
+
+    @traced_tool
+    def _run(self, urls: List[str], query: Optional[str] = None) -> str:
+        if isinstance(urls, str):
+            urls = [u for u in re.split(r'[\s,]+', urls) if u]
+        # Keep the first occurrence of each page
+        pages = {}
+        for url in urls:
+            pages.setdefault(canonical_url(url), url)
+        unique = list(pages.values())[:self.max_urls]
+        if not unique:
+            return "Error: No URLs provided"
+        sections = []
+        for i, (url, content) in enumerate(zip(unique, self.fetch_all(unique)), 1):
+            if isinstance(content, Exception):
+                content = f"Lỗi khi đọc trang {url}: {content}"
+            elif not content:
+                content = f"Không đọc được nội dung từ {url}"
+            else:
+                content = self.scraper.reducer.reduce(content, query)
+            sections.append(f"### Bài {i}: {url}\n{content}")
+        return "\n\n".join(sections)
@@ -0,0 +1,14 @@
+import os
+from pathlib import Path
+
+
+def get_cache_dir(*parts: str) -> Path:
+    """Return (and create) a directory under the local cache root.
+
+    The root defaults to ~/.cache/vn_stock_advisor and can be moved with the
+    VN_STOCK_CACHE_DIR environment variable.
+    """
+    root = os.getenv("VN_STOCK_CACHE_DIR") or os.path.join(Path.home(), ".cache", "vn_stock_advisor")
+    path = Path(root, *parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
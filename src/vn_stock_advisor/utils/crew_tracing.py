@@ -0,0 +1,102 @@
+import threading
+from typing import Dict, Optional
+
+from crewai.events import BaseEventListener
+from crewai.events.types.agent_events import (AgentExecutionCompletedEvent, AgentExecutionErrorEvent,
+                                              AgentExecutionStartedEvent)
+from crewai.events.types.llm_events import LLMCallCompletedEvent, LLMCallFailedEvent, LLMCallStartedEvent
+
+from vn_stock_advisor.utils.tracing import Span, Tracer, get_tracer
+
+
+def _ns(event) -> int:
+    # Handlers may run on the event bus's worker threads: time spans by when the event was emitted
+    return int(event.timestamp.timestamp() * 1e9)
+
+
+def _role(agent) -> str:
+    # Roles come from multi-line YAML: collapse whitespace so events and agents agree
+    role = getattr(agent, "role", None) or getattr(agent, "agent_role", None) or ""
+    return " ".join(str(role).split())[:80]
+
+
+class CrewTracingListener(BaseEventListener):
+    """Turn CrewAI agent and LLM events into "agent" and "llm" spans, with token usage.
+
+    Without a `tracer`, spans go to the current tracer of the run emitting
+    the event (the event bus runs handlers in a copy of the emitter's context).
+    """
+
+    def __init__(self, tracer: Optional[Tracer] = None):
+        self._tracer = tracer
+        self._open: Dict[str, Span] = {}
+        self._lock = threading.Lock()
+        super().__init__()
+
+    @property
+    def tracer(self) -> Tracer:
+        return self._tracer or get_tracer()
+
+    def _start(self, key: str, name: str, kind: str, event, parent: Optional[Span] = None, **attributes):
+        span = self.tracer.start_span(name, kind, parent=parent, start_ns=_ns(event), **attributes)
+        with self._lock:
+            self._open[key] = span
+
+    def _agent_span(self, role: str) -> Optional[Span]:
+        trace_id = self.tracer.trace_id
+        with self._lock:
+            return next((s for k, s in self._open.items()
+                         if k.startswith("agent:") and s.name == role and s.trace_id == trace_id), None)
+
+    def _end(self, key: str, event, error: Optional[str] = None, **attributes) -> Optional[Span]:
+        with self._lock:
+            span = self._open.pop(key, None)
+        if span is not None:
+            span.set(**attributes)
+            self.tracer.end_span(span, end_ns=_ns(event), error=error)
+        return span
+
+    def setup_listeners(self, crewai_event_bus):
+        def agent_key(event) -> str:
+            return f"agent:{getattr(event.agent, 'id', '')}:{getattr(event.task, 'id', '')}"
+
+        @crewai_event_bus.on(AgentExecutionStartedEvent)
+        def on_agent_started(source, event):
+            self._start(agent_key(event), _role(event.agent), "agent", event,
+                        task=getattr(event.task, "name", None) or "")
+
+        @crewai_event_bus.on(AgentExecutionCompletedEvent)
+        def on_agent_completed(source, event):
+            self._end(agent_key(event), event, output_chars=len(event.output or ""))
+
+        @crewai_event_bus.on(AgentExecutionErrorEvent)
+        def on_agent_error(source, event):
+            self._end(agent_key(event), event, error=event.error)
+
+        @crewai_event_bus.on(LLMCallStartedEvent)
+        def on_llm_started(source, event):
+            agent = _role(event.from_agent) if event.from_agent is not None else _role(event)
+            self._start(f"llm:{event.call_id}", event.model or "llm", "llm", event,
+                        parent=self._agent_span(agent), agent=agent)
+
+        @crewai_event_bus.on(LLMCallCompletedEvent)
+        def on_llm_completed(source, event):
+            usage = event.usage or {}
+            self._end(f"llm:{event.call_id}", event,
+                      prompt_tokens=int(usage.get("prompt_tokens") or 0),
+                      completion_tokens=int(usage.get("completion_tokens") or 0))
+
+        @crewai_event_bus.on(LLMCallFailedEvent)
+        def on_llm_failed(source, event):
+            self._end(f"llm:{event.call_id}", event, error=event.error)
+
+
+_listener: Optional[CrewTracingListener] = None
+
+
+def install_crew_tracing() -> CrewTracingListener:
+    """Register the tracing listener on CrewAI's event bus (once per process)."""
+    global _listener
+    if _listener is None:
+        _listener = CrewTracingListener()
+    return _listener
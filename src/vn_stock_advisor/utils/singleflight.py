@@ -0,0 +1,62 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight, from other threads or asyncio tasks, wait for it and get
+    the same result (or exception). Nothing is kept once the call returns,
+    so this only removes duplicate concurrent work; the shared result must
+    be treated as read-only.
+
+    Example:
+        >>> flights = SingleFlight()
+        >>> flights.do(("VCI", "HPG", "ratio"), lambda: stock.finance.ratio())
+        >>> await flights.do_async(("VCI", "HPG", "ratio"), lambda: stock.finance.ratio())
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, Future] = {}
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        """Return the key's in-flight future and whether the caller must run it."""
+        with self._lock:
+            future = self._flights.get(key)
+            if future is not None:
+                return future, False
+            future = self._flights[key] = Future()
+            return future, True
+
+    def _run(self, key: Hashable, future: Future, fn: Callable[[], T]):
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Run `fn` once for all concurrent callers with `key` and return its result."""
+        future, leader = self._join(key)
+        if leader:
+            self._run(key, future, fn)
+        return future.result()
+
+    async def do_async(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Like `do`, for asyncio tasks: the blocking `fn` runs in a worker thread."""
+        future, leader = self._join(key)
+        if leader:
+            await asyncio.to_thread(self._run, key, future, fn)
+        return await asyncio.wrap_future(future)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
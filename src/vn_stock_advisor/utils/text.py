@@ -0,0 +1,31 @@
+import unicodedata
+
+
+def _build_fold_table() -> dict:
+    """Map every precomposed Latin letter (incl. Vietnamese) to its base letter."""
+    table = {}
+    ranges = [(0x00C0, 0x0250), (0x1E00, 0x1F00)]
+    for begin, end in ranges:
+        for code in range(begin, end):
+            base = unicodedata.normalize("NFD", chr(code))[0]
+            if base != chr(code) and base.isascii():
+                table[code] = base
+    # Combining marks, in case the text is already decomposed
+    for code in range(0x0300, 0x0370):
+        table[code] = None
+    table[ord("đ")] = "d"
+    table[ord("Đ")] = "D"
+    return table
+
+
+_FOLD_TABLE = _build_fold_table()
+
+
+def fold_diacritics(text: str, lowercase: bool = True) -> str:
+    """Strip Vietnamese diacritics so that 'Xây dựng' and 'xay dung' compare equal.
+
+    Uses a precomputed translation table, so folding runs at str.translate
+    speed and keeps the character count (and newline positions) of precomposed text.
+    """
+    folded = text.translate(_FOLD_TABLE)
+    return folded.lower() if lowercase else folded
@@ -0,0 +1,213 @@
+"""
+Per-run token budgets for the crew's prompts.
+
+Prompt size is what drives LLM latency here, and nothing bounded it: a
+long tool output or the reports of earlier tasks go into every following
+call of an agent. TokenBudget measures the prompt of every LLM call per
+agent and keeps it within budget:
+
+- tool outputs are trimmed to `tool_output` tokens before the agent sees them
+- the context of earlier tasks in a task prompt is compressed to `context` tokens
+- when a prompt is still over the agent's `prompt` budget, the oldest tool
+  observations of the conversation are compressed first
+
+Trimming keeps whole lines from the head and the tail of a text (where
+headers, the latest figures and conclusions usually are) and says how much
+was left out. Token counts are the offline estimate of utils.reducer.
+"""
+
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import pandas as pd
+from crewai.utilities.string_utils import sanitize_tool_name
+
+from vn_stock_advisor.utils.reducer import estimate_tokens
+
+# Where CrewAI puts the output of earlier tasks in a task prompt, and where that part ends
+CONTEXT_MARKER = "This is the context you're working with:\n"
+CONTEXT_END = "\n\nBegin!"
+OBSERVATION_MARKER = "Observation:"
+# Share of a trimmed text kept from its head; the rest comes from its tail
+HEAD_SHARE = 0.7
+# Observations are never compressed below this, so the agent still sees what each tool said
+MIN_OBSERVATION = 150
+_TOKEN = re.compile(r'\w+|[^\w\s]')
+
+
+def trim_text(text: str, budget: int) -> str:
+    """Return `text` cut to about `budget` tokens: whole lines from its head and tail, with a note of what was cut."""
+    spans = [m.span() for m in _TOKEN.finditer(text)]
+    if len(spans) <= budget:
+        return text
+    head_tokens = max(1, int(budget * HEAD_SHARE))
+    tail_tokens = max(0, budget - head_tokens)
+    head_end = spans[head_tokens - 1][1]
+    tail_start = spans[len(spans) - tail_tokens][0] if tail_tokens else len(text)
+    # Prefer cutting at line breaks, unless that would lose most of the kept part
+    line_end = text.rfind("\n", 0, head_end)
+    if line_end > head_end // 2:
+        head_end = line_end
+    line_start = text.find("\n", tail_start)
+    if tail_tokens and 0 <= line_start < tail_start + (len(text) - tail_start) // 2:
+        tail_start = line_start + 1
+    cut = estimate_tokens(text[head_end:tail_start])
+    return f"{text[:head_end].rstrip()}\n[... đã lược bớt khoảng {cut} token để vừa ngân sách ...]\n{text[tail_start:].lstrip()}"
+
+
+def _agent_name(agent) -> str:
+    role = getattr(agent, "role", None) or "llm"
+    return " ".join(str(role).split())[:80]
+
+
+@dataclass
+class AgentUsage:
+    """Prompt sizes of one agent's LLM calls during a run."""
+    calls: int = 0
+    prompt_tokens: int = 0
+    max_prompt: int = 0
+    over_budget: int = 0
+    trimmed_tokens: int = 0
+    tool_outputs_trimmed: int = 0
+
+
+@dataclass
+class TokenBudget:
+    """Token budgets of a crew run, and what each agent used of them.
+
+    Example:
+        >>> budget = TokenBudget(prompt=12000, agents={"Chuyên gia chiến lược đầu tư": 16000})
+        >>> budget.fit_tool_output(output, agent)           # in an after_tool_call hook
+        >>> budget.fit_messages(context.messages, agent)    # in a before_llm_call hook
+        >>> print(budget.summary_table())
+    """
+    # Tokens of one LLM call's prompt, per agent role (`agents`) or by default
+    prompt: int = 12000
+    # Tokens of one tool output, per tool name (`tools`) or by default
+    tool_output: int = 3000
+    # Tokens of earlier tasks' output in a task prompt
+    context: int = 6000
+    # Tokens of all prompts of the run; going over is reported, not enforced
+    run: Optional[int] = None
+    agents: Dict[str, int] = field(default_factory=dict)
+    tools: Dict[str, int] = field(default_factory=dict)
+    usage: Dict[str, AgentUsage] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, **defaults) -> "TokenBudget":
+        """Budgets from VN_STOCK_PROMPT_BUDGET, VN_STOCK_TOOL_BUDGET, VN_STOCK_CONTEXT_BUDGET and VN_STOCK_RUN_BUDGET."""
+        names = {'prompt': "VN_STOCK_PROMPT_BUDGET", 'tool_output': "VN_STOCK_TOOL_BUDGET",
+                 'context': "VN_STOCK_CONTEXT_BUDGET", 'run': "VN_STOCK_RUN_BUDGET"}
+        values = {name: int(os.environ[var]) for name, var in names.items() if os.getenv(var)}
+        return cls(**{**defaults, **values})
+
+    def reset(self):
+        with self._lock:
+            self.usage = {}
+
+    def set_agent_budget(self, agent, prompt: int):
+        """Give one agent (e.g. the one reading every report) its own prompt budget."""
+        self.agents[_agent_name(agent)] = prompt
+
+    def set_tool_budget(self, tool_name: str, tokens: int):
+        """Give one tool (e.g. one that already reduces its output) its own output budget."""
+        self.tools[sanitize_tool_name(tool_name)] = tokens
+
+    def tool_budget(self, tool_name: Optional[str] = None) -> int:
+        # Hooks see the sanitized name the LLM called the tool by
+        return self.tools.get(sanitize_tool_name(tool_name), self.tool_output) if tool_name else self.tool_output
+
+    def prompt_budget(self, agent) -> int:
+        return self.agents.get(_agent_name(agent), self.prompt)
+
+    def _usage(self, agent) -> AgentUsage:
+        return self.usage.setdefault(_agent_name(agent), AgentUsage())
+
+    def fit_tool_output(self, output: str, agent=None, tool_name: Optional[str] = None) -> str:
+        """Return the tool output, trimmed to the tool's output budget."""
+        budget = self.tool_budget(tool_name)
+        if not isinstance(output, str) or estimate_tokens(output) <= budget:
+            return output
+        trimmed = trim_text(output, budget)
+        with self._lock:
+            usage = self._usage(agent)
+            usage.tool_outputs_trimmed += 1
+            usage.trimmed_tokens += estimate_tokens(output) - estimate_tokens(trimmed)
+        return trimmed
+
+    def fit_messages(self, messages: List[dict], agent=None) -> int:
+        """Trim the messages of an LLM call in place to the budgets; return the prompt's tokens after trimming."""
+        sizes = [estimate_tokens(_content(m)) for m in messages]
+        before = sum(sizes)
+        budget = self.prompt_budget(agent)
+
+        for i, message in enumerate(messages):
+            content = _content(message)
+            if message.get('role') == "user" and CONTEXT_MARKER in content:
+                sizes[i] = _set_content(message, _trim_section(content, CONTEXT_MARKER, CONTEXT_END, self.context))
+
+        # Oldest observations first; the latest message is what the agent is answering
+        for i, message in enumerate(messages[:-1]):
+            excess = sum(sizes) - budget
+            if excess <= 0:
+                break
+            content = _content(message)
+            if message.get('role') == "system" or OBSERVATION_MARKER not in content:
+                continue
+            keep = max(MIN_OBSERVATION, estimate_tokens(content.split(OBSERVATION_MARKER, 1)[1]) - excess)
+            sizes[i] = _set_content(message, _trim_section(content, OBSERVATION_MARKER, None, keep))
+
+        after = sum(sizes)
+        with self._lock:
+            usage = self._usage(agent)
+            usage.calls += 1
+            usage.prompt_tokens += after
+            usage.max_prompt = max(usage.max_prompt, after)
+            usage.trimmed_tokens += before - after
+            usage.over_budget += int(after > budget)
+        return after
+
+    def total(self) -> int:
+        with self._lock:
+            return sum(u.prompt_tokens for u in self.usage.values())
+
+    def summary(self) -> pd.DataFrame:
+        """Prompt tokens per agent against their budget."""
+        with self._lock:
+            rows = [{'agent': name, 'budget': self.agents.get(name, self.prompt), **vars(u)} for name, u in self.usage.items()]
+        return pd.DataFrame(rows).set_index('agent') if rows else pd.DataFrame()
+
+    def summary_table(self) -> str:
+        summary = self.summary()
+        if summary.empty:
+            return "Chưa có lệnh gọi LLM nào trong lần chạy này."
+        total = int(summary['prompt_tokens'].sum())
+        limit = f" / ngân sách {self.run:,}" if self.run else ""
+        warning = "\nVƯỢT NGÂN SÁCH TOKEN CỦA LẦN CHẠY." if self.run and total > self.run else ""
+        return f"NGÂN SÁCH TOKEN (prompt: {total:,} token{limit}, ước tính):\n{summary.to_string()}{warning}"
+
+
+def _content(message: dict) -> str:
+    content = message.get('content')
+    return content if isinstance(content, str) else ""
+
+
+def _set_content(message: dict, content: str) -> int:
+    # Messages with non-text content (images...) are left alone
+    if isinstance(message.get('content'), str):
+        message['content'] = content
+    return estimate_tokens(_content(message))
+
+
+def _trim_section(content: str, marker: str, end_marker: Optional[str], budget: int) -> str:
+    """Trim the part of `content` after `marker` (up to `end_marker`, if present) to `budget` tokens."""
+    start = content.index(marker) + len(marker)
+    end = content.find(end_marker, start) if end_marker else -1
+    end = end if end >= 0 else len(content)
+    return content[:start] + trim_text(content[start:end], budget) + content[end:]
@@ -0,0 +1,247 @@
+"""
+Lightweight tracing for crew runs.
+
+Tools, data fetches and agents record spans (name, kind, start/end time,
+attributes such as tokens, cache hits and bytes fetched) in the current
+Tracer: the one a crew run started with `start_run` (its threads inherit
+it, so concurrent runs keep separate traces), else a process-wide one. A run's spans can be exported as JSON lines or as
+OTLP/JSON, which OpenTelemetry collectors and viewers accept, and
+summarised per kind and name to see where the minutes go.
+"""
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from vn_stock_advisor.utils.cache import get_cache_dir
+from vn_stock_advisor.utils.reducer import estimate_tokens
+
+# OTLP span kinds: tools, fetches and LLM calls are calls to something else
+_OTLP_KINDS = {'agent': 1, 'compute': 1, 'tool': 3, 'fetch': 3, 'llm': 3}
+# Attributes summed in the summary table
+SUMMED_ATTRIBUTES = ('prompt_tokens', 'completion_tokens', 'output_tokens', 'cache_hits', 'cassette_hits', 'bytes')
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str
+    trace_id: str
+    span_id: str = field(default_factory=lambda: uuid.uuid4().hex[:16])
+    parent_id: Optional[str] = None
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def add(self, name: str, amount: float = 1):
+        """Increment a counter attribute (cache hits, bytes...)."""
+        self.attributes[name] = self.attributes.get(name, 0) + amount
+
+
+def _otlp_value(value) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+class Tracer:
+    """Collects the spans of the current run.
+
+    Example:
+        >>> tracer = get_tracer()
+        >>> with tracer.span("vnstock.history", "fetch", symbol="HPG") as span:
+        ...     span.set(rows=len(data))
+        >>> print(tracer.summary_table())
+    """
+
+    def __init__(self, service: str = "vn_stock_advisor"):
+        self.service = service
+        self._lock = threading.Lock()
+        self._current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+        self.reset()
+
+    def reset(self):
+        """Start a new trace, dropping the spans recorded so far."""
+        with self._lock:
+            self.trace_id = uuid.uuid4().hex
+            self.spans: List[Span] = []
+            self.started_ns = time.time_ns()
+
+    def current(self) -> Optional[Span]:
+        return self._current.get()
+
+    def start_span(self, name: str, kind: str = "internal", parent: Optional[Span] = None,
+                   start_ns: Optional[int] = None, **attributes) -> Span:
+        parent = parent or self.current()
+        return Span(name, kind, self.trace_id, parent_id=parent.span_id if parent else None,
+                    start_ns=start_ns or time.time_ns(), attributes=dict(attributes))
+
+    def end_span(self, span: Span, end_ns: Optional[int] = None, error: Optional[str] = None):
+        span.end_ns = end_ns or time.time_ns()
+        span.error = error or span.error
+        with self._lock:
+            self.spans.append(span)
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", **attributes) -> Iterator[Span]:
+        """Record the enclosed block as a span, nested under the current one."""
+        span = self.start_span(name, kind, **attributes)
+        token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self._current.reset(token)
+            self.end_span(span)
+
+    def finished(self) -> List[Span]:
+        with self._lock:
+            return sorted(self.spans, key=lambda s: s.start_ns)
+
+    def export_jsonl(self, path) -> Path:
+        """Write one JSON object per span."""
+        path = Path(path)
+        with open(path, "w", encoding="utf-8") as f:
+            for span in self.finished():
+                f.write(json.dumps(dict(asdict(span), duration_ms=span.duration_ms), ensure_ascii=False, default=str) + "\n")
+        return path
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Return the spans as an OTLP/JSON ExportTraceServiceRequest."""
+        spans = [{
+            'traceId': span.trace_id,
+            'spanId': span.span_id,
+            **({'parentSpanId': span.parent_id} if span.parent_id else {}),
+            'name': span.name,
+            'kind': _OTLP_KINDS.get(span.kind, 1),
+            'startTimeUnixNano': str(span.start_ns),
+            'endTimeUnixNano': str(span.end_ns),
+            'attributes': [{'key': k, 'value': _otlp_value(v)}
+                           for k, v in {'span.kind': span.kind, **span.attributes}.items() if v is not None],
+            'status': {'code': 2, 'message': span.error} if span.error else {'code': 1},
+        } for span in self.finished()]
+        return {'resourceSpans': [{
+            'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': self.service}}]},
+            'scopeSpans': [{'scope': {'name': 'vn_stock_advisor.tracing'}, 'spans': spans}],
+        }]}
+
+    def export_otlp(self, path) -> Path:
+        path = Path(path)
+        path.write_text(json.dumps(self.to_otlp(), ensure_ascii=False), encoding="utf-8")
+        return path
+
+    def summary(self) -> pd.DataFrame:
+        """Calls, errors, time and summed counters per (kind, name), slowest first."""
+        spans = self.finished()
+        if not spans:
+            return pd.DataFrame()
+        frame = pd.DataFrame([{
+            'kind': s.kind, 'name': s.name, 'ms': s.duration_ms, 'error': s.error is not None,
+            **{a: s.attributes.get(a, 0) for a in SUMMED_ATTRIBUTES},
+        } for s in spans])
+        grouped = frame.groupby(['kind', 'name'])
+        summary = grouped.agg(calls=('ms', 'size'), errors=('error', 'sum'), total_s=('ms', 'sum'),
+                              mean_ms=('ms', 'mean'), max_ms=('ms', 'max'),
+                              **{a: (a, 'sum') for a in SUMMED_ATTRIBUTES})
+        summary['total_s'] /= 1000
+        return summary.sort_values('total_s', ascending=False)
+
+    def summary_table(self) -> str:
+        summary = self.summary()
+        if summary.empty:
+            return "Không có dữ liệu đo thời gian."
+        wall = (time.time_ns() - self.started_ns) / 1e9
+        # Drop counters nothing reported
+        summary = summary.loc[:, (summary != 0).any(axis=0) | ~summary.columns.isin(SUMMED_ATTRIBUTES)]
+        table = summary.to_string(float_format=lambda v: f"{v:,.1f}")
+        return f"THỜI GIAN THỰC HIỆN (tổng {wall:,.1f} s, trace {self.trace_id}):\n{table}"
+
+
+_tracer = Tracer()
+_run_tracer: contextvars.ContextVar[Optional[Tracer]] = contextvars.ContextVar("run_tracer", default=None)
+
+
+def get_tracer() -> Tracer:
+    return _run_tracer.get() or _tracer
+
+
+def start_run() -> Tracer:
+    """Give the current context (a crew run, and the threads and tasks it starts) a new trace."""
+    tracer = Tracer()
+    _run_tracer.set(tracer)
+    return tracer
+
+
+def annotate(**attributes):
+    """Set attributes on the current span, if any."""
+    span = get_tracer().current()
+    if span is not None:
+        span.set(**attributes)
+
+
+def count(name: str, amount: float = 1):
+    """Increment a counter attribute of the current span, if any."""
+    span = get_tracer().current()
+    if span is not None:
+        span.add(name, amount)
+
+
+def traced_tool(run):
+    """Decorate a tool's `_run` to record a "tool" span named after the tool.
+
+    The span gets the output size and an estimate of its tokens; an output
+    starting with "Error", "Lỗi" or "⚠️" (how tools report failures) marks it failed.
+    """
+    @functools.wraps(run)
+    def wrapper(self, *args, **kwargs):
+        with get_tracer().span(self.name, "tool") as span:
+            output = run(self, *args, **kwargs)
+            if isinstance(output, str):
+                span.set(output_chars=len(output), output_tokens=estimate_tokens(output))
+                if output.startswith(("Error", "Lỗi", "⚠️")):
+                    span.error = output[:200]
+            return output
+
+    return wrapper
+
+
+def report_run(tracer: Optional[Tracer] = None) -> str:
+    """Export the run's spans (JSONL and OTLP/JSON) to trace_dir() and return the summary table."""
+    tracer = tracer or get_tracer()
+    directory = trace_dir()
+    jsonl = tracer.export_jsonl(directory / f"{tracer.trace_id}.jsonl")
+    otlp = tracer.export_otlp(directory / f"{tracer.trace_id}.otlp.json")
+    return f"{tracer.summary_table()}\nChi tiết: {jsonl} (OTLP: {otlp})"
+
+
+def trace_dir() -> Path:
+    """Directory for exported traces: VN_STOCK_TRACE_DIR, or traces/ under the cache root."""
+    directory = os.getenv("VN_STOCK_TRACE_DIR")
+    if directory:
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        return Path(directory)
+    return get_cache_dir("traces")
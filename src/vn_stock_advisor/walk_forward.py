@@ -0,0 +1,170 @@
+"""
+Walk-forward evaluation of recorded investment decisions.
+
+Joins every decision in the DecisionLedger with the forward returns that
+followed it in the local price store, over several horizons, and grades it:
+BUY is right when the price rose by more than the hold band, SELL when it
+fell by more, HOLD when it stayed inside. Results are kept between runs,
+so each update only looks at decisions whose horizons were still open.
+"""
+
+import argparse
+import os
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from vn_stock_advisor.data.decision_ledger import DecisionLedger
+from vn_stock_advisor.data.history import HistoryLoader
+from vn_stock_advisor.data.price_store import PriceStore
+from vn_stock_advisor.utils.cache import get_cache_dir
+
+DEFAULT_HORIZONS = (5, 20, 60)
+EVALUATION_COLUMNS = ['decision_id', 'horizon', 'base_time', 'exit_time', 'forward_return']
+
+
+def _take(times: np.ndarray, positions: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    result = np.full(len(positions), np.datetime64('NaT'), dtype='datetime64[ns]')
+    result[valid] = times[positions[valid]]
+    return result
+
+
+class WalkForwardEvaluator:
+    """Grade ledger decisions against the returns that followed them.
+
+    Example:
+        >>> evaluator = WalkForwardEvaluator()
+        >>> evaluator.update()
+        >>> evaluator.report()  # accuracy per config, model and horizon
+    """
+
+    def __init__(
+        self,
+        ledger: Optional[DecisionLedger] = None,
+        store: Optional[PriceStore] = None,
+        horizons: Sequence[int] = DEFAULT_HORIZONS,
+        hold_band: float = 0.02,
+        state_path: Optional[str] = None,
+        history_loader: Optional[HistoryLoader] = None,
+    ):
+        """
+        Args:
+            history_loader: When set, prices of symbols with open horizons are
+                brought up to date before each update; otherwise only the
+                local store is read.
+        """
+        self.ledger = ledger or DecisionLedger()
+        self.store = store or PriceStore()
+        self.horizons = tuple(horizons)
+        self.hold_band = hold_band
+        self.state_path = state_path or str(get_cache_dir("evaluations") / "forward_returns.npz")
+        self.history_loader = history_loader
+
+    def _load_state(self) -> pd.DataFrame:
+        if not os.path.exists(self.state_path):
+            return pd.DataFrame({c: pd.Series(dtype=t) for c, t in zip(
+                EVALUATION_COLUMNS, [str, int, 'datetime64[ns]', 'datetime64[ns]', float])})
+        with np.load(self.state_path) as arrays:
+            return pd.DataFrame({column: arrays[column] for column in EVALUATION_COLUMNS})
+
+    def _save_state(self, state: pd.DataFrame):
+        tmp_path = self.state_path + ".tmp.npz"
+        np.savez(tmp_path, **{
+            'decision_id': state['decision_id'].to_numpy(dtype=str),
+            'horizon': state['horizon'].to_numpy(dtype=int),
+            'base_time': state['base_time'].to_numpy(dtype='datetime64[ns]'),
+            'exit_time': state['exit_time'].to_numpy(dtype='datetime64[ns]'),
+            'forward_return': state['forward_return'].to_numpy(dtype=float),
+        })
+        os.replace(tmp_path, self.state_path)
+
+    def update(self) -> pd.DataFrame:
+        """Compute forward returns that became available since the last update.
+
+        Returns:
+            One row per (decision, horizon) with the base and exit session and
+            the forward return (NaN while the horizon hasn't elapsed).
+        """
+        decisions = self.ledger.read()
+        state = self._load_state()
+        done = state[state['forward_return'].notna()]
+
+        pairs = decisions[['decision_id', 'symbol', 'date']].merge(
+            pd.DataFrame({'horizon': self.horizons}), how='cross')
+        finished = pd.MultiIndex.from_frame(done[['decision_id', 'horizon']])
+        pending = pairs[~pd.MultiIndex.from_frame(pairs[['decision_id', 'horizon']]).isin(finished)]
+
+        results = [done]
+        for symbol, group in pending.groupby('symbol'):
+            if self.history_loader is not None:
+                self.history_loader.load(symbol, bars=max(self.horizons) + 1)
+            records = self.store.read_records(symbol)
+            times, closes = records['time'], records['close']
+            # Base: the last session on or before the decision date
+            base = np.searchsorted(times, (group['date'] + pd.Timedelta(days=1)).to_numpy(), side='left') - 1
+            exit_ = base + group['horizon'].to_numpy()
+            available = (base >= 0) & (exit_ < len(times))
+            forward = np.full(len(group), np.nan)
+            forward[available] = closes[exit_[available]] / closes[base[available]] - 1
+            results.append(pd.DataFrame({
+                'decision_id': group['decision_id'].to_numpy(),
+                'horizon': group['horizon'].to_numpy(),
+                'base_time': _take(times, base, base >= 0),
+                'exit_time': _take(times, exit_, available),
+                'forward_return': forward,
+            }))
+
+        state = pd.concat(results, ignore_index=True)
+        self._save_state(state)
+        return state
+
+    def evaluations(self, update: bool = True) -> pd.DataFrame:
+        """Return decisions joined with their forward returns and grades."""
+        state = self.update() if update else self._load_state()
+        state = state[state['horizon'].isin(self.horizons)]
+        table = self.ledger.read().merge(state, on='decision_id', how='inner')
+        r = table['forward_return']
+        outcome = np.select([r > self.hold_band, r < -self.hold_band], ['BUY', 'SELL'], 'HOLD')
+        table['correct'] = np.where(r.notna(), table['action'] == outcome, np.nan)
+        # Return earned by following the decision: long on BUY, short on SELL, flat on HOLD
+        table['signed_return'] = r * table['action'].map({'BUY': 1.0, 'SELL': -1.0, 'HOLD': 0.0})
+        return table
+
+    def report(self, by: Sequence[str] = ('config', 'model', 'horizon'), update: bool = True) -> pd.DataFrame:
+        """Return accuracy and average returns per group of `by` columns."""
+        table = self.evaluations(update=update)
+        table = table[table['action'] != 'UNKNOWN']
+        if table.empty:
+            return pd.DataFrame(columns=['decisions', 'evaluated', 'accuracy', 'avg_signed_return', 'buy_return', 'sell_return'])
+
+        evaluated = table[table['forward_return'].notna()]
+        groups, evaluated_groups = table.groupby(list(by)), evaluated.groupby(list(by))
+        report = pd.DataFrame({
+            'decisions': groups.size(),
+            'evaluated': evaluated_groups.size(),
+            'accuracy': evaluated_groups['correct'].mean(),
+            'avg_signed_return': evaluated_groups['signed_return'].mean(),
+            'buy_return': evaluated[evaluated['action'] == 'BUY'].groupby(list(by))['forward_return'].mean(),
+            'sell_return': evaluated[evaluated['action'] == 'SELL'].groupby(list(by))['forward_return'].mean(),
+        })
+        report['evaluated'] = report['evaluated'].fillna(0).astype(int)
+        return report
+
+
+def main():
+    """Print the walk-forward report from the command line."""
+    parser = argparse.ArgumentParser(description="Đánh giá các khuyến nghị đã lưu bằng lợi suất thực tế sau đó.")
+    parser.add_argument("--horizons", default=",".join(map(str, DEFAULT_HORIZONS)), help="Số phiên nắm giữ, phân tách bằng dấu phẩy")
+    parser.add_argument("--hold-band", type=float, default=0.02, help="Biên độ lợi suất coi là đi ngang (GIỮ)")
+    parser.add_argument("--refresh", action="store_true", help="Tải thêm dữ liệu giá mới trước khi đánh giá")
+    args = parser.parse_args()
+
+    horizons = [int(h) for h in args.horizons.split(",") if h.strip()]
+    evaluator = WalkForwardEvaluator(horizons=horizons, hold_band=args.hold_band,
+                                     history_loader=HistoryLoader() if args.refresh else None)
+    print(evaluator.report().to_string())
+
+
+if __name__ == "__main__":
+    main()
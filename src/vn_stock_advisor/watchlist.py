@@ -0,0 +1,307 @@
+"""
+Long-running watchlist monitor.
+
+Follows a few hundred symbols in one process: each keeps a fixed-size ring
+buffer of its recent bars and the incremental indicator state, and every
+new bar re-evaluates TechDataTool's rule set. When a watched signal flips
+(e.g. MACD turns positive), alerts go to stdout, a JSONL file or a
+webhook, and only then is a full crew run triggered for that symbol.
+"""
+
+import argparse
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import requests
+
+from vn_stock_advisor.data.history import HistoryLoader
+from vn_stock_advisor.data.intraday import INTRADAY_MINUTES, SESSIONS, is_intraday
+from vn_stock_advisor.data.price_store import BAR_DTYPE, PRICE_COLUMNS
+from vn_stock_advisor.indicators.incremental import IndicatorState
+from vn_stock_advisor.indicators.signals import classify_signals
+from vn_stock_advisor.indicators.technical import LOOKBACK_BARS
+
+# Signals whose flips raise alerts by default (volume categories change too often)
+WATCHED_SIGNALS = ('long_trend', 'short_trend', 'macd', 'rsi_zone', 'bollinger')
+
+
+class BarRing:
+    """Fixed-size, array-backed ring buffer of one symbol's most recent bars."""
+
+    def __init__(self, capacity: int = LOOKBACK_BARS):
+        self._data = np.zeros(capacity, dtype=BAR_DTYPE)
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data)
+
+    def push(self, time, open_, high, low, close, volume):
+        self._data[self._next] = (np.datetime64(pd.Timestamp(time), 'ns'), open_, high, low, close, volume)
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def last_time(self) -> Optional[pd.Timestamp]:
+        return pd.Timestamp(self._data['time'][self._next - 1]) if self._size else None
+
+    def records(self) -> np.ndarray:
+        """Return the stored bars, oldest first."""
+        if self._size < self.capacity:
+            return self._data[:self._size].copy()
+        return np.concatenate([self._data[self._next:], self._data[:self._next]])
+
+    def to_frame(self) -> pd.DataFrame:
+        records = self.records()
+        return pd.DataFrame({column: records[column] for column in BAR_DTYPE.names})
+
+
+@dataclass
+class Alert:
+    symbol: str
+    time: str
+    signal: str
+    previous: str
+    current: str
+    price: float
+
+    def message(self) -> str:
+        return f"[{self.time}] {self.symbol}: {self.signal} {self.previous} -> {self.current} (giá {self.price:,.2f})"
+
+
+@dataclass
+class AlertRule:
+    """Alert when one of `signals` changes category, optionally only into one of `to`.
+
+    Example:
+        >>> AlertRule(('rsi_zone',), to=('OVERSOLD',))  # only entries into the oversold zone
+    """
+    signals: Sequence[str] = WATCHED_SIGNALS
+    to: Optional[Sequence[str]] = None
+
+    def check(self, symbol: str, time, price: float, previous: Dict[str, str], current: Dict[str, str]) -> List[Alert]:
+        return [
+            Alert(symbol, str(time), name, previous[name], current[name], float(price))
+            for name in self.signals
+            if previous[name] != current[name] and (self.to is None or current[name] in self.to)
+        ]
+
+
+def stdout_sink(alerts: List[Alert]):
+    for alert in alerts:
+        print(alert.message(), flush=True)
+
+
+class FileSink:
+    """Append alerts to a JSONL file."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def __call__(self, alerts: List[Alert]):
+        lines = "".join(json.dumps(asdict(a), ensure_ascii=False) + "\n" for a in alerts)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+class WebhookSink:
+    """POST alerts as a JSON list; delivery errors are printed, never raised into the monitor."""
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self, alerts: List[Alert]):
+        try:
+            requests.post(self.url, json=[asdict(a) for a in alerts], timeout=self.timeout).raise_for_status()
+        except requests.RequestException as e:
+            print(f"Không gửi được cảnh báo tới webhook: {e}")
+
+
+class CrewTrigger:
+    """Run the full crew for a symbol whose signals flipped, in a background thread.
+
+    A symbol already being analysed, or analysed within `cooldown` seconds,
+    is skipped, so a burst of flips costs one crew run.
+    """
+
+    def __init__(self, crew_factory: Optional[Callable] = None, cooldown: float = 3600.0):
+        self.crew_factory = crew_factory
+        self.cooldown = cooldown
+        self._last_run: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, symbol: str, alerts: List[Alert]) -> Optional[threading.Thread]:
+        with self._lock:
+            if time.monotonic() - self._last_run.get(symbol, -np.inf) < self.cooldown:
+                return None
+            self._last_run[symbol] = time.monotonic()
+        worker = threading.Thread(target=self._run, args=(symbol,), daemon=True)
+        worker.start()
+        return worker
+
+    def _run(self, symbol: str):
+        if self.crew_factory is None:
+            from vn_stock_advisor.crew import VnStockAdvisor
+            self.crew_factory = lambda: VnStockAdvisor().crew()
+        try:
+            self.crew_factory().kickoff(inputs={"symbol": symbol, "current_date": str(date.today())})
+        except Exception as e:
+            print(f"Lỗi khi chạy phân tích {symbol}: {e}")
+
+
+class _Watched:
+    __slots__ = ('ring', 'state', 'signals')
+
+    def __init__(self, symbol: str, capacity: int, interval: str):
+        self.ring = BarRing(capacity)
+        self.state = IndicatorState(symbol, interval)
+        self.signals: Optional[Dict[str, str]] = None
+
+
+class WatchlistMonitor:
+    """Evaluate the technical rule set on every new bar of each watched symbol.
+
+    Memory per symbol is fixed (a ring of `capacity` bars plus indicator
+    windows bounded by SMA 200) and one bar costs one incremental indicator
+    update and one rule evaluation, well under a millisecond.
+
+    Example:
+        >>> monitor = WatchlistMonitor(["HPG", "FPT"], sinks=[stdout_sink], on_flip=CrewTrigger())
+        >>> monitor.run(HistoryLoader(), poll_seconds=60)
+    """
+
+    def __init__(
+        self,
+        symbols: Iterable[str],
+        interval: str = "1D",
+        capacity: int = LOOKBACK_BARS,
+        rules: Optional[Sequence[AlertRule]] = None,
+        sinks: Optional[Sequence[Callable[[List[Alert]], None]]] = None,
+        on_flip: Optional[Callable[[str, List[Alert]], object]] = None,
+    ):
+        self.interval = interval
+        self.capacity = capacity
+        self.rules = list(rules) if rules is not None else [AlertRule()]
+        self.sinks = list(sinks) if sinks is not None else [stdout_sink]
+        self.on_flip = on_flip
+        self.watched = {s.strip().upper(): _Watched(s.strip().upper(), capacity, interval) for s in symbols}
+
+    def on_bar(self, symbol: str, time, open_, high, low, close, volume, notify: bool = True) -> List[Alert]:
+        """Consume one closed bar and return the alerts it raised."""
+        watched = self.watched[symbol]
+        watched.ring.push(time, open_, high, low, close, volume)
+        row = watched.state.advance(time, close, volume)
+        signals = classify_signals(row, close)
+
+        alerts = []
+        if watched.signals is not None:
+            for rule in self.rules:
+                alerts.extend(rule.check(symbol, time, close, watched.signals, signals))
+        watched.signals = signals
+
+        if alerts and notify:
+            for sink in self.sinks:
+                sink(alerts)
+            if self.on_flip is not None:
+                self.on_flip(symbol, alerts)
+        return alerts
+
+    def feed(self, symbol: str, bars: pd.DataFrame, notify: bool = True) -> List[Alert]:
+        """Consume the bars of `bars` newer than the last one seen (oldest first)."""
+        symbol = symbol.strip().upper()
+        last_time = self.watched[symbol].ring.last_time()
+        if last_time is not None:
+            bars = bars[pd.to_datetime(bars['time']) > last_time]
+        alerts = []
+        for row in bars[['time'] + PRICE_COLUMNS].itertuples(index=False):
+            alerts.extend(self.on_bar(symbol, *row, notify=notify))
+        return alerts
+
+    def _closed_bars(self, bars: pd.DataFrame, now: datetime) -> pd.DataFrame:
+        # Drop the last bar while it is still forming
+        if bars.empty:
+            return bars
+        last = pd.Timestamp(bars['time'].iloc[-1])
+        if is_intraday(self.interval):
+            end = last + pd.Timedelta(minutes=INTRADAY_MINUTES[self.interval])
+        else:
+            (_, _), (close_hour, close_minute) = SESSIONS[-1]
+            end = last.normalize() + pd.Timedelta(hours=close_hour, minutes=close_minute)
+        return bars if end <= pd.Timestamp(now) else bars.iloc[:-1]
+
+    def poll(self, loader: HistoryLoader, now: Optional[datetime] = None) -> List[Alert]:
+        """Fetch every symbol's latest bars and process the closed ones not seen yet.
+
+        The first poll of a symbol only warms up its state, without alerts.
+        """
+        now = now or datetime.now()
+        alerts = []
+        for symbol, watched in self.watched.items():
+            try:
+                if is_intraday(self.interval):
+                    bars = loader.load_intraday(symbol, self.interval, bars=self.capacity)
+                else:
+                    bars = loader.load(symbol, bars=self.capacity)
+            except Exception as e:
+                print(f"Lỗi khi lấy dữ liệu {symbol}: {e}")
+                continue
+            alerts.extend(self.feed(symbol, self._closed_bars(bars, now), notify=watched.signals is not None))
+        return alerts
+
+    def run(self, loader: Optional[HistoryLoader] = None, poll_seconds: float = 60.0,
+            stop: Optional[threading.Event] = None):
+        """Poll until `stop` is set (or forever)."""
+        loader = loader or HistoryLoader()
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            started = time.monotonic()
+            self.poll(loader)
+            stop.wait(max(0.0, poll_seconds - (time.monotonic() - started)))
+
+
+def main():
+    """Watch a list of tickers from the command line."""
+    parser = argparse.ArgumentParser(description="Theo dõi danh sách mã, cảnh báo khi tín hiệu kỹ thuật đảo chiều.")
+    parser.add_argument("symbols", help="Danh sách mã, phân tách bằng dấu phẩy, ví dụ: HPG,FPT,VNM")
+    parser.add_argument("--interval", default="1D", help="Khung thời gian: 1D, 1m, 5m, 15m, 30m, 1H")
+    parser.add_argument("--poll", type=float, default=60.0, help="Số giây giữa hai lần cập nhật dữ liệu")
+    parser.add_argument("--signals", default=",".join(WATCHED_SIGNALS), help="Các tín hiệu cần theo dõi")
+    parser.add_argument("--alert-file", help="Ghi cảnh báo vào tệp JSONL")
+    parser.add_argument("--webhook", help="Gửi cảnh báo tới URL này")
+    parser.add_argument("--crew", action="store_true", help="Chạy phân tích đầy đủ khi tín hiệu đảo chiều")
+    args = parser.parse_args()
+
+    sinks = [stdout_sink]
+    if args.alert_file:
+        sinks.append(FileSink(args.alert_file))
+    if args.webhook:
+        sinks.append(WebhookSink(args.webhook))
+    signals = tuple(s.strip() for s in args.signals.split(",") if s.strip())
+    monitor = WatchlistMonitor(
+        [s for s in args.symbols.split(",") if s.strip()],
+        interval=args.interval,
+        rules=[AlertRule(signals)],
+        sinks=sinks,
+        on_flip=CrewTrigger() if args.crew else None,
+    )
+    print(f"Đang theo dõi {len(monitor.watched)} mã, khung {args.interval}. Nhấn Ctrl+C để dừng.")
+    try:
+        monitor.run(poll_seconds=args.poll)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
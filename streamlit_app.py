@@ -105,6 +105,9 @@ def load_env_file():
 def check_api_keys():
     """Check if required API keys are configured"""
     required_keys = ["OPENAI_API_KEY", "BRAVE_API_KEY", "FIRECRAWL_API_KEY"]
+    # Replaying a recorded cassette serves Brave and Firecrawl offline
+    if os.getenv("VN_STOCK_CASSETTE") and os.getenv("VN_STOCK_CASSETTE_MODE", "").lower() == "replay":
+        required_keys = ["OPENAI_API_KEY"]
     missing_keys = [key for key in required_keys if not os.getenv(key)]
 
     if missing_keys:
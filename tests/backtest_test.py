@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+from vn_stock_advisor.backtest import MarketRules, load_panel, run_backtest, signal_scores
+from vn_stock_advisor.data.price_store import PriceStore
+from vn_stock_advisor.indicators.signals import classify_signals, signal_score
+from vn_stock_advisor.indicators.technical import calculate_indicators
+
+SESSIONS = pd.bdate_range('2024-01-01', periods=8)
+
+
+def make_panel(opens, closes, volumes=None):
+    opens, closes = np.asarray(opens, dtype=float)[:, None], np.asarray(closes, dtype=float)[:, None]
+    volumes = np.full_like(closes, 1000.0) if volumes is None else np.asarray(volumes, dtype=float)[:, None]
+    frame = lambda values: pd.DataFrame(values, index=SESSIONS[:len(values)], columns=['AAA'])
+    return {'open': frame(opens), 'high': frame(np.maximum(opens, closes)), 'low': frame(np.minimum(opens, closes)),
+            'close': frame(closes), 'volume': frame(volumes)}
+
+
+def test_settlement_lot_size_and_fees():
+    prices = [10, 10, 11, 12, 12, 12, 12, 12]
+    panel = make_panel(prices, prices)
+    # Buy signal on the first close, sell signal right after the purchase
+    scores = np.array([[5], [-5], [-5], [-5], [-5], [-5], [-5], [-5]], dtype=float)
+    rules = MarketRules()
+    result = run_backtest(panel, position_size=10_000, rules=rules, scores=scores)
+
+    trade = result.trades.iloc[0]
+    assert len(result.trades) == 1
+    # Bought at session 1's open, first sale allowed on the third session after (T+2.5)
+    assert trade['entry_time'] == SESSIONS[1] and trade['exit_time'] == SESSIONS[4]
+    assert trade['shares'] == 900  # 10,000 / (10 * 1.0015) = 998 shares, rounded down to lots of 100
+    cost = 900 * 10 * (1 + rules.fee_rate)
+    proceeds = 900 * 12 * (1 - rules.fee_rate - rules.sell_tax)
+    assert np.isclose(trade['pnl'], proceeds - cost)
+    assert np.isclose(result.equity.iloc[-1], 10_000 - cost + proceeds)
+    assert result.summary()['hit_rate'] == 1.0
+
+
+def test_price_band_limits():
+    # Session 1 opens at the ceiling (+7%): the buy can't fill until session 2
+    panel = make_panel([10, 10.7, 10.8, 10.8, 10.8, 10.05, 10.05, 10.05], [10, 10.7, 10.8, 10.8, 10.8, 10.1, 10.05, 10.05])
+    scores = np.array([[5], [5], [0], [0], [-5], [-5], [-5], [-5]], dtype=float)
+    result = run_backtest(panel, position_size=100_000, scores=scores)
+    trade = result.trades.iloc[0]
+    assert trade['entry_time'] == SESSIONS[2]
+    # Session 5 opens at the floor (-7% from 10.8): the sale waits for session 6
+    assert trade['exit_time'] == SESSIONS[6]
+
+
+def test_load_panel_and_scores_match_per_symbol_rules(tmp_path):
+    store = PriceStore(str(tmp_path))
+    days = pd.bdate_range('2023-01-02', periods=300)
+    rng = np.random.default_rng(3)
+    for seed, symbol in enumerate(['AAA', 'BBB']):
+        close = 25 + np.cumsum(rng.normal(0, 0.4, 300))
+        bars = pd.DataFrame({'time': days, 'open': close, 'high': close + 0.2, 'low': close - 0.2,
+                             'close': close, 'volume': rng.integers(1e4, 1e6, 300)})
+        store.write(symbol, bars if symbol == 'AAA' else bars.drop(index=[250, 251]))
+
+    panel = load_panel(store, ['AAA', 'BBB'])
+    assert panel['volume']['BBB'].iloc[250] == 0
+    assert panel['close']['BBB'].iloc[251] == panel['close']['BBB'].iloc[249]
+
+    scores = signal_scores(panel)
+    assert np.isnan(scores[198, 0]) and not np.isnan(scores[199, 0])
+    data = calculate_indicators(store.read('AAA'))
+    expected = signal_score(classify_signals(data, data['close']))
+    assert np.array_equal(scores[199:, 0], expected[199:])
+
+    # The halted sessions are left out of BBB's indicators and keep the score of its last bar
+    bars = store.read('BBB')
+    data = calculate_indicators(bars)
+    expected = signal_score(classify_signals(data, data['close']))
+    rows = np.flatnonzero(panel['has_bar']['BBB'].to_numpy())
+    assert len(rows) == 298 and np.array_equal(scores[rows[199:], 1], expected[199:])
+    assert scores[250, 1] == scores[251, 1] == scores[249, 1]
+
+
+def test_scores_match_per_symbol_rules_on_flat_runs(tmp_path):
+    store = PriceStore(str(tmp_path))
+    days = pd.bdate_range('2023-01-02', periods=320)
+    rng = np.random.default_rng(7)
+    for symbol in ['AAA', 'BBB', 'CCC']:
+        close = (25000 + np.cumsum(rng.normal(0, 300, 320))).round(-2)
+        volume = rng.integers(1e4, 1e6, 320).astype(float)
+        # Limit-locked stretches repeat the close; illiquid ones trade nothing
+        start = int(rng.integers(200, 280))
+        close[start:start + 25] = close[start]
+        volume[start + 10:start + 30] = 0
+        store.write(symbol, pd.DataFrame({'time': days, 'open': close, 'high': close + 100, 'low': close - 100,
+                                          'close': close, 'volume': volume}))
+
+    scores = signal_scores(load_panel(store, ['AAA', 'BBB', 'CCC']))
+    for j, symbol in enumerate(['AAA', 'BBB', 'CCC']):
+        data = calculate_indicators(store.read(symbol))
+        expected = signal_score(classify_signals(data, data['close']))
+        assert np.array_equal(scores[199:, j], expected[199:])
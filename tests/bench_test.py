@@ -0,0 +1,42 @@
+import json
+
+from vn_stock_advisor import bench
+
+
+def test_every_case_runs_on_the_fixtures():
+    results = bench.run(quick=True, repeat=1, min_time=0)
+    assert set(results) == {c.ids()[0] for c in bench.CASES.values()}
+    assert all(r['min_ms'] > 0 for r in results.values())
+
+
+def test_universe_series_are_distinct():
+    universe = bench.Fixtures().universe(3, bars=200)
+    closes = [df['close'].iloc[-1] for df in universe.values()]
+    assert len(set(closes)) == 3 and all(len(df) == 200 for df in universe.values())
+
+
+def test_default_fixtures_are_synthetic():
+    fixtures = bench.Fixtures()
+    assert fixtures.symbol == bench.DEMO_SYMBOL
+    assert "tổng hợp" in fixtures.fundamentals.full_name
+
+
+def test_compare_flags_regressions():
+    baseline = {'a[1]': {'min_ms': 10.0}, 'b[1]': {'min_ms': 10.0}, 'c[1]': {'min_ms': 10.0}}
+    results = {k: {'min_ms': v, 'median_ms': v} for k, v in {'a[1]': 10.5, 'b[1]': 14.0, 'c[1]': 5.0, 'd[1]': 1.0}.items()}
+    status = bench.compare(results, baseline, tolerance=0.25)['status'].to_dict()
+    assert status == {'a[1]': "ok", 'b[1]': "regression", 'c[1]': "faster", 'd[1]': "new"}
+
+
+def test_save_merges_baseline_and_appends_history(tmp_path):
+    bench.save({'a[1]': {'min_ms': 2.0, 'median_ms': 2.5}}, root=tmp_path)
+    bench.save({'b[1]': {'min_ms': 3.0, 'median_ms': 3.5}}, root=tmp_path)
+    assert set(bench.load_baseline(tmp_path)) == {'a[1]', 'b[1]'}
+    runs = (tmp_path / "history.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(r)['results'] for r in runs] == [{'a[1]': 2.0}, {'b[1]': 3.0}]
+    assert list(bench.trend(["a*"], root=tmp_path).columns) == ['a[1]']
+
+
+def test_select_accepts_globs_and_exact_ids():
+    assert [i for i, _, _ in bench.select(["indicators[2500]"])] == ["indicators[2500]"]
+    assert {c.name for _, c, _ in bench.select(["file_read_*"])} == {"file_read_range", "file_read_query"}
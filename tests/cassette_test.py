@@ -0,0 +1,110 @@
+from datetime import date
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from vn_stock_advisor.data import cassette as cassettes
+from vn_stock_advisor.data.cassette import Cassette, CassetteMiss, http_get, use_cassette
+from vn_stock_advisor.data.providers import DataProvider
+from vn_stock_advisor.data.scrape_cache import ScrapeCache
+from vn_stock_advisor.tools.scrape_tool import CachedScrapeTool
+
+BARS = pd.DataFrame({'time': pd.date_range("2025-01-01", periods=10), 'close': range(10), 'volume': 100})
+
+
+def bar_client(calls):
+    def client(symbol, source):
+        def history(start, end, interval):
+            calls.append((start, end))
+            return BARS
+        return SimpleNamespace(quote=SimpleNamespace(history=history))
+    return client
+
+
+def offline(symbol, source):
+    raise ConnectionError("no network")
+
+
+def test_records_once_and_replays_from_disk(tmp_path):
+    path, calls = tmp_path / "run.cassette", []
+    fetch = lambda: calls.append(1) or {'rows': [1, 2]}
+    with use_cassette(str(path)) as cassette:
+        assert cassette.call("vnstock", ["HPG", "ratio"], fetch) == {'rows': [1, 2]}
+        assert cassette.call("vnstock", ["HPG", "ratio"], fetch) == {'rows': [1, 2]}
+    assert len(calls) == 1
+
+    replay = Cassette(str(path), mode="replay")
+    assert replay.call("vnstock", ["HPG", "ratio"], fetch) == {'rows': [1, 2]}
+    with pytest.raises(CassetteMiss):
+        replay.call("vnstock", ["FPT", "ratio"], fetch)
+    assert len(calls) == 1 and len(replay) == 1
+
+
+def test_provider_replays_history_offline_and_clips_other_ranges(tmp_path):
+    path, calls = str(tmp_path / "run.cassette"), []
+    with use_cassette(path):
+        DataProvider(client_factory=bar_client(calls)).history("HPG", date(2025, 1, 1), date(2025, 1, 10))
+    with use_cassette(path, mode="replay"):
+        provider = DataProvider(client_factory=offline)
+        assert provider.history("HPG", date(2025, 1, 1), date(2025, 1, 10)).equals(BARS)
+        # A run on another day asks for another range: served from the latest recording of the same bars
+        clipped = provider.history("HPG", date(2025, 1, 3), date(2025, 1, 5))
+        assert list(clipped['close']) == [2, 3, 4]
+        with pytest.raises(CassetteMiss):
+            provider.history("HPG", date(2025, 1, 1), date(2025, 1, 10), interval="1H")
+    assert len(calls) == 1
+
+
+def test_replay_merges_full_and_tail_recordings(tmp_path):
+    days = pd.bdate_range("2024-01-01", "2024-12-31")
+    bars = pd.DataFrame({'time': days, 'close': range(len(days)), 'volume': 100})
+
+    def client(symbol, source):
+        def history(start, end, interval):
+            return bars[(bars['time'] >= start) & (bars['time'] <= end)].reset_index(drop=True)
+        return SimpleNamespace(quote=SimpleNamespace(history=history))
+
+    path = str(tmp_path / "run.cassette")
+    with use_cassette(path):
+        provider = DataProvider(client_factory=client)
+        provider.history("HPG", date(2024, 1, 1), date(2024, 12, 20))
+        # An incremental update afterwards records only the last few sessions
+        provider.history("HPG", date(2024, 12, 20), date(2024, 12, 24))
+    with use_cassette(path, mode="replay"):
+        replayed = DataProvider(client_factory=offline).history("HPG", date(2024, 4, 1), date(2024, 12, 24))
+    expected = bars[(bars['time'] >= "2024-04-01") & (bars['time'] <= "2024-12-24")]
+    assert list(replayed['close']) == list(expected['close'])
+
+def test_http_recordings_keep_no_headers_nor_errors(tmp_path, monkeypatch):
+    responses = iter([(429, b'{}'), (200, '{"web": {"results": [{"title": "Hòa Phát"}]}}'.encode("utf-8"))])
+
+    def get(url, params=None, headers=None, **kwargs):
+        status, content = next(responses)
+        return SimpleNamespace(status_code=status, content=content, url=url)
+
+    monkeypatch.setattr(cassettes.requests, "get", get)
+    path = tmp_path / "brave.cassette"
+    with use_cassette(str(path)):
+        params = {'q': "HPG", 'count': 10}
+        assert http_get("brave", "https://api.search.brave.com", params=params, headers={'X-Token': "secret"}).status_code == 429
+        assert http_get("brave", "https://api.search.brave.com", params=params, headers={'X-Token': "secret"}).status_code == 200
+    with use_cassette(str(path), mode="replay"):
+        response = http_get("brave", "https://api.search.brave.com", params={'q': "HPG", 'count': 10})
+        assert response.json()['web']['results'][0]['title'] == "Hòa Phát"
+    assert b"secret" not in path.read_bytes()
+
+
+def test_scrapes_replay_without_firecrawl(tmp_path):
+    def scraper(url):
+        return {'markdown': "# Hòa Phát lãi lớn\nLợi nhuận quý tăng mạnh."}
+
+    def down(url):
+        raise ConnectionError("no network")
+
+    path = str(tmp_path / "news.cassette")
+    with use_cassette(path):
+        live = CachedScrapeTool(scraper=scraper, cache=ScrapeCache(str(tmp_path / "a"))).fetch("https://cafef.vn/a.chn")
+    with use_cassette(path, mode="replay"):
+        tool = CachedScrapeTool(scraper=down, cache=ScrapeCache(str(tmp_path / "b")))
+        assert tool.fetch("https://cafef.vn/a.chn?utm_source=fb") == live
@@ -0,0 +1,127 @@
+from vn_stock_advisor.tools.custom_tool import FileReadTool
+from vn_stock_advisor.tools.line_index import get_line_index
+
+
+def write_sample(tmp_path, n_lines=1000):
+    path = tmp_path / "sample.txt"
+    path.write_text("".join(f"Dòng {i}: dữ liệu ngành\n" for i in range(1, n_lines + 1)), encoding="utf-8")
+    return path
+
+
+def test_read_line_range(tmp_path):
+    path = write_sample(tmp_path)
+    tool = FileReadTool(file_path=str(path))
+
+    assert tool._run(start_line=100, line_count=3) == (
+        "Dòng 100: dữ liệu ngành\nDòng 101: dữ liệu ngành\nDòng 102: dữ liệu ngành\n"
+    )
+    assert tool._run(start_line=999).splitlines() == ["Dòng 999: dữ liệu ngành", "Dòng 1000: dữ liệu ngành"]
+    assert tool._run(start_line="5}", line_count="1```") == "Dòng 5: dữ liệu ngành\n"
+    assert tool._run(start_line=1001).startswith("Error: Start line 1001 exceeds")
+
+
+def test_read_full_file_without_trailing_newline(tmp_path):
+    path = tmp_path / "short.txt"
+    path.write_text("a\nb\nc", encoding="utf-8")
+    tool = FileReadTool(file_path=str(path))
+
+    assert tool._run() == "a\nb\nc"
+    assert tool._run(start_line=3) == "c"
+    assert get_line_index(str(path)).line_count == 3
+
+
+def test_byte_budget(tmp_path):
+    path = write_sample(tmp_path)
+    tool = FileReadTool(file_path=str(path))
+    line_bytes = len("Dòng 1: dữ liệu ngành\n".encode("utf-8"))
+
+    content = tool._run(line_count=50, max_bytes=line_bytes * 3 + 5)
+    assert content.startswith("Dòng 1: dữ liệu ngành\nDòng 2: dữ liệu ngành\nDòng 3: dữ liệu ngành\n\n[Output truncated")
+    assert "start_line=4" in content
+
+    # A single line larger than the budget is cut without breaking UTF-8 characters
+    assert tool._run(max_bytes=8).startswith("Dòng 1")
+
+
+def test_index_rebuilt_when_file_changes(tmp_path):
+    path = write_sample(tmp_path, n_lines=10)
+    tool = FileReadTool(file_path=str(path))
+    index = get_line_index(str(path))
+    assert get_line_index(str(path)) is index
+
+    path.write_text("x\ny\n", encoding="utf-8")
+    assert tool._run(start_line=2) == "y\n"
+    assert get_line_index(str(path)).line_count == 2
+
+
+def test_search_accent_insensitive(tmp_path):
+    path = tmp_path / "industry.json"
+    path.write_text(
+        '{\n'
+        '    "Tài chính ngân hàng": { "PE": 7.93, "PB": 1.32 },\n'
+        '    "Bất động sản": { "PE": 19.94, "PB": 1.90 },\n'
+        '    "Xây dựng": { "PE": 17.91, "PB": 2.07 },\n'
+        '    "Vật liệu xây dựng": { "PE": 12.40, "PB": 1.10 }\n'
+        '}\n',
+        encoding="utf-8",
+    )
+    tool = FileReadTool(file_path=str(path))
+
+    result = tool._run(query="xay dung")
+    assert result.splitlines() == [
+        f"Found 2 matching line(s) for 'xay dung' in {path}:",
+        '4:     "Xây dựng": { "PE": 17.91, "PB": 2.07 },',
+        '5:     "Vật liệu xây dựng": { "PE": 12.40, "PB": 1.10 }',
+    ]
+
+    result = tool._run(query="BẤT ĐỘNG", context_lines=1)
+    assert result.splitlines()[1:] == [
+        '2-     "Tài chính ngân hàng": { "PE": 7.93, "PB": 1.32 },',
+        '3:     "Bất động sản": { "PE": 19.94, "PB": 1.90 },',
+        '4-     "Xây dựng": { "PE": 17.91, "PB": 2.07 },',
+    ]
+
+
+def test_search_regex_and_limits(tmp_path):
+    path = write_sample(tmp_path, n_lines=100)
+    tool = FileReadTool(file_path=str(path))
+
+    result = tool._run(query=r"^dong 1\d:", regex="true", max_matches=3)
+    assert result.splitlines()[1:4] == ["10: Dòng 10: dữ liệu ngành", "11: Dòng 11: dữ liệu ngành", "12: Dòng 12: dữ liệu ngành"]
+    assert "[More than 3 matches" in result
+    assert tool._run(query="(", regex=True).startswith("Error: Invalid regular expression")
+    assert tool._run(query="không có").startswith("No lines matching")
+
+    # Separate context windows are split by "--"
+    result = tool._run(query="dong 50:|dong 60:", regex=True, context_lines=1)
+    assert result.splitlines()[1:] == [
+        "49- Dòng 49: dữ liệu ngành", "50: Dòng 50: dữ liệu ngành", "51- Dòng 51: dữ liệu ngành",
+        "--",
+        "59- Dòng 59: dữ liệu ngành", "60: Dòng 60: dữ liệu ngành", "61- Dòng 61: dữ liệu ngành",
+    ]
+
+
+def test_search_byte_budget_and_continuation(tmp_path):
+    path = write_sample(tmp_path, n_lines=100)
+    tool = FileReadTool(file_path=str(path))
+
+    result = tool._run(query="dong", context_lines=2, max_bytes=400)
+    assert len(result.encode("utf-8")) <= 400
+    body, note = result.rsplit("\n", 1)
+    assert note.startswith("[Output truncated at 400 bytes") and "start_line=" in note
+    shown = body.splitlines()[1:]
+    next_line = int(note.split("start_line=")[1].split()[0])
+    assert shown[-1].startswith(f"{next_line - 1}:")
+
+    # Continuing from the note picks up at the first line not shown
+    result = tool._run(query="dong", start_line=next_line, max_bytes=400)
+    assert result.splitlines()[1].startswith(f"{next_line}:")
+
+    # A line longer than the budget is shown cut, within the budget, and the note says so
+    long_line = "Dòng dài: " + "dữ liệu " * 200
+    path.write_text(long_line + "\nDòng 2: dữ liệu ngành\n", encoding="utf-8")
+    result = FileReadTool(file_path=str(path))._run(query="dong", max_bytes=600)
+    assert len(result.encode("utf-8")) <= 600
+    header, head, note = result.splitlines()
+    assert head.startswith("1: Dòng dài") and long_line.startswith(head[3:])
+    assert "Line 1 alone is longer" in note and "start_line=2" in note
@@ -0,0 +1,51 @@
+import pandas as pd
+
+from vn_stock_advisor.data.financials import FinancialDataCache, published_before, report_period_ends
+from vn_stock_advisor.tools.custom_tool import _resolve_as_of
+
+# TCBS-style quarterly ratios, newest first
+RATIOS = pd.DataFrame({
+    'year': [2024, 2024, 2024, 2023],
+    'quarter': [4, 3, 2, 4],
+    'price_to_earning': [10.0, 11.0, 12.0, 13.0],
+})
+
+
+def test_report_period_ends():
+    ends = report_period_ends(RATIOS)
+    assert list(ends.dt.strftime('%Y-%m-%d')) == ['2024-12-31', '2024-09-30', '2024-06-30', '2023-12-31']
+    vci = pd.DataFrame({'yearReport': [2024], 'lengthReport': [2]})
+    assert report_period_ends(vci).iloc[0] == pd.Timestamp('2024-06-30')
+    assert report_period_ends(pd.DataFrame({'pe': [1.0]}, index=['latest'])) is None
+
+
+def test_published_before_hides_unpublished_reports():
+    # Q3 2024 ends on 2024-09-30 and is only assumed public 45 days later
+    assert list(published_before(RATIOS, '2024-11-13')['quarter']) == [2, 4]
+    assert list(published_before(RATIOS, '2024-11-14')['quarter']) == [3, 2, 4]
+    assert published_before(RATIOS, None) is RATIOS
+    assert published_before(RATIOS, '2023-01-01').empty
+    # Periods that can't be parsed are never assumed published
+    undated = RATIOS.drop(columns=['year', 'quarter'])
+    assert published_before(undated, '2030-01-01').empty and published_before(undated, None) is undated
+
+
+def test_cache_reuses_downloads(tmp_path):
+    cache = FinancialDataCache(str(tmp_path))
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return RATIOS
+
+    first = cache.get('hpg', 'ratio_quarter', fetch)
+    second = cache.get('HPG', 'ratio_quarter', fetch, as_of='2024-06-30')
+    assert len(calls) == 1
+    assert first.equals(second)
+
+
+def test_resolve_as_of():
+    assert _resolve_as_of(None) is None
+    assert _resolve_as_of('') is None
+    assert _resolve_as_of('2100-01-01') is None
+    assert _resolve_as_of('2024-06-28 15:00') == pd.Timestamp('2024-06-28')
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from vn_stock_advisor.data.fundamentals import RATIO_ALIASES, FundamentalData, income_panel
+from vn_stock_advisor.data.schema import SchemaResolver
+from vn_stock_advisor.tools.custom_tool import FundDataTool
+
+# Six quarters of TCBS-style income statements, newest first, with Q1 2024 missing
+INCOME = pd.DataFrame({
+    'year': [2024, 2024, 2024, 2023, 2023, 2023],
+    'quarter': [4, 3, 2, 4, 3, 2],
+    'revenue': [140.0, 130.0, 120.0, 100.0, 100.0, 100.0],
+    'gross_profit': [28.0, 26.0, 24.0, 20.0, 20.0, 20.0],
+    'post_tax_profit': [14.0, 13.0, -1.0, 10.0, 10.0, 8.0],
+})
+RATIOS = pd.DataFrame({'year': [2024], 'quarter': [4], 'pe': [9.5], 'roe': [0.18]})
+
+
+def test_income_panel_growth_ttm_and_margins():
+    panel = income_panel(INCOME)
+    assert np.allclose(panel['revenue_yoy'].iloc[:3], [0.4, 0.3, 0.2])
+    assert np.isclose(panel['revenue_qoq'].iloc[0], 140 / 130 - 1)
+    # Q2 2024 follows a missing quarter; profit growth from a loss is undefined
+    assert np.isnan(panel['revenue_qoq'].iloc[2])
+    assert np.isnan(panel['post_tax_profit_qoq'].iloc[1])
+    # Trailing sums need four consecutive quarters
+    assert panel['revenue_ttm'].isna().all()
+    assert np.allclose(panel['gross_margin'], 0.2)
+    assert np.isclose(panel['net_margin'].iloc[0], 0.1)
+
+
+def test_income_panel_ttm_over_consecutive_quarters():
+    consecutive = INCOME.assign(year=[2024, 2024, 2024, 2024, 2023, 2023], quarter=[4, 3, 2, 1, 4, 3])
+    ttm = income_panel(consecutive)['revenue_ttm']
+    assert ttm.iloc[0] == 140 + 130 + 120 + 100
+    assert ttm.iloc[2] == 120 + 100 + 100 + 100
+    assert ttm.iloc[3:].isna().all()
+
+
+def test_render_is_separate_from_fetch():
+    data = FundamentalData(symbol="HPG", full_name="Hoa Phat", industry="Thép",
+                           ratios=RATIOS, income=income_panel(INCOME), as_of=pd.Timestamp('2025-03-01'))
+    assert data.ratio('price_to_earning') == 9.5
+    assert data.ratio('price_to_book') is None
+    assert list(data.ratio_history('roe')) == [0.18]
+
+    text = FundDataTool().render(data)
+    assert "Ngày phân tích: 2025-03-01" in text
+    assert "Tỷ lệ P/E: 9.50" in text and "Tỷ lệ P/B: N/A" in text
+    assert "140 VND (so với cùng kỳ: +40.00%)" in text
+
+
+def test_schema_resolver_maps_tcbs_and_vci_columns_once():
+    resolver = SchemaResolver(RATIO_ALIASES)
+    vci = pd.DataFrame([[2024, 4, 9.5, 0.18, 'x']], columns=pd.MultiIndex.from_tuples([
+        ('Meta', 'yearReport'), ('Meta', 'lengthReport'), ('Chỉ tiêu định giá', 'P/E'),
+        ('Chỉ tiêu khả năng sinh lợi', 'ROE (%)'), ('Chỉ tiêu định giá', 'EV/EBITDA')]))
+    selected = resolver.select(vci, ['price_to_earning', 'roe', 'price_to_book', 'value_before_ebitda'])
+    assert list(selected.columns) == ['price_to_earning', 'roe', 'price_to_book', 'value_before_ebitda']
+    assert selected.iloc[0, :2].tolist() == [9.5, 0.18]
+    assert selected.iloc[0, 2:].isna().all()
+
+    # The preferred alias wins when a source has several
+    assert resolver.resolve(['pe', 'price_to_earning']) == {'price_to_earning': 1}
+    assert resolver.resolve(RATIOS.columns) is resolver.resolve(RATIOS.columns)
@@ -0,0 +1,79 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from vn_stock_advisor.data.calendar import TradingCalendar
+from vn_stock_advisor.data.history import HistoryLoader
+from vn_stock_advisor.data.price_store import PriceStore
+
+
+def test_calendar_skips_weekends_and_holidays():
+    calendar = TradingCalendar()
+    # Tết 2025: market closed from 27/01 to 31/01
+    assert not calendar.is_trading_day("2025-01-29")
+    assert calendar.previous_trading_day("2025-02-01") == date(2025, 1, 24)
+    assert calendar.next_trading_day("2025-01-25") == date(2025, 2, 3)
+    assert calendar.sessions_between("2025-01-20", "2025-02-07") == 10
+    assert calendar.sessions_back("2025-02-07", 10) == date(2025, 1, 20)
+    assert len(calendar.trading_days("2025-01-01", "2025-12-31")) == calendar.sessions_between("2025-01-01", "2025-12-31")
+
+
+class FakeFetcher:
+    """Serve bars for every HOSE session and record the requested ranges."""
+
+    def __init__(self, calendar):
+        self.calendar = calendar
+        self.calls = []
+        # Price adjustment applied to every bar before `adjusted_before` (a dividend)
+        self.adjusted_before, self.factor = None, 1.0
+
+    def __call__(self, symbol, start, end, interval="1D", source="TCBS"):
+        self.calls.append((start, end))
+        days = self.calendar.trading_days(start, end)
+        close = np.array([20000.0 + day.toordinal() % 1000 for day in days])
+        if self.adjusted_before is not None:
+            close[pd.DatetimeIndex(days) < pd.Timestamp(self.adjusted_before)] *= self.factor
+        return pd.DataFrame({'time': days, 'open': close, 'high': close, 'low': close, 'close': close, 'volume': 1000})
+
+
+def test_loads_exact_sessions_and_only_fetches_missing_ranges(tmp_path):
+    calendar = TradingCalendar()
+    fetcher = FakeFetcher(calendar)
+    loader = HistoryLoader(store=PriceStore(str(tmp_path)), calendar=calendar, fetcher=fetcher)
+
+    bars = loader.load("hpg", bars=200, end="2025-06-30")
+    assert len(bars) == 200
+    assert bars['time'].iloc[-1] == pd.Timestamp("2025-06-30")
+    assert bars['time'].iloc[0].date() == calendar.sessions_back("2025-06-30", 200)
+    assert len(fetcher.calls) == 1
+
+    # Served from the store without any request
+    assert len(loader.load("HPG", bars=200, end="2025-06-30")) == 200
+    assert len(fetcher.calls) == 1
+
+    # A week later only the new sessions are fetched
+    bars = loader.load("HPG", bars=200, end="2025-07-07")
+    assert bars['time'].iloc[-1] == pd.Timestamp("2025-07-07")
+    # (plus the last stored sessions, to catch price adjustments)
+    assert fetcher.calls[-1] == (calendar.sessions_back("2025-06-30", 5), date(2025, 7, 7))
+    assert len(fetcher.calls) == 2
+
+    # A longer window only fetches the older head
+    assert len(loader.load("HPG", bars=300, end="2025-07-07")) == 300
+    assert fetcher.calls[-1][1] < bars['time'].iloc[0].date()
+
+
+def test_adjusted_prices_refetch_the_stored_history(tmp_path):
+    calendar = TradingCalendar()
+    fetcher = FakeFetcher(calendar)
+    store = PriceStore(str(tmp_path))
+    loader = HistoryLoader(store=store, calendar=calendar, fetcher=fetcher)
+    loader.load("HPG", bars=100, end="2025-06-30")
+
+    # Ex-dividend on 2025-07-03: the source now serves adjusted prices for earlier sessions
+    fetcher.adjusted_before, fetcher.factor = date(2025, 7, 3), 0.95
+    bars = loader.load("HPG", bars=100, end="2025-07-07")
+    expected = fetcher(None, bars['time'].iloc[0].date(), date(2025, 7, 7))
+    assert np.allclose(bars['close'], expected['close'])
+    assert fetcher.calls[-2][0] == store.coverage("HPG")[0].date()
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+from vn_stock_advisor.indicators.incremental import (
+    INDICATOR_COLUMNS,
+    IncrementalIndicatorEngine,
+    compare_with_full_recomputation,
+)
+from vn_stock_advisor.indicators.technical import calculate_indicators
+
+
+def make_bars(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 25000 + np.cumsum(rng.normal(0, 200, n)).round(-1)
+    return pd.DataFrame({
+        'time': pd.bdate_range('2023-01-02', periods=n),
+        'open': close,
+        'high': close + 100,
+        'low': close - 100,
+        'close': close,
+        'volume': rng.integers(100_000, 5_000_000, n),
+    })
+
+
+def test_matches_full_recomputation():
+    bars = make_bars()
+    assert compare_with_full_recomputation(bars, chunk_size=1) == {}
+    assert compare_with_full_recomputation(bars, chunk_size=64) == {}
+
+
+def test_only_new_bars_processed_and_state_persisted(tmp_path):
+    bars = make_bars()
+    engine = IncrementalIndicatorEngine(state_dir=str(tmp_path))
+    assert len(engine.update("hpg", bars.iloc[:300])) == 300
+
+    # A new process picks up the persisted state and only advances the 20 new bars
+    resumed = IncrementalIndicatorEngine(state_dir=str(tmp_path))
+    rows = resumed.update("HPG", bars.iloc[150:320])
+    assert len(rows) == 20
+
+    expected = calculate_indicators(bars.iloc[:320]).iloc[-1]
+    assert np.allclose(rows[INDICATOR_COLUMNS].iloc[-1].astype(float), expected[INDICATOR_COLUMNS].astype(float))
+    assert resumed.update("HPG", bars.iloc[150:320]).empty
+
+
+def test_latest_in_new_process_without_new_bars(tmp_path):
+    bars = make_bars(300)
+    first = IncrementalIndicatorEngine(state_dir=str(tmp_path)).latest("HPG", bars)
+
+    # A rerun on the same bars (weekend, holiday) adds nothing but still answers from the saved state
+    second = IncrementalIndicatorEngine(state_dir=str(tmp_path)).latest("HPG", bars)
+    assert np.allclose(second[INDICATOR_COLUMNS].astype(float), first[INDICATOR_COLUMNS].astype(float), equal_nan=True)
+
+
+def test_revised_last_bar_replaces_previous_value(tmp_path):
+    bars = make_bars()
+    engine = IncrementalIndicatorEngine(state_dir=str(tmp_path))
+    engine.update("VNM", bars.iloc[:250])
+
+    revised = bars.iloc[:250].copy()
+    revised.loc[249, 'close'] += 1500
+    revised.loc[249, 'volume'] += 1_000_000
+    latest = engine.latest("VNM", revised)
+
+    expected = calculate_indicators(revised).iloc[-1]
+    assert np.allclose(latest[INDICATOR_COLUMNS].astype(float), expected[INDICATOR_COLUMNS].astype(float))
+
+
+def test_adjusted_history_rebuilds_state(tmp_path):
+    bars = make_bars()
+    engine = IncrementalIndicatorEngine(state_dir=str(tmp_path))
+    engine.update("HPG", bars.iloc[:250])
+
+    # A dividend adjusts every close before the ex-date, the last processed bar included
+    adjusted = bars.iloc[:260].copy()
+    adjusted.loc[:254, 'close'] *= 0.95
+    rows = engine.update("HPG", adjusted)
+    assert len(rows) == 260
+    expected = calculate_indicators(adjusted).iloc[-1]
+    assert np.allclose(rows[INDICATOR_COLUMNS].iloc[-1].astype(float), expected[INDICATOR_COLUMNS].astype(float))
+
+
+def test_gap_rebuilds_from_window(tmp_path):
+    bars = make_bars()
+    engine = IncrementalIndicatorEngine(state_dir=str(tmp_path))
+    engine.update("FPT", bars.iloc[:100])
+
+    rows = engine.update("FPT", bars.iloc[200:])
+    assert len(rows) == 200
+    expected = calculate_indicators(bars.iloc[200:].reset_index(drop=True)).iloc[-1]
+    assert np.allclose(rows[INDICATOR_COLUMNS].iloc[-1].astype(float), expected[INDICATOR_COLUMNS].astype(float), equal_nan=True)
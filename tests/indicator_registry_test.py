@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from vn_stock_advisor.indicators.registry import DEFAULT_INDICATORS, IndicatorContext, registry, rolling
+from vn_stock_advisor.indicators.technical import LOOKBACK_BARS, calculate_indicators
+
+
+def make_bars(n=300, seed=1):
+    rng = np.random.default_rng(seed)
+    close = 25000 + np.cumsum(rng.normal(0, 200, n)).round(-1)
+    return pd.DataFrame({
+        'time': pd.bdate_range('2024-01-01', periods=n),
+        'open': close,
+        'high': close + 150,
+        'low': close - 150,
+        'close': close,
+        'volume': rng.integers(100_000, 5_000_000, n),
+    })
+
+
+def test_default_indicators_match_reference_formulas():
+    bars = make_bars()
+    data = calculate_indicators(bars)
+
+    assert list(data.columns) == list(bars.columns) + DEFAULT_INDICATORS
+    assert np.allclose(data['SMA_50'].iloc[-1], bars['close'].iloc[-50:].mean())
+    assert np.isnan(data['SMA_200'].iloc[198]) and not np.isnan(data['SMA_200'].iloc[199])
+    assert (data['BB_Middle'] == data['SMA_20']).iloc[19:].all()
+
+    # OBV reference: running total of signed volume
+    obv = [bars['volume'].iloc[0]]
+    for i in range(1, len(bars)):
+        change = np.sign(bars['close'].iloc[i] - bars['close'].iloc[i - 1])
+        obv.append(obv[-1] + change * bars['volume'].iloc[i])
+    assert np.allclose(data['OBV'], obv)
+
+
+def test_computes_only_requested_indicators_in_dependency_order():
+    bars = make_bars()
+    result = registry.compute(bars, ['MACD_Hist'])
+    assert list(result.columns) == ['MACD_Hist']
+
+    names = [indicator.name for indicator in registry.resolve(['MACD_Hist'])]
+    assert names == ['EMA_12', 'EMA_26', 'MACD', 'MACD_Signal', 'MACD_Hist']
+    assert registry.required_inputs(['BB_Upper', 'ATR_14']) == ['high', 'low', 'close']
+
+    with pytest.raises(KeyError):
+        registry.resolve(['NOT_AN_INDICATOR'])
+
+
+def test_shared_intermediates_computed_once():
+    ctx = IndicatorContext(make_bars())
+    assert ctx.rolling_mean('close', 20) is ctx.rolling_mean('close', 20)
+    for indicator in registry.resolve(['SMA_20', 'BB_Middle', 'BB_Upper', 'BB_Lower']):
+        ctx.results[indicator.name] = indicator.compute(ctx, indicator.params)
+    assert ctx.results['SMA_20'] is ctx.results['BB_Middle']
+
+
+def test_lookback_follows_requested_indicators():
+    assert LOOKBACK_BARS == 200
+    assert registry.lookback(['RSI_14', 'Volume_Ratio_20']) == 20
+    assert registry.lookback(['ADX_14', 'Stoch_D_3']) == 28
+
+
+def test_panel_rolling_matches_pandas_on_flat_runs():
+    # Limit-locked and illiquid sessions repeat the close and can trade no volume
+    bars = make_bars(n=260, seed=4)
+    close = bars['close'].to_numpy()
+    close[100:140] = close[100]
+    volume = bars['volume'].to_numpy().astype(float)
+    volume[180:230] = 0
+    panel = pd.DataFrame({'AAA': close, 'BBB': volume, 'CCC': make_bars(n=260, seed=5)['close']})
+
+    for window in (14, 20, 50):
+        for how in ('mean', 'std', 'sum', 'min', 'max'):
+            # pandas' running variance loses digits right after a flat stretch; per-window std doesn't
+            expected = panel.rolling(window).agg(how)
+            assert np.allclose(rolling(panel, window, how), expected, equal_nan=True, rtol=1e-8, atol=0)
+        assert rolling(panel, window, 'mean')['BBB'].iloc[229] == 0
+    for window in (14, 20):
+        assert rolling(panel, window, 'mean')['AAA'].iloc[139] == close[100]
+        assert rolling(panel, window, 'std')['AAA'].iloc[139] == 0
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+from vn_stock_advisor.data.calendar import TradingCalendar
+from vn_stock_advisor.data.history import HistoryLoader
+from vn_stock_advisor.data.intraday import BarAggregator, aggregate_bars, bars_per_session
+from vn_stock_advisor.data.price_store import PriceStore
+from vn_stock_advisor.indicators.incremental import INDICATOR_COLUMNS
+from vn_stock_advisor.indicators.streaming import StreamingIndicators
+from vn_stock_advisor.indicators.technical import calculate_indicators
+
+
+def session_minutes(day):
+    day = pd.Timestamp(day)
+    morning = pd.date_range(day + pd.Timedelta("9h"), day + pd.Timedelta("11h29min"), freq="1min")
+    # Continuous trading ends 14:30; the closing auction (ATC) bar is stamped 14:45
+    afternoon = pd.date_range(day + pd.Timedelta("13h"), day + pd.Timedelta("14h29min"), freq="1min")
+    return morning.append(afternoon).append(pd.DatetimeIndex([day + pd.Timedelta("14h45min")]))
+
+
+def minute_bars(days, seed=0):
+    times = pd.DatetimeIndex(np.concatenate([session_minutes(d) for d in days]))
+    rng = np.random.default_rng(seed)
+    close = 25000 + np.cumsum(rng.normal(0, 20, len(times))).round(-1)
+    return pd.DataFrame({'time': times, 'open': close, 'high': close + 10, 'low': close - 10,
+                         'close': close, 'volume': rng.integers(100, 10_000, len(times)).astype(float)})
+
+
+def test_bars_per_session():
+    assert [bars_per_session(i) for i in ['1m', '5m', '15m', '30m', '1H']] == [255, 51, 17, 9, 5]
+    hourly = aggregate_bars(minute_bars(['2025-06-02']), '1H')
+    assert list(hourly['time'].dt.hour) == [9, 10, 11, 13, 14]
+    assert hourly['volume'].sum() == minute_bars(['2025-06-02'])['volume'].sum()
+
+
+def test_streaming_aggregation_matches_batch():
+    bars = minute_bars(['2025-06-02', '2025-06-03'])
+    aggregator = BarAggregator('15m')
+    streamed = [bar for row in bars.itertuples() for bar in
+                aggregator.push(row.time, row.open, row.high, row.low, row.close, row.volume)]
+    assert aggregator.flush() is None
+    # The 11:15 bar and the closing auction's bar close with their session, without waiting for the next bar
+    assert pd.DataFrame(streamed).equals(aggregate_bars(bars, '15m'))
+    assert streamed[-1]['time'] == pd.Timestamp('2025-06-03 14:45')
+    hourly = BarAggregator('1H')
+    closed = [bar for row in bars.itertuples() for bar in
+              hourly.push(row.time, row.open, row.high, row.low, row.close, row.volume)]
+    assert hourly.flush() is None and closed[-1]['time'] == pd.Timestamp('2025-06-03 14:00')
+
+
+def test_streaming_indicators_match_full_recomputation_with_bounded_memory():
+    bars = minute_bars(pd.bdate_range('2025-06-02', periods=30))
+    stream = StreamingIndicators('HPG', intervals=('5m', '1H'))
+    stream.warm_up(bars.iloc[:2000])
+    for row in bars.iloc[2000:].itertuples():
+        stream.on_bar(row.time, row.open, row.high, row.low, row.close, row.volume)
+
+    for interval in ('5m', '1H'):
+        expected = calculate_indicators(aggregate_bars(bars, interval)).iloc[-1]
+        latest = pd.Series(stream.latest(interval))
+        assert latest['time'] == expected['time']
+        assert np.allclose(latest[INDICATOR_COLUMNS].astype(float), expected[INDICATOR_COLUMNS].astype(float), equal_nan=True)
+        assert len(stream.states[interval].closes.values) <= 200
+
+
+class FakeMinuteFetcher:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, symbol, start, end, interval="1D", source=None):
+        self.calls.append((start, end, interval))
+        return minute_bars(pd.bdate_range(start, end))
+
+
+def test_load_intraday_fetches_only_base_interval(tmp_path):
+    fetcher = FakeMinuteFetcher()
+    loader = HistoryLoader(store=PriceStore(str(tmp_path)), calendar=TradingCalendar(holidays=[]), fetcher=fetcher)
+    hourly = loader.load_intraday('hpg', '1H', bars=20, end='2025-06-30')
+    assert len(hourly) == 20 and hourly['time'].iloc[-1] == pd.Timestamp('2025-06-30 14:00')
+
+    fifteen = loader.load_intraday('HPG', '15m', bars=34, end='2025-06-30')
+    assert len(fifteen) == 34
+    assert [call[2] for call in fetcher.calls] == ['1m']
@@ -0,0 +1,95 @@
+import sqlite3
+
+from vn_stock_advisor.data.news_corpus import NewsCorpus, article_metadata, match_query
+from vn_stock_advisor.data.scrape_cache import ScrapeCache
+from vn_stock_advisor.tools.news_search_tool import NewsSearchTool
+from vn_stock_advisor.tools.scrape_tool import CachedScrapeTool
+
+RATE_ARTICLE = """# Ngân hàng Nhà nước giữ nguyên lãi suất điều hành
+Thứ tư, 15/10/2025 08:30
+Ngân hàng Nhà nước quyết định giữ nguyên lãi suất điều hành trong quý IV để hỗ trợ tăng trưởng tín dụng.
+Giới phân tích cho rằng mặt bằng lãi suất thấp giúp thị trường chứng khoán thu hút dòng tiền.
+"""
+FX_ARTICLE = """# Tỷ giá USD/VND tăng mạnh trong tháng 9
+Ngày 02/09/2025
+Tỷ giá trung tâm tăng lên mức cao kỷ lục do đồng USD mạnh lên trên thị trường quốc tế.
+Áp lực tỷ giá khiến khối ngoại bán ròng trên thị trường chứng khoán.
+"""
+
+
+def test_article_metadata():
+    meta = article_metadata(RATE_ARTICLE)
+    assert meta == {'title': "Ngân hàng Nhà nước giữ nguyên lãi suất điều hành", 'published': "2025-10-15"}
+
+    # Page headers show the day the page was scraped; the article's date is next to its headline
+    cafef = "Thứ Hai, 20/10/2025\nTrang chủ > Tài chính\n## Lãi suất liên ngân hàng giảm\n\n14-10-2025 - 09:15 AM\nNội dung."
+    assert article_metadata(cafef)['published'] == "2025-10-14"
+    # Dates far below the headline are events the article talks about
+    quoted = "# Giá thép tăng\nTheo biên tập viên\n\n\n\n\n\n\nGiá thép tăng từ 01/09/2025."
+    assert article_metadata(quoted)['published'] is None
+    assert article_metadata("# Giá thép tăng\nNội dung không có ngày.")['published'] is None
+
+def test_match_query_folds_diacritics():
+    assert match_query("Lãi suất") == '"lai suat" OR "lai" OR "suat"'
+    assert match_query("  ") is None
+
+
+def test_search_is_diacritic_insensitive_and_dated(tmp_path):
+    corpus = NewsCorpus(str(tmp_path / "news.sqlite"))
+    assert corpus.add_page("https://cafef.vn/lai-suat.chn", RATE_ARTICLE)
+    assert corpus.add_page("https://vneconomy.vn/ty-gia.htm?utm_source=fb", FX_ARTICLE)
+    # Same article again (tracking parameter variant): nothing changes
+    assert not corpus.add_page("https://www.cafef.vn/lai-suat.chn?utm_medium=x", RATE_ARTICLE)
+    assert len(corpus) == 2
+
+    assert [a['source'] for a in corpus.search("lai suat dieu hanh")] == ["cafef.vn"]
+    assert [a['source'] for a in corpus.search("TỶ GIÁ")] == ["vneconomy.vn"]
+    # Both mention the stock market; the date window excludes the later one
+    assert len(corpus.search("thị trường chứng khoán")) == 2
+    assert [a['published'] for a in corpus.search("chứng khoán", until="2025-10-01")] == ["2025-09-02"]
+    assert corpus.prune("2025-10-01") == 1 and len(corpus) == 1
+
+
+def test_tool_hides_articles_after_the_analysis_date(tmp_path):
+    corpus = NewsCorpus(str(tmp_path / "news.sqlite"))
+    corpus.add_page("https://cafef.vn/lai-suat.chn", RATE_ARTICLE)
+    tool = NewsSearchTool(corpus=corpus, as_of_date="2025-10-20")
+    output = tool._run("lãi suất")
+    assert "Ngày đăng: 2025-10-15 | Nguồn: cafef.vn" in output
+    assert "lãi suất điều hành" in output
+    tool.as_of_date = "2025-10-14"
+    assert "Không có bài viết nào" in tool._run("lãi suất")
+
+
+def test_scraped_articles_accumulate_in_the_corpus(tmp_path):
+    corpus = NewsCorpus(str(tmp_path / "news.sqlite"))
+    tool = CachedScrapeTool(scraper=lambda url: FX_ARTICLE, cache=ScrapeCache(str(tmp_path / "scrapes")), corpus=corpus)
+    tool._run("https://vneconomy.vn/ty-gia.htm")
+    assert [a['title'] for a in corpus.search("ty gia")] == ["Tỷ giá USD/VND tăng mạnh trong tháng 9"]
+
+
+def test_undated_articles_are_kept_out_of_past_analyses(tmp_path):
+    corpus = NewsCorpus(str(tmp_path / "news.sqlite"))
+    assert corpus.add_page("https://cafef.vn/thep.chn", "# Giá thép tăng mạnh\nGiá thép xây dựng tăng lần thứ ba.")
+    assert [a['published'] for a in corpus.search("giá thép")] == [None]
+    assert corpus.search("giá thép", until="2025-10-01") == []
+    assert len(corpus.search("giá thép", until="2025-10-01", undated=True)) == 1
+
+    tool = NewsSearchTool(corpus=corpus)
+    assert "Ngày đăng: không rõ" in tool._run("giá thép")
+    tool.as_of_date = "2025-10-20"
+    assert "Không có bài viết nào" in tool._run("giá thép")
+
+
+def test_corpus_created_with_required_dates_accepts_undated_articles(tmp_path):
+    path = tmp_path / "news.sqlite"
+    with sqlite3.connect(str(path)) as db:
+        db.execute("CREATE TABLE articles (id INTEGER PRIMARY KEY, url TEXT UNIQUE NOT NULL, title TEXT NOT NULL,"
+                   " published TEXT NOT NULL, source TEXT NOT NULL, body TEXT NOT NULL, content_hash TEXT NOT NULL,"
+                   " added_at TEXT NOT NULL)")
+        db.execute("INSERT INTO articles VALUES (1, 'https://cafef.vn/a', 'Tin cũ', '2025-09-02', 'cafef.vn', 'Tỷ giá',"
+                   " 'x', '2025-09-02')")
+    db.close()
+    corpus = NewsCorpus(str(path))
+    assert corpus.add("https://cafef.vn/b", "Tin mới", "Giá thép", published=None)
+    assert len(corpus) == 2 and corpus.recent(days=60, until="2025-10-01")[0]['title'] == "Tin cũ"
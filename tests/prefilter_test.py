@@ -0,0 +1,106 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from vn_stock_advisor.data.decision_ledger import DecisionLedger
+from vn_stock_advisor.prefilter import PreFilter, run_batch
+from vn_stock_advisor.utils.text import fold_diacritics
+
+SESSIONS = pd.bdate_range('2024-01-01', periods=260)
+
+
+class FakeLoader:
+    """Serve a steady uptrend for UP* symbols and a downtrend for the rest."""
+
+    def load(self, symbol, bars, end=None, interval="1D"):
+        trend = 1 if symbol.startswith("UP") else -1
+        close = 25000 + trend * np.arange(bars) * 50.0
+        return pd.DataFrame({'time': SESSIONS[-bars:], 'open': close, 'high': close, 'low': close,
+                             'close': close, 'volume': 1000.0})
+
+
+FUNDAMENTALS = {
+    'UPGOOD': {'full_name': "Công ty Tốt", 'industry': "Vật liệu xây dựng", 'pe': 8.0, 'pb': 1.0,
+               'roe': 0.2, 'debt_on_equity': 0.5, 'profit_growth_yoy': 0.3},
+    'DOWNBAD': {'full_name': "Công ty Kém", 'industry': "Vật liệu xây dựng", 'pe': -3.0, 'pb': 5.0,
+                'roe': 0.01, 'debt_on_equity': 3.0, 'profit_growth_yoy': -0.5},
+}
+AVERAGES = {fold_diacritics("Vật liệu xây dựng"): {'PE': 12.0, 'PB': 1.5}}
+
+
+class FakeCrew:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def kickoff(self, inputs):
+        self.calls.append(inputs)
+        return type("Output", (), {'json_dict': {'stock_ticker': inputs['symbol'], 'decision': "MUA"}})()
+
+
+def make_prefilter(threshold=3):
+    return PreFilter(threshold=threshold, history_loader=FakeLoader(),
+                     fundamentals_fetcher=lambda symbol, as_of: FUNDAMENTALS[symbol], industry_averages=AVERAGES)
+
+
+def test_scores_technical_and_fundamental_rules():
+    prefilter = make_prefilter()
+
+    good = prefilter.evaluate("upgood", "2024-12-31")
+    assert good.signals['long_trend'] == 'UP' and good.signals['short_trend'] == 'UP'
+    assert good.fund_score == 4  # P/E, P/B, ROE, growth; low D/E is not rewarded
+    assert good.score == good.tech_score + good.fund_score and good.escalate
+
+    bad = prefilter.evaluate("DOWNBAD", "2024-12-31")
+    assert bad.fund_score == -5
+    assert not bad.escalate and bad.decision == "BÁN"
+    assert "Xu hướng dài hạn: GIẢM" in bad.to_decision()['tech_reasoning']
+
+
+def test_run_batch_only_sends_escalated_tickers_to_the_crew(tmp_path):
+    calls = []
+    output = tmp_path / "decisions.json"
+    ledger = DecisionLedger(str(tmp_path / "ledger"))
+    decisions = run_batch(["UPGOOD", "DOWNBAD"], current_date="2024-12-31", output_file=str(output),
+                          prefilter=make_prefilter(), crew_factory=lambda: FakeCrew(calls), ledger=ledger)
+
+    assert calls == [{'symbol': "UPGOOD", 'current_date': "2024-12-31"}]
+    assert [d['source'] for d in decisions] == ["crew", "rules"]
+    assert decisions[1]['stock_ticker'] == "DOWNBAD" and decisions[1]['decision'] == "BÁN"
+    assert json.loads(output.read_text(encoding="utf-8")) == decisions
+    recorded = ledger.read()
+    assert list(recorded[['symbol', 'action', 'source']].itertuples(index=False, name=None)) == [("DOWNBAD", "SELL", "rules")]
+
+
+def test_run_batch_records_failures_and_goes_on(tmp_path):
+    class FailingCrew:
+        def kickoff(self, inputs):
+            raise TimeoutError("LLM không phản hồi")
+
+    output = tmp_path / "decisions.json"
+    ledger = DecisionLedger(str(tmp_path / "ledger"))
+    decisions = run_batch(["UPGOOD", "DOWNBAD"], current_date="2024-12-31", output_file=str(output),
+                          prefilter=make_prefilter(), crew_factory=FailingCrew, ledger=ledger)
+
+    assert [d['source'] for d in decisions] == ["error", "rules"]
+    assert decisions[0]['stock_ticker'] == "UPGOOD" and "LLM không phản hồi" in decisions[0]['error']
+    assert json.loads(output.read_text(encoding="utf-8")) == decisions
+    assert list(ledger.read()['symbol']) == ["DOWNBAD"]
+
+
+def test_data_outage_is_recorded_without_running_the_crew(tmp_path):
+    def outage(symbol, as_of):
+        raise ConnectionError("vnstock không phản hồi")
+
+    calls = []
+    prefilter = PreFilter(history_loader=FakeLoader(), fundamentals_fetcher=outage, industry_averages={})
+    decisions = run_batch(["UPGOOD", "UPX"], current_date="2024-12-31", output_file=None, prefilter=prefilter,
+                          crew_factory=lambda: FakeCrew(calls), ledger=DecisionLedger(str(tmp_path)))
+    assert calls == []
+    assert [d['source'] for d in decisions] == ["error", "error"]
+    assert "ConnectionError" in decisions[0]['error'] and decisions[0]['prefilter']['escalate'] is False
+
+    # Opting in still sends unscorable tickers to the crew
+    prefilter.escalate_on_error = True
+    result = prefilter.evaluate("UPX")
+    assert result.escalate and "vnstock không phản hồi" in result.error
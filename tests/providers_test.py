@@ -0,0 +1,91 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from vn_stock_advisor.data.providers import DataProvider
+
+TCBS_INCOME = pd.DataFrame({'year': [2024], 'quarter': [4], 'revenue': [100.0], 'post_tax_profit': [10.0]})
+VCI_INCOME = pd.DataFrame({'ticker': ['HPG'], 'yearReport': [2024], 'lengthReport': [4],
+                           'Revenue (Bn. VND)': [100.0], 'Attribute to parent company (Bn. VND)': [10.0]})
+
+
+class FakeSources:
+    """vnstock stand-in whose sources can be slow, failing or empty."""
+
+    def __init__(self, delays=None, failing=(), empty=()):
+        self.delays, self.failing, self.empty = delays or {}, set(failing), set(empty)
+        self.calls = []
+
+    def __call__(self, symbol, source):
+        def income_statement(period):
+            self.calls.append(source)
+            time.sleep(self.delays.get(source, 0))
+            if source in self.failing:
+                raise ConnectionError("down")
+            if source in self.empty:
+                return pd.DataFrame()
+            return TCBS_INCOME if source == "TCBS" else VCI_INCOME
+        return SimpleNamespace(finance=SimpleNamespace(income_statement=income_statement))
+
+
+def test_fails_over_and_normalizes_columns():
+    sources = FakeSources(failing={"TCBS"})
+    provider = DataProvider(client_factory=sources, max_failures=2)
+    income = provider.income_statement("hpg")
+    assert sources.calls == ["TCBS", "VCI"]
+    assert income[['year', 'quarter', 'revenue', 'post_tax_profit']].equals(TCBS_INCOME)
+
+    # One failure already sends the next requests to VCI first
+    assert provider.route() == ["VCI", "TCBS"]
+    provider.income_statement("HPG")
+    assert sources.calls[-1] == "VCI"
+
+    # Two failures in a row: TCBS is skipped until its cooldown ends
+    with pytest.raises(RuntimeError):
+        provider.income_statement("HPG", sources=["TCBS"])
+    stats = provider.stats()
+    assert not stats.loc["TCBS", "healthy"] and stats.loc["TCBS", "failures"] == 2
+
+
+def test_routes_to_fastest_source():
+    sources = FakeSources(delays={"TCBS": 0.05})
+    provider = DataProvider(client_factory=sources)
+    provider.income_statement("HPG", sources=["TCBS"])
+    provider.income_statement("HPG", sources=["VCI"])
+    assert provider.route() == ["VCI", "TCBS"]
+
+
+def test_routes_around_fast_source_that_often_fails():
+    provider = DataProvider(client_factory=FakeSources(), max_failures=3)
+    # TCBS answers fast but every other request times out; VCI is slower and steady
+    for ok in [True, False] * 4:
+        provider._record("TCBS", 0.2 if ok else 30.0, ok=ok)
+    for _ in range(8):
+        provider._record("VCI", 1.5, ok=True)
+    assert provider.stats().loc["TCBS", "healthy"]
+    assert provider.route() == ["VCI", "TCBS"]
+
+
+def test_timeout_and_empty_results_move_to_next_source():
+    provider = DataProvider(client_factory=FakeSources(delays={"TCBS": 0.5}), timeout=0.05)
+    assert provider.income_statement("HPG")['revenue'].iloc[0] == 100.0
+    assert provider.stats().loc["TCBS", "failures"] == 1
+
+    sources = FakeSources(empty={"TCBS"})
+    provider = DataProvider(client_factory=sources)
+    assert not provider.income_statement("HPG").empty and sources.calls == ["TCBS", "VCI"]
+
+    with pytest.raises(RuntimeError, match="TCBS: down"):
+        DataProvider(client_factory=FakeSources(failing={"TCBS", "VCI"})).income_statement("HPG")
+
+
+def test_concurrent_identical_requests_are_coalesced():
+    sources = FakeSources(delays={"TCBS": 0.1})
+    provider = DataProvider(client_factory=sources)
+    with ThreadPoolExecutor(6) as pool:
+        results = list(pool.map(lambda _: provider.income_statement("HPG"), range(6)))
+    assert sources.calls == ["TCBS"]
+    assert all(r.equals(results[0]) for r in results)
@@ -0,0 +1,52 @@
+from vn_stock_advisor.utils.reducer import (ArticleReducer, benchmark, estimate_tokens, split_sentences,
+                                            strip_boilerplate, terms)
+
+ARTICLE = """[Trang chủ](https://cafef.vn) | [Chứng khoán](https://cafef.vn/ck) | [Vĩ mô](https://cafef.vn/vm)
+# Ngân hàng Nhà nước giữ nguyên lãi suất điều hành
+15/10/2025 08:30
+![Ảnh minh họa](https://cafef.vn/anh.jpg)
+Chia sẻ Facebook
+Ngân hàng Nhà nước quyết định giữ nguyên lãi suất điều hành trong quý IV. Quyết định nhằm hỗ trợ tăng trưởng tín dụng.
+Thời tiết tại TP. HCM hôm nay có mưa rào vào buổi chiều. Nhiều người dân đi làm muộn hơn thường lệ.
+Theo giới phân tích, lãi suất thấp giúp thị trường chứng khoán thu hút dòng tiền. VN-Index tăng 1,5% lên 1.680 điểm.
+Giá vàng trong nước đi ngang so với phiên trước.
+## Tin liên quan
+- [Lãi suất huy động giảm](https://cafef.vn/tin-1.chn)
+- [Tỷ giá ổn định](https://cafef.vn/tin-2.chn)
+"""
+
+
+def test_boilerplate_is_removed():
+    text = "\n".join(strip_boilerplate(ARTICLE))
+    assert "Trang chủ" not in text and "Chia sẻ" not in text and "Ảnh minh họa" not in text
+    assert "Tỷ giá ổn định" not in text and "https://" not in text
+    assert text.startswith("Ngân hàng Nhà nước giữ nguyên lãi suất điều hành\n15/10/2025 08:30")
+
+
+def test_sentences_keep_numbers_and_abbreviations():
+    assert split_sentences("Tại TP. HCM, VN-Index tăng 1,5% lên 1.680 điểm. Thanh khoản cải thiện!") == [
+        "Tại TP. HCM, VN-Index tăng 1,5% lên 1.680 điểm.", "Thanh khoản cải thiện!"]
+
+
+def test_terms_fold_diacritics_and_add_bigrams():
+    assert {"lai", "suat", "lai_suat", "chung_khoan"} <= set(terms("Lãi suất và chứng khoán"))
+    assert "va" not in terms("Lãi suất và chứng khoán")
+
+
+def test_reduce_keeps_relevant_sentences_within_budget():
+    reducer = ArticleReducer(budget=60)
+    reduced = reducer.reduce(ARTICLE, query="lãi suất thị trường chứng khoán")
+    assert estimate_tokens(reduced) <= 60
+    assert reduced.startswith("Ngân hàng Nhà nước giữ nguyên lãi suất điều hành\n15/10/2025")
+    assert "thị trường chứng khoán thu hút dòng tiền" in reduced
+    assert "Thời tiết" not in reduced
+    # Deterministic
+    assert reducer.reduce(ARTICLE, query="lãi suất thị trường chứng khoán") == reduced
+    assert reducer.stats.articles == 2 and reducer.stats.tokens_saved > 0
+
+
+def test_benchmark_reports_tokens_saved():
+    stats = benchmark([ARTICLE] * 3, query="lãi suất", budget=40)
+    assert stats.articles == 3
+    assert stats.tokens_out <= 3 * 40 < stats.tokens_in
+    assert "tiết kiệm" in stats.summary()
@@ -0,0 +1,77 @@
+import json
+import threading
+import time
+from datetime import timedelta
+
+from vn_stock_advisor.data.scrape_cache import ScrapeCache, canonical_url, domain_ttl
+from vn_stock_advisor.utils.reducer import ArticleReducer, estimate_tokens
+from vn_stock_advisor.tools.scrape_tool import BatchScrapeTool, CachedScrapeTool
+
+
+def test_canonical_url_drops_tracking_and_cosmetic_differences():
+    a = canonical_url("HTTPS://www.CafeF.vn:443/hpg-lai-ky-luc.chn/?utm_source=fb&b=2&a=1#top")
+    b = canonical_url("https://cafef.vn/hpg-lai-ky-luc.chn?a=1&b=2&fbclid=xyz")
+    assert a == b == "https://cafef.vn/hpg-lai-ky-luc.chn?a=1&b=2"
+    assert canonical_url("https://cafef.vn/x?page=2") != canonical_url("https://cafef.vn/x?page=3")
+
+
+def test_domain_ttl_matches_subdomains():
+    assert domain_ttl("https://s.cafef.vn/tin.chn") == timedelta(days=7)
+    assert domain_ttl("https://finance.vietstock.vn/HPG") == timedelta(days=1)
+
+
+def test_duplicate_content_is_stored_once_and_expires(tmp_path):
+    cache = ScrapeCache(str(tmp_path), ttls={'cafef.vn': timedelta(hours=1)})
+    cache.put("https://cafef.vn/a.chn", "Nội dung bài viết")
+    cache.put("https://m.cafef.vn/a.chn", "Nội dung bài viết")
+    assert cache.get("https://cafef.vn/a.chn?utm_medium=zalo") == "Nội dung bài viết"
+    assert len(list((tmp_path / "content").glob("*.z"))) == 1
+
+    # Age one entry past its TTL
+    path = cache._entry_path("https://cafef.vn/a.chn")
+    entry = json.loads(path.read_text(encoding="utf-8"))
+    path.write_text(json.dumps(dict(entry, fetched_at=time.time() - 7200)), encoding="utf-8")
+    assert cache.get("https://cafef.vn/a.chn") is None
+    assert cache.prune() == 1
+    assert cache.get("https://m.cafef.vn/a.chn") == "Nội dung bài viết"
+
+
+def test_tool_scrapes_each_page_once(tmp_path):
+    calls = []
+
+    def scraper(url):
+        calls.append(url)
+        return {'markdown': f"# Bài viết số {len(calls)}\nThị trường chứng khoán tăng điểm mạnh."}
+
+    tool = CachedScrapeTool(scraper=scraper, cache=ScrapeCache(str(tmp_path)))
+    first = tool._run("https://vneconomy.vn/hpg.htm")
+    second = tool._run("https://www.vneconomy.vn/hpg.htm?utm_campaign=x")
+    assert first == second == "Bài viết số 1\nThị trường chứng khoán tăng điểm mạnh."
+    assert len(calls) == 1
+
+
+def test_batch_scrape_limits_concurrency_per_domain(tmp_path):
+    active, peak, lock = {}, {}, threading.Lock()
+
+    def scraper(url):
+        host = url.split('/')[2]
+        with lock:
+            active[host] = active.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), active[host])
+        time.sleep(0.05)
+        with lock:
+            active[host] -= 1
+        if 'loi' in url:
+            raise ConnectionError("timeout")
+        return f"![anh](https://img/x.jpg)\nBài [{url}](https://x)\n\n\n\n" + "Đoạn văn. " * 50
+
+    tool = BatchScrapeTool(scraper=CachedScrapeTool(scraper=scraper, cache=ScrapeCache(str(tmp_path)),
+                                                    reducer=ArticleReducer(budget=40)), per_domain=2)
+    urls = [f"https://cafef.vn/{i}.chn" for i in range(5)] + ["https://vneconomy.vn/loi.htm", "https://cafef.vn/0.chn/"]
+    output = tool._run(urls)
+
+    assert peak["cafef.vn"] == 2
+    assert output.count("### Bài") == 6
+    assert "Lỗi khi đọc trang https://vneconomy.vn/loi.htm" in output
+    assert "![anh]" not in output and "(https://x)" not in output
+    assert all(estimate_tokens(section.split("\n", 1)[1]) <= 40 for section in output.split("### Bài")[1:])
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+from vn_stock_advisor.data.price_store import PriceStore
+from vn_stock_advisor.indicators.registry import registry
+from vn_stock_advisor.indicators.signals import SIGNAL_COLUMNS, classify_signals
+from vn_stock_advisor.indicators.technical import calculate_indicators
+from vn_stock_advisor.screener import TechnicalScreener
+
+SESSIONS = pd.bdate_range('2024-01-01', periods=320)
+
+
+def make_bars(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 25000 + np.cumsum(rng.normal(0, 300, n)).round(-1)
+    return pd.DataFrame({
+        'time': SESSIONS[-n:],
+        'open': close,
+        'high': close + 150,
+        'low': close - 150,
+        'close': close,
+        'volume': rng.integers(100_000, 5_000_000, n),
+    })
+
+
+def make_store(tmp_path):
+    store = PriceStore(str(tmp_path))
+    for seed, symbol in enumerate(['AAA', 'BBB', 'CCC', 'DDD']):
+        store.write(symbol, make_bars(320 - 40 * seed, seed))
+    # Halted two weeks ago: stale last bar
+    store.write('OLD', make_bars(300, 9).iloc[:-10])
+    return store
+
+
+def test_snapshot_matches_per_symbol_calculation(tmp_path):
+    store = make_store(tmp_path)
+    snapshot = TechnicalScreener(store).snapshot(indicators=['ATR_14'])
+
+    assert sorted(snapshot.index) == ['AAA', 'BBB', 'CCC', 'DDD']
+    for symbol in snapshot.index:
+        latest = calculate_indicators(store.tail(symbol, 200)).iloc[-1]
+        row = snapshot.loc[symbol]
+        for name in ['SMA_20', 'SMA_200', 'RSI_14', 'MACD_Signal', 'BB_Upper', 'Volume_Ratio_20']:
+            assert np.isclose(row[name], latest[name], equal_nan=True), (symbol, name)
+        atr = registry.compute(store.tail(symbol, 200), ['ATR_14'])['ATR_14'].iloc[-1]
+        assert np.isclose(row['ATR_14'], atr)
+        signals = classify_signals(latest, latest['close'])
+        assert [row[column] for column in SIGNAL_COLUMNS] == [signals[column] for column in SIGNAL_COLUMNS]
+
+
+def test_screen_filters_and_ranks(tmp_path):
+    store = make_store(tmp_path)
+    screener = TechnicalScreener(store)
+    snapshot = screener.snapshot()
+
+    result = screener.screen("RSI_14 > 0", sort_by='RSI_14', ascending=True, limit=2)
+    assert list(result.index) == list(snapshot['RSI_14'].sort_values().index[:2])
+
+    result = screener.screen(lambda df: df['macd'] == 'POSITIVE')
+    assert (result['macd'] == 'POSITIVE').all()
+    assert len(result) == (snapshot['macd'] == 'POSITIVE').sum()
+
+
+def test_as_of_date_and_stale_symbols(tmp_path):
+    store = make_store(tmp_path)
+    screener = TechnicalScreener(store)
+
+    assert 'OLD' in screener.snapshot(fresh_only=False).index
+    as_of = screener.snapshot(end=SESSIONS[-11])
+    assert 'OLD' in as_of.index
+    assert (as_of['time'] == SESSIONS[-11]).all()
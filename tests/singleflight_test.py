@@ -0,0 +1,53 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from vn_stock_advisor.utils.singleflight import SingleFlight
+
+
+def slow_call(calls, result="ok", delay=0.1):
+    def fn():
+        calls.append(threading.get_ident())
+        time.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return fn
+
+
+def test_concurrent_threads_share_one_call():
+    flights, calls = SingleFlight(), []
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda _: flights.do("HPG", slow_call(calls)), range(8)))
+    assert results == ["ok"] * 8
+    assert len(calls) == 1
+    assert flights.in_flight() == 0
+
+    # Later calls run again: nothing is cached
+    flights.do("HPG", slow_call(calls, delay=0))
+    assert len(calls) == 2
+
+
+def test_errors_reach_every_waiter():
+    flights, calls = SingleFlight(), []
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(flights.do, "HPG", slow_call(calls, ValueError("down"))) for _ in range(4)]
+    for future in futures:
+        with pytest.raises(ValueError):
+            future.result()
+    assert len(calls) == 1
+
+
+def test_asyncio_tasks_and_threads_share_one_call():
+    flights, calls = SingleFlight(), []
+
+    async def main():
+        thread_result = asyncio.to_thread(flights.do, "FPT", slow_call(calls, "shared", 0.2))
+        tasks = [flights.do_async("FPT", slow_call(calls, "shared", 0.2)) for _ in range(5)]
+        return await asyncio.gather(thread_result, *tasks, flights.do_async("VNM", slow_call(calls, "other")))
+
+    assert asyncio.run(main()) == ["shared"] * 6 + ["other"]
+    assert len(calls) == 2
@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+from vn_stock_advisor.utils.reducer import estimate_tokens
+from vn_stock_advisor.utils.token_budget import TokenBudget, trim_text
+
+REPORT = "\n".join(f"Dòng {i}: giá đóng cửa HPG phiên {i} là {25000 + i} VND" for i in range(200))
+ANALYST = SimpleNamespace(role="Nhà phân tích\n  kỹ thuật")
+STRATEGIST = SimpleNamespace(role="Cố vấn chiến lược đầu tư")
+
+
+def test_trim_text_keeps_whole_head_and_tail_lines():
+    assert trim_text("Giá HPG tăng.", 100) == "Giá HPG tăng."
+    trimmed = trim_text(REPORT, 300)
+    lines = trimmed.splitlines()
+    assert lines[0] == REPORT.splitlines()[0] and lines[-1] == REPORT.splitlines()[-1]
+    assert "đã lược bớt" in trimmed
+    assert all(line in REPORT.splitlines() for line in lines if "lược bớt" not in line)
+    assert estimate_tokens(trimmed) <= 300 + 20
+
+
+def test_tool_outputs_are_trimmed_and_counted():
+    budget = TokenBudget(tool_output=200)
+    assert budget.fit_tool_output("Giá HPG: 25.000 VND", ANALYST) == "Giá HPG: 25.000 VND"
+    assert estimate_tokens(budget.fit_tool_output(REPORT, ANALYST)) < 250
+    usage = budget.usage["Nhà phân tích kỹ thuật"]
+    assert usage.tool_outputs_trimmed == 1 and usage.trimmed_tokens > 0
+
+    # Tools that reduce their own output get a budget of their own, looked up by the name hooks see
+    budget.set_tool_budget("Công cụ đọc nhiều trang web", 10000)
+    assert budget.fit_tool_output(REPORT, ANALYST, "cong_cu_oc_nhieu_trang_web") == REPORT
+    assert budget.fit_tool_output(REPORT, ANALYST, "Công cụ đọc nhiều trang web") == REPORT
+
+
+def test_messages_fit_context_and_observation_budgets():
+    budget = TokenBudget(prompt=1500, context=400)
+    task = "Đưa ra khuyến nghị đầu tư cho HPG."
+    messages = [
+        {'role': "system", 'content': "Bạn là cố vấn đầu tư."},
+        {'role': "user", 'content': f"{task}\n\nThis is the context you're working with:\n{REPORT}\n\nBegin! Trả lời ngay."},
+        {'role': "assistant", 'content': f"Thought: xem giá\nAction: tech\nObservation: {REPORT}"},
+        {'role': "assistant", 'content': f"Thought: xem lại\nAction: tech\nObservation: {REPORT}"},
+    ]
+    tokens = budget.fit_messages(messages, ANALYST)
+    assert messages[1]['content'].startswith(task) and messages[1]['content'].endswith("Begin! Trả lời ngay.")
+    # The older observation is compressed, the latest message is left whole
+    assert "lược bớt" in messages[2]['content'] and messages[3]['content'].endswith(REPORT)
+    assert tokens == sum(estimate_tokens(m['content']) for m in messages)
+    usage = budget.usage["Nhà phân tích kỹ thuật"]
+    assert usage.calls == 1 and usage.max_prompt == tokens and usage.trimmed_tokens > 0
+
+
+def test_agent_budgets_and_run_report():
+    budget = TokenBudget(prompt=100, run=150)
+    budget.set_agent_budget(STRATEGIST, 10000)
+    messages = [{'role': "user", 'content': REPORT}]
+    budget.fit_messages(messages, STRATEGIST)
+    summary = budget.summary()
+    assert summary.loc["Cố vấn chiến lược đầu tư", "budget"] == 10000
+    assert summary.loc["Cố vấn chiến lược đầu tư", "over_budget"] == 0
+    assert "VƯỢT NGÂN SÁCH" in budget.summary_table()
+    budget.reset()
+    assert budget.summary().empty
@@ -0,0 +1,97 @@
+import json
+import threading
+
+import pytest
+
+from vn_stock_advisor.data.scrape_cache import ScrapeCache
+from vn_stock_advisor.tools.scrape_tool import BatchScrapeTool, CachedScrapeTool
+from vn_stock_advisor.utils.tracing import Tracer, count, get_tracer, start_run, traced_tool
+
+
+def test_spans_nest_and_record_errors():
+    tracer = Tracer()
+    with tracer.span("outer", "agent") as outer:
+        with tracer.span("vnstock.history", "fetch", symbol="HPG") as inner:
+            inner.set(rows=250)
+        with pytest.raises(ValueError):
+            with tracer.span("indicators", "compute"):
+                raise ValueError("thiếu dữ liệu")
+    spans = {s.name: s for s in tracer.finished()}
+    assert spans["outer"].parent_id is None
+    assert spans["vnstock.history"].parent_id == outer.span_id
+    assert spans["vnstock.history"].attributes == {'symbol': "HPG", 'rows': 250}
+    assert spans["indicators"].error == "ValueError: thiếu dữ liệu"
+    assert tracer.current() is None
+
+
+def test_summary_and_exports(tmp_path):
+    tracer = Tracer()
+    for hits in (1, 0, 1):
+        with tracer.span("scrape", "fetch") as span:
+            span.add("cache_hits", hits)
+            span.add("bytes", 100)
+    summary = tracer.summary().loc[("fetch", "scrape")]
+    assert (summary['calls'], summary['cache_hits'], summary['bytes']) == (3, 2, 300)
+    assert "THỜI GIAN THỰC HIỆN" in tracer.summary_table()
+
+    lines = tracer.export_jsonl(tmp_path / "run.jsonl").read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 3 and json.loads(lines[0])['trace_id'] == tracer.trace_id
+    otlp = json.loads(tracer.export_otlp(tmp_path / "run.otlp.json").read_text(encoding="utf-8"))
+    spans = otlp['resourceSpans'][0]['scopeSpans'][0]['spans']
+    assert [s['kind'] for s in spans] == [3, 3, 3]
+    assert {'key': 'cache_hits', 'value': {'intValue': '1'}} in spans[0]['attributes']
+
+
+def test_traced_tool_marks_error_outputs():
+    class Tool:
+        name = "Công cụ thử"
+
+        @traced_tool
+        def _run(self, ok: bool) -> str:
+            count("cache_hits")
+            return "Dữ liệu HPG" if ok else "Lỗi khi lấy dữ liệu"
+
+    tracer = get_tracer()
+    tracer.reset()
+    Tool()._run(True)
+    Tool()._run(False)
+    good, bad = tracer.finished()
+    assert (good.kind, good.name, good.error) == ("tool", "Công cụ thử", None)
+    assert good.attributes['cache_hits'] == 1 and good.attributes['output_chars'] == len("Dữ liệu HPG")
+    assert bad.error == "Lỗi khi lấy dữ liệu"
+
+
+def test_batch_scrape_fetches_nest_under_the_tool_span(tmp_path):
+    def scraper(url):
+        return {'markdown': f"# Bài viết {url}\nGiá thép tăng mạnh trong quý."}
+
+    tool = BatchScrapeTool(scraper=CachedScrapeTool(scraper=scraper, cache=ScrapeCache(str(tmp_path))))
+    urls = ["https://cafef.vn/a.chn", "https://vneconomy.vn/b.htm"]
+    tracer = get_tracer()
+    tracer.reset()
+    tool._run(urls)
+    tool._run(urls)
+    tools = [s for s in tracer.finished() if s.kind == "tool"]
+    fetches = [s for s in tracer.finished() if s.kind == "fetch"]
+    assert len(tools) == 2 and len(fetches) == 4
+    assert {f.parent_id for f in fetches} == {t.span_id for t in tools}
+    assert sum(f.attributes.get('cache_hits', 0) for f in fetches) == 2
+
+
+def test_concurrent_runs_keep_separate_traces():
+    tracers = {}
+
+    def run(symbol):
+        tracer = start_run()
+        with get_tracer().span("vnstock.history", "fetch", symbol=symbol):
+            count("cache_hits")
+        tracers[symbol] = tracer
+
+    threads = [threading.Thread(target=run, args=(symbol,)) for symbol in ("HPG", "FPT")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert tracers["HPG"] is not tracers["FPT"]
+    assert [s.attributes['symbol'] for s in tracers["HPG"].finished()] == ["HPG"]
+    assert [s.attributes['symbol'] for s in tracers["FPT"].finished()] == ["FPT"]
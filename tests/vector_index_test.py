@@ -0,0 +1,66 @@
+import json
+
+import numpy as np
+
+from vn_stock_advisor.data.vector_index import HashingEmbedder, VectorIndex
+from vn_stock_advisor.tools.knowledge_tool import KnowledgeSearchTool, knowledge_chunks
+
+
+class CountingEmbedder(HashingEmbedder):
+    def __init__(self):
+        super().__init__(dim=256)
+        self.embedded = []
+
+    def __call__(self, texts):
+        self.embedded.extend(texts)
+        return super().__call__(texts)
+
+
+def test_hashing_embedder_is_deterministic_and_folds_diacritics():
+    embedder = HashingEmbedder()
+    a, b, c = embedder(["Tài chính ngân hàng", "tai chinh ngan hang", "Bất động sản"])
+    assert np.allclose(a, b) and np.isclose(np.linalg.norm(a), 1.0)
+    assert a @ c < 0.5
+
+
+def test_unchanged_documents_are_not_embedded_again(tmp_path):
+    embedder = CountingEmbedder()
+    index = VectorIndex("test", embedder, root=str(tmp_path))
+    assert index.sync({"a": ["Ngân hàng: PE 7.9", "Thép: PE 12.1"], "b": ["Thép: PE 12.1"]}) == {'embedded': 2, 'deleted': 0}
+
+    # A new process reuses the stored vectors
+    index = VectorIndex("test", embedder, root=str(tmp_path))
+    assert index.sync({"a": ["Ngân hàng: PE 7.9", "Thép: PE 12.1"], "b": ["Thép: PE 12.1"]}) == {'embedded': 0, 'deleted': 0}
+    # One changed chunk costs one embedding; the missing document is deleted
+    assert index.sync({"a": ["Ngân hàng: PE 8.2", "Thép: PE 12.1"]}) == {'embedded': 1, 'deleted': 1}
+    assert len(embedder.embedded) == 3 and len(index) == 2 and index.documents() == ["a"]
+
+    assert index.search("ngan hang", k=1)[0]['text'] == "Ngân hàng: PE 8.2"
+    assert index.delete("a") and len(index) == 0 and index.search("thép") == []
+
+
+def test_knowledge_tool_syncs_files_once(tmp_path):
+    path = tmp_path / "pe_pb.json"
+    path.write_text(json.dumps({"description": "P/E, P/B trung bình ngành", "data": {
+        "Tài chính ngân hàng": {"PE": 7.93, "PB": 1.32}, "Bất động sản": {"PE": 19.94, "PB": 1.9}}},
+        ensure_ascii=False), encoding="utf-8")
+    assert knowledge_chunks(str(path)) == ["P/E, P/B trung bình ngành", "Tài chính ngân hàng: PE: 7.93, PB: 1.32",
+                                           "Bất động sản: PE: 19.94, PB: 1.9"]
+    embedder = CountingEmbedder()
+    index = VectorIndex("knowledge", embedder, root=str(tmp_path / "vectors"))
+    tool = KnowledgeSearchTool(paths=[str(path)], index=index)
+    assert tool._run("bat dong san", k=1).startswith("- Bất động sản: PE: 19.94")
+    assert KnowledgeSearchTool(paths=[str(path)], index=index).sync() == {'embedded': 0, 'deleted': 0}
+    # Three chunks and one query
+    assert len(embedder.embedded) == 4
+
+
+def test_knowledge_tool_drops_unrelated_chunks(tmp_path):
+    path = tmp_path / "pe_pb.json"
+    path.write_text(json.dumps({"Tài chính ngân hàng": {"PE": 7.93}, "Bất động sản": {"PE": 19.94}},
+                               ensure_ascii=False), encoding="utf-8")
+    tool = KnowledgeSearchTool(paths=[str(path)], index=VectorIndex("knowledge", HashingEmbedder(), root=str(tmp_path)))
+    assert tool._run("Thép", k=3).startswith("Không tìm thấy tài liệu liên quan đến 'Thép'")
+    # Only the matching chunk, not the other one at a near-zero score
+    assert tool._run("ngân hàng", k=3).splitlines() == [tool._run("ngân hàng", k=1)]
+    assert tool._run("ngân hàng", k=1).startswith("- Tài chính ngân hàng")
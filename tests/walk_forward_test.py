@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+from vn_stock_advisor.data.decision_ledger import DecisionLedger, normalize_action
+from vn_stock_advisor.data.price_store import PriceStore
+from vn_stock_advisor.walk_forward import WalkForwardEvaluator
+
+SESSIONS = pd.bdate_range('2025-01-01', periods=40)
+
+
+def write_prices(store, symbol, close):
+    store.write(symbol, pd.DataFrame({'time': SESSIONS[:len(close)], 'open': close, 'high': close,
+                                      'low': close, 'close': close, 'volume': 1000.0}))
+
+
+def decision(symbol, day, text):
+    return {'stock_ticker': symbol, 'today_date': str(day.date()), 'decision': text, 'full_name': symbol}
+
+
+def test_normalize_action():
+    assert [normalize_action(t) for t in ["**MUA**", "Bán", "Nắm giữ", "Không mua", "Khuyến nghị: BÁN", "?"]] == \
+        ['BUY', 'SELL', 'HOLD', 'HOLD', 'SELL', 'UNKNOWN']
+
+
+def test_ledger_appends_segments_and_compacts(tmp_path):
+    ledger = DecisionLedger(str(tmp_path))
+    ledger.append([decision("hpg", SESSIONS[0], "MUA")], config="v1", model="m")
+    ledger.append([decision("FPT", SESSIONS[1], "GIỮ"), decision("HPG", SESSIONS[2], "BÁN")], config="v2", model="m")
+
+    assert len(ledger.segments()) == 2
+    table = ledger.read()
+    assert list(table['symbol']) == ["HPG", "FPT", "HPG"]
+    assert list(ledger.read(symbols=["hpg"], start=SESSIONS[1])['action']) == ['SELL']
+
+    # Another reader has cached the segments it read before the compaction
+    other = DecisionLedger(str(tmp_path))
+    assert len(other.read()) == 3
+    assert ledger.compact() == 2
+    assert len(ledger.segments()) == 1
+    assert ledger.read().equals(table)
+    ledger.append([decision("VNM", SESSIONS[3], "MUA")], config="v2", model="m")
+    assert list(other.read()['symbol']) == ["HPG", "FPT", "HPG", "VNM"]
+
+    # Compaction is skipped while another process holds the lock
+    (tmp_path / "compact.lock").touch()
+    assert ledger.compact() == 0 and len(ledger.segments()) == 2
+
+
+def test_run_date_wins_over_the_decision_text(tmp_path):
+    ledger = DecisionLedger(str(tmp_path))
+    # Day-first or spelled-out dates from the LLM would parse wrong or not at all
+    rows = ledger.append([{**decision("HPG", SESSIONS[0], "MUA"), 'today_date': "05/10/2026"},
+                          {**decision("FPT", SESSIONS[0], "MUA"), 'today_date': "Ngày 05 tháng 10 năm 2026"}],
+                         date="2026-10-05")
+    assert list(rows['date']) == [pd.Timestamp("2026-10-05")] * 2
+
+
+def test_forward_returns_are_graded_and_updated_incrementally(tmp_path):
+    store = PriceStore(str(tmp_path / "prices"))
+    ledger = DecisionLedger(str(tmp_path / "ledger"))
+    write_prices(store, "UP", 100 * 1.01 ** np.arange(20))
+    write_prices(store, "DOWN", 100 * 0.99 ** np.arange(20))
+    ledger.append([decision("UP", SESSIONS[0], "MUA"), decision("DOWN", SESSIONS[0], "MUA")], config="v1", model="m")
+    ledger.append([decision("DOWN", SESSIONS[0], "BÁN")], config="v2", model="m")
+
+    evaluator = WalkForwardEvaluator(ledger, store, horizons=(5, 30), state_path=str(tmp_path / "state.npz"))
+    table = evaluator.evaluations()
+    five = table[table['horizon'] == 5].set_index(['symbol', 'config'])
+    assert np.isclose(five.loc[('UP', 'v1'), 'forward_return'], 1.01 ** 5 - 1)
+    assert five['correct'].tolist() == [1.0, 0.0, 1.0]
+    assert table[table['horizon'] == 30]['forward_return'].isna().all()
+
+    report = evaluator.report(update=False)
+    assert report.loc[('v1', 'm', 5), 'accuracy'] == 0.5
+    assert report.loc[('v2', 'm', 5), 'accuracy'] == 1.0
+    assert report.loc[('v1', 'm', 30), 'evaluated'] == 0
+
+    # New prices arrive: only the open 30-session horizons are computed
+    write_prices(store, "UP", 100 * 1.01 ** np.arange(40))
+    state = evaluator.update().set_index(['decision_id', 'horizon'])['forward_return']
+    up_id = table.loc[table['symbol'] == 'UP', 'decision_id'].iloc[0]
+    assert np.isclose(state[(up_id, 30)], 1.01 ** 30 - 1)
+    assert state.notna().sum() == 4
@@ -0,0 +1,71 @@
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from vn_stock_advisor.indicators.incremental import IncrementalIndicatorEngine
+from vn_stock_advisor.indicators.signals import classify_signals
+from vn_stock_advisor.watchlist import AlertRule, BarRing, FileSink, WatchlistMonitor
+
+
+def daily_bars(n=300):
+    # A steady rise then a fall, so MACD and the trends flip once
+    close = np.concatenate([np.linspace(20000, 30000, n // 2), np.linspace(30000, 22000, n - n // 2)])
+    return pd.DataFrame({'time': pd.bdate_range('2024-01-01', periods=n), 'open': close, 'high': close + 100,
+                         'low': close - 100, 'close': close, 'volume': 1_000_000.0})
+
+
+def test_ring_keeps_the_latest_bars_in_order():
+    ring = BarRing(capacity=3)
+    for i, day in enumerate(pd.bdate_range('2025-01-01', periods=5)):
+        ring.push(day, i, i, i, i, i)
+    frame = ring.to_frame()
+    assert len(ring) == 3 and list(frame['close']) == [2.0, 3.0, 4.0]
+    assert ring.last_time() == pd.Timestamp('2025-01-07')
+
+
+def test_alerts_and_crew_runs_only_on_flips(tmp_path):
+    bars = daily_bars()
+    flips = []
+    monitor = WatchlistMonitor(["HPG"], rules=[AlertRule(('macd', 'long_trend'))],
+                               sinks=[FileSink(str(tmp_path / "alerts.jsonl"))],
+                               on_flip=lambda symbol, alerts: flips.append((symbol, alerts)))
+    monitor.feed("HPG", bars.iloc[:100], notify=False)
+    alerts = monitor.feed("HPG", bars)
+
+    # Signals match the per-bar rule evaluation on the whole history
+    rows = IncrementalIndicatorEngine(persist=False).update("HPG", bars, contiguous=True)
+    macd = [classify_signals(r, r['close'])['macd'] for r in rows.to_dict('records')]
+    expected = [i for i in range(101, len(bars)) if macd[i] != macd[i - 1]]
+    assert [a.time for a in alerts if a.signal == 'macd'] == [str(bars['time'][i]) for i in expected]
+
+    assert len(flips) == len({a.time for a in alerts})
+    lines = (tmp_path / "alerts.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)['signal'] for line in lines] == [a.signal for a in alerts]
+    # Already seen bars are skipped
+    assert monitor.feed("HPG", bars) == []
+
+
+def test_per_bar_evaluation_is_fast_with_flat_memory():
+    symbols = [f"S{i:03d}" for i in range(200)]
+    monitor = WatchlistMonitor(symbols, sinks=[])
+    bars = daily_bars(250)
+    for symbol in symbols:
+        monitor.feed(symbol, bars.iloc[:220], notify=False)
+
+    start = time.perf_counter()
+    for symbol in symbols:
+        monitor.feed(symbol, bars.iloc[220:])
+    per_bar = (time.perf_counter() - start) / (len(symbols) * 30)
+    assert per_bar < 1e-3
+    assert all(len(w.ring) == w.ring.capacity for w in monitor.watched.values())
+
+
+def test_forming_bar_is_not_processed():
+    bars = daily_bars(5)
+    monitor = WatchlistMonitor(["HPG"], sinks=[])
+    closed = monitor._closed_bars(bars, now=pd.Timestamp(bars['time'].iloc[-1]) + pd.Timedelta(hours=10))
+    assert len(closed) == 4
+    closed = monitor._closed_bars(bars, now=pd.Timestamp(bars['time'].iloc[-1]) + pd.Timedelta(hours=15))
+    assert len(closed) == 5